@@ -0,0 +1,12 @@
+from .answer_cache import AnswerCache, get_answer_cache
+from .cypher_cache import CypherTemplateCache, get_cypher_cache
+from .graph_version import read_graph_version, bump_graph_version
+
+__all__ = [
+    "AnswerCache",
+    "get_answer_cache",
+    "CypherTemplateCache",
+    "get_cypher_cache",
+    "read_graph_version",
+    "bump_graph_version",
+]
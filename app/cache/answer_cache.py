@@ -0,0 +1,231 @@
+"""/query 응답 캐시 (정확 일치 + 의미 유사도)"""
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.cache.graph_version import read_graph_version
+
+
+class _Entry:
+    """캐시 항목"""
+    
+    __slots__ = ("route", "vector", "value", "expires_at")
+    
+    def __init__(self, route: str, vector: Optional[np.ndarray], value: Any, expires_at: float):
+        self.route = route
+        self.vector = vector
+        self.value = value
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    """
+    2단계 답변 캐시
+    
+    1. 정확 일치: 정규화한 질의 문자열을 키로 조회
+    2. 의미 유사도: 질의 임베딩과 캐시된 질의 임베딩의 코사인 유사도가
+       임계값 이상이고 같은 Retriever로 라우팅된 항목을 반환
+    
+    항목은 TTL이 지나면 만료되고, max_entries를 넘으면 가장 오래 사용되지 않은
+    항목부터 축출합니다. ETL이 그래프 버전 마커를 갱신하면 다음 조회 시 전체를 비웁니다.
+    """
+    
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        version_path: Optional[str] = None
+    ):
+        self.max_entries = max(1, max_entries or settings.answer_cache_max_entries)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.answer_cache_ttl_seconds
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None
+            else settings.answer_cache_similarity_threshold
+        )
+        self.version_path = version_path or settings.graph_version_path
+        
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.semantic_hits = 0
+        self.misses = 0  # 의미 유사도 조회 미스 (정확 일치 미스 뒤에 조회)
+        self.evictions = 0
+        self.invalidations = 0
+        
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._version = read_graph_version(self.version_path)
+        
+        # 의미 유사도 조회용 정규화 임베딩 행렬 (항목이 바뀌면 다시 구성)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        """정확 일치 키 (유니코드 정규화, 소문자, 공백 압축, 끝 문장부호 제거)"""
+        text = unicodedata.normalize("NFKC", query).lower()
+        text = re.sub(r"\s+", " ", text).strip()
+        return text.rstrip("?!.。 ")
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _check_version(self):
+        """그래프 버전이 바뀌었으면 전체 무효화"""
+        version = read_graph_version(self.version_path)
+        if version != self._version:
+            self._version = version
+            if self._entries:
+                self._entries.clear()
+                self._matrix = None
+                self.invalidations += 1
+    
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        self._matrix = None
+    
+    def get_exact(self, query: str) -> Optional[Any]:
+        """
+        정확 일치 조회
+        
+        Args:
+            query: 사용자 질의
+        
+        Returns:
+            캐시된 값 (없거나 만료되었으면 None)
+        """
+        key = self.normalize(query)
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.exact_misses += 1
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                self.exact_misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry.value
+    
+    def get_similar(self, embedding: List[float], route: str) -> Optional[Tuple[Any, float]]:
+        """
+        의미 유사도 조회
+        
+        Args:
+            embedding: 질의 임베딩
+            route: 현재 질의가 라우팅된 Retriever 이름 (같은 Retriever 항목만 비교)
+        
+        Returns:
+            (캐시된 값, 유사도) 튜플 (임계값 이상인 항목이 없으면 None)
+        """
+        query_vec = self._unit(embedding)
+        with self._lock:
+            self._check_version()
+            if query_vec is None or not self._entries:
+                self.misses += 1
+                return None
+            
+            if self._matrix is None:
+                self._matrix_keys = [key for key, entry in self._entries.items() if entry.vector is not None]
+                self._matrix = (
+                    np.stack([self._entries[key].vector for key in self._matrix_keys])
+                    if self._matrix_keys else np.zeros((0, len(query_vec)), dtype=np.float32)
+                )
+            
+            if self._matrix.shape[1] != len(query_vec):
+                self.misses += 1
+                return None
+            
+            scores = self._matrix @ query_vec
+            now = time.time()
+            for i in np.argsort(-scores):
+                score = float(scores[i])
+                if score < self.similarity_threshold:
+                    break
+                key = self._matrix_keys[i]
+                entry = self._entries.get(key)
+                if entry is None or entry.route != route:
+                    continue
+                if entry.expires_at <= now:
+                    self._remove(key)
+                    continue
+                
+                self._entries.move_to_end(key)
+                self.semantic_hits += 1
+                return entry.value, score
+            
+            self.misses += 1
+            return None
+    
+    def put(self, query: str, route: str, embedding: Optional[List[float]], value: Any):
+        """
+        응답 저장
+        
+        Args:
+            query: 사용자 질의
+            route: 사용된 Retriever 이름
+            embedding: 질의 임베딩 (없으면 정확 일치로만 조회됨)
+            value: 캐시할 응답
+        """
+        key = self.normalize(query)
+        entry = _Entry(route, self._unit(embedding), value, time.time() + self.ttl_seconds)
+        with self._lock:
+            self._check_version()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._matrix = None
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+    
+    @staticmethod
+    def _unit(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+        """L2 정규화된 float32 벡터"""
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+    
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 통계 (hit_rate는 정확 일치 조회 수, 즉 요청 수 기준)"""
+        lookups = self.exact_hits + self.exact_misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            "graph_version": self._version,
+            "exact_hits": self.exact_hits,
+            "exact_misses": self.exact_misses,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
+
+
+_shared_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """프로세스 공용 답변 캐시"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = AnswerCache()
+    return _shared_cache
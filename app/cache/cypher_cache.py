@@ -0,0 +1,332 @@
+"""Text2Cypher 생성 쿼리 템플릿 캐시"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.cache.graph_version import read_graph_version
+
+logger = logging.getLogger(__name__)
+
+
+# 캐시하지 않는 쓰기 절 (LLM이 쓰기 쿼리를 생성한 경우)
+_WRITE_CLAUSE = re.compile(r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|LOAD\s+CSV)\b", re.IGNORECASE)
+
+# 질의 내 따옴표 문자열
+_QUOTED = r"[\"'“”‘’「『](?P<quoted>[^\"'“”‘’」』]+)[\"'“”‘’」』]"
+
+# 질의 내 숫자 ("10개"처럼 한글 단위가 바로 붙는 경우 포함)
+_NUMBER = r"(?<![0-9A-Za-z_.])\d+(?:\.\d+)?(?![0-9A-Za-z_.])"
+
+# 생성된 Cypher의 문자열 리터럴 (작은/큰따옴표, 백슬래시 이스케이프 포함)
+_CYPHER_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+# 엔티티 이름 뒤에 붙을 수 있는 조사 (긴 조사 우선)
+_PARTICLES = sorted(
+    ("의", "은", "는", "이", "가", "을", "를", "에", "에서", "에게", "와", "과", "랑", "이랑",
+     "로", "으로", "도", "만", "별", "까지", "부터", "보다", "하고", "처럼"),
+    key=len,
+    reverse=True
+)
+
+# 엔티티 이름 앞뒤 경계: 영문/숫자/한글이 바로 붙으면 다른 단어의 일부로 보고 매칭하지 않음
+# (뒤에는 공백, 문장 부호, 문자열 끝 또는 조사만 허용: "EDIT"의 "IT", "IT기업"의 "IT"는 이름이 아님)
+_NAME_BEFORE = r"(?<![0-9A-Za-z가-힣])"
+_NAME_AFTER = r"(?=(?:" + "|".join(_PARTICLES) + r")?(?:[^0-9A-Za-z가-힣]|$))"
+
+
+class CypherTemplateCache:
+    """
+    질의 형태(shape) → 파라미터화된 Cypher 템플릿 캐시
+    
+    질의에서 언론사/카테고리 이름, 따옴표 문자열, 숫자를 슬롯으로 추출해
+    "<media> 기사 목록" 같은 형태로 정규화하고, LLM이 생성한 Cypher의 같은 리터럴을
+    $media0 같은 파라미터로 바꿔 저장합니다. 같은 형태의 질의는 LLM 호출 없이
+    템플릿과 새 파라미터로 실행되며, 쿼리 문자열이 같으므로 Neo4j 실행 계획 캐시도 재사용됩니다.
+    
+    템플릿은 JSON 파일로 저장되어 서버 재시작 후에도 유지됩니다. 저장/삭제는 메모리만 바꾸고
+    파일 기록은 flush(서버가 CYPHER_CACHE_FLUSH_SECONDS마다, 그리고 종료 시 호출)에서 하므로
+    요청 경로에서는 파일을 쓰지 않습니다.
+    """
+    
+    FILE_VERSION = 1
+    
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = path or settings.cypher_cache_path
+        self.max_entries = max(1, max_entries or settings.cypher_cache_max_entries)
+        
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.uncacheable = 0
+        self.invalidations = 0
+        
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        
+        # 이름 → (슬롯 종류, 원래 이름) (소문자 키)
+        self._vocabulary: Optional[Dict[str, Tuple[str, str]]] = None
+        self._vocabulary_version: Optional[str] = None
+        self._pattern: re.Pattern = self._compile([])
+        self._bare_names: Optional[re.Pattern] = None  # 경계 없이 이름만 찾는 정규식 (단어 일부로 쓰인 이름 검출)
+        
+        self._load()
+    
+    def _load(self):
+        """저장된 템플릿 로드"""
+        if not os.path.exists(self.path):
+            return
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.FILE_VERSION:
+                self._templates = data.get("templates", {})
+        except Exception as e:
+            logger.warning("⚠️  Cypher 템플릿 캐시를 읽을 수 없습니다 (%s): %s", self.path, e)
+    
+    def _save_unlocked(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.FILE_VERSION, "templates": self._templates},
+                f,
+                ensure_ascii=False,
+                indent=2
+            )
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+    
+    def flush(self):
+        """변경된 템플릿/사용 횟수를 파일에 기록"""
+        with self._lock:
+            if self._dirty:
+                self._save_unlocked()
+    
+    def needs_vocabulary(self) -> bool:
+        """엔티티 이름 목록을 (다시) 로드해야 하는지 여부 (그래프 버전이 바뀌면 True)"""
+        return self._vocabulary is None or read_graph_version() != self._vocabulary_version
+    
+    def set_vocabulary(self, names: Iterable[Tuple[str, str]]):
+        """
+        질의에서 슬롯으로 추출할 엔티티 이름 설정
+        
+        Args:
+            names: (슬롯 종류, 이름) 목록 (예: ("media", "조선일보"), ("category", "경제"))
+        """
+        vocabulary = {}
+        for kind, name in names:
+            if name and len(name.strip()) >= 2:
+                key = unicodedata.normalize("NFKC", name.strip()).lower()
+                vocabulary.setdefault(key, (kind, name.strip()))
+        
+        with self._lock:
+            self._vocabulary = vocabulary
+            self._vocabulary_version = read_graph_version()
+            self._pattern = self._compile(vocabulary.keys())
+            self._bare_names = self._compile_bare(vocabulary.keys())
+    
+    @staticmethod
+    def _compile(names: Iterable[str]) -> re.Pattern:
+        """따옴표 문자열 | 엔티티 이름 (긴 이름 우선, 단어 경계 필요) | 숫자 순으로 매칭하는 정규식"""
+        alternatives = [f"(?P<str>{_QUOTED})"]
+        names = sorted(names, key=len, reverse=True)
+        if names:
+            alternatives.append(
+                _NAME_BEFORE + "(?P<name>" + "|".join(re.escape(name) for name in names) + ")" + _NAME_AFTER
+            )
+        alternatives.append(f"(?P<num>{_NUMBER})")
+        return re.compile("|".join(alternatives), re.IGNORECASE)
+    
+    @staticmethod
+    def _compile_bare(names: Iterable[str]) -> Optional[re.Pattern]:
+        names = sorted(names, key=len, reverse=True)
+        if not names:
+            return None
+        return re.compile("|".join(re.escape(name) for name in names), re.IGNORECASE)
+    
+    def extract(self, question: str) -> Tuple[Optional[str], List[Tuple[str, Any]]]:
+        """
+        질의를 형태(shape)와 슬롯 값으로 분리
+        
+        Args:
+            question: 사용자 질의
+        
+        Returns:
+            (shape, [(슬롯 이름, 값), ...]) 튜플
+            예: "조선일보 기사 10개" → ("<media> 기사 <num>개", [("media0", "조선일보"), ("num0", 10)])
+            엔티티 이름이 다른 단어의 일부로 쓰여("IT기업") 슬롯을 확정할 수 없으면 shape는 None (캐시하지 않음)
+        """
+        text = unicodedata.normalize("NFKC", question)
+        text = re.sub(r"\s+", " ", text).strip().rstrip("?!.。 ")
+        
+        slots: List[Tuple[str, Any]] = []
+        counts: Dict[str, int] = {}
+        
+        def replace(match: re.Match) -> str:
+            if match.group("str") is not None:
+                kind, value = "str", match.group("quoted")
+            elif match.groupdict().get("name") is not None:
+                kind, value = self._vocabulary[match.group("name").lower()]
+            else:
+                kind = "num"
+                raw = match.group("num")
+                value = float(raw) if "." in raw else int(raw)
+            
+            index = counts.get(kind, 0)
+            counts[kind] = index + 1
+            slots.append((f"{kind}{index}", value))
+            return f"<{kind}>"
+        
+        shape = self._pattern.sub(replace, text).lower()
+        
+        bare_names = self._bare_names
+        if bare_names is not None and bare_names.search(re.sub(r"<\w+>", " ", shape)):
+            with self._lock:
+                self.uncacheable += 1
+            return None, slots
+        return shape, slots
+    
+    @staticmethod
+    def parameterize(cypher: str, slots: List[Tuple[str, Any]]) -> Optional[str]:
+        """
+        생성된 Cypher의 리터럴을 슬롯 파라미터로 치환
+        
+        Args:
+            cypher: LLM이 생성한 Cypher
+            slots: extract가 반환한 슬롯 목록
+        
+        Returns:
+            파라미터화된 템플릿 (슬롯 값이 Cypher에 리터럴로 정확히 한 번 나타나지 않으면 None)
+        
+        문자열 슬롯은 값 전체가 하나의 문자열 리터럴인 경우만, 숫자 슬롯은 문자열 리터럴 밖의
+        숫자 토큰(LIMIT, 숫자 비교 등)만 치환합니다. '2024-01-01' 안의 2024는 파라미터가 아니므로
+        숫자 값이 문자열 리터럴 안에만 있으면 캐시하지 않습니다.
+        
+        >>> CypherTemplateCache.parameterize("MATCH (a) RETURN a LIMIT 10", [("num0", 10)])
+        'MATCH (a) RETURN a LIMIT $num0'
+        >>> CypherTemplateCache.parameterize("MATCH (a) WHERE a.created_at >= '2024-01-01' RETURN a", [("num0", 2024)])
+        >>> CypherTemplateCache.parameterize("MATCH (a) WHERE a.title STARTS WITH '2024' RETURN a", [("num0", 2024)])
+        >>> CypherTemplateCache.parameterize("MATCH (a) WHERE a.x > 1 RETURN a LIMIT 1", [("num0", 1)])
+        >>> CypherTemplateCache.parameterize("MATCH (m {name: '조선일보'}) RETURN m LIMIT 5", [("media0", "조선일보"), ("num0", 5)])
+        'MATCH (m {name: $media0}) RETURN m LIMIT $num0'
+        """
+        # (문자열 리터럴 여부, 텍스트) 구간 목록
+        segments: List[List[Any]] = []
+        position = 0
+        for match in _CYPHER_STRING.finditer(cypher):
+            segments.append([False, cypher[position:match.start()]])
+            segments.append([True, match.group()])
+            position = match.end()
+        segments.append([False, cypher[position:]])
+        
+        for name, value in slots:
+            if isinstance(value, str):
+                found = [segment for segment in segments if segment[0] and segment[1][1:-1] == value]
+                # 없으면 값이 변형되어 쓰였고, 여러 번이면 어느 리터럴이 슬롯인지 알 수 없음
+                if len(found) != 1:
+                    return None
+                found[0][:] = [False, f"${name}"]
+            else:
+                pattern = re.compile(r"(?<![\w.$])" + re.escape(str(value)) + r"(?![\w.])")
+                found = [segment for segment in segments if not segment[0] and pattern.search(segment[1])]
+                # 여러 번이면 관련 없는 리터럴까지 바뀜 ("WHERE a.x > 1 ... LIMIT 1")
+                if len(found) != 1 or len(pattern.findall(found[0][1])) != 1:
+                    return None
+                found[0][1] = pattern.sub(f"${name}", found[0][1])
+        
+        return "".join(text for _, text in segments)
+    
+    def lookup(self, shape: str, slots: List[Tuple[str, Any]]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        템플릿 조회
+        
+        Returns:
+            (템플릿, 파라미터) 튜플 (없으면 None)
+        """
+        with self._lock:
+            entry = self._templates.get(shape)
+            if entry is None or entry["slots"] != [name for name, _ in slots]:
+                self.misses += 1
+                return None
+            
+            entry["hits"] = entry.get("hits", 0) + 1
+            entry["last_used"] = time.time()
+            self._dirty = True
+            self.hits += 1
+            return entry["cypher"], dict(slots)
+    
+    def store(self, shape: str, slots: List[Tuple[str, Any]], cypher: str) -> bool:
+        """
+        실행에 성공하고 결과가 있는 생성 Cypher를 템플릿으로 저장
+        
+        Returns:
+            저장 여부 (쓰기 쿼리이거나 파라미터화할 수 없으면 False)
+        """
+        template = None if _WRITE_CLAUSE.search(cypher) else self.parameterize(cypher, slots)
+        
+        with self._lock:
+            if template is None:
+                self.uncacheable += 1
+                return False
+            
+            now = time.time()
+            self._templates[shape] = {
+                "cypher": template,
+                "slots": [name for name, _ in slots],
+                "hits": 0,
+                "created_at": now,
+                "last_used": now,
+            }
+            self.stores += 1
+            
+            # 가장 오래 사용되지 않은 템플릿부터 축출
+            if len(self._templates) > self.max_entries:
+                oldest = sorted(self._templates, key=lambda key: self._templates[key]["last_used"])
+                for key in oldest[:len(self._templates) - self.max_entries]:
+                    del self._templates[key]
+            
+            self._dirty = True
+            return True
+    
+    def invalidate(self, shape: str):
+        """실행에 실패한 템플릿 삭제"""
+        with self._lock:
+            if self._templates.pop(shape, None) is not None:
+                self.invalidations += 1
+                self._dirty = True
+    
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "templates": len(self._templates),
+            "max_entries": self.max_entries,
+            "vocabulary_size": len(self._vocabulary or {}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "uncacheable": self.uncacheable,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_shared_cache: Optional[CypherTemplateCache] = None
+
+
+def get_cypher_cache() -> CypherTemplateCache:
+    """프로세스 공용 Cypher 템플릿 캐시"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = CypherTemplateCache()
+    return _shared_cache
@@ -0,0 +1,68 @@
+"""그래프 버전 마커 (ETL 적재 시 갱신, 질의 측 캐시 무효화에 사용)"""
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from app.config import settings
+
+# 마커 파일 경로 → (파일 상태 (mtime, 크기, inode), 버전)
+_cached_versions: Dict[str, Tuple[Tuple[int, int, int], Optional[str]]] = {}
+
+
+def read_graph_version(path: Optional[str] = None) -> Optional[str]:
+    """
+    현재 그래프 버전 조회
+    
+    요청마다 캐시 조회 경로에서 호출되므로 파일은 os.stat으로 바뀐 것이 확인될 때만 다시 읽습니다
+    (bump_graph_version은 파일을 교체하므로 같은 mtime이어도 inode가 바뀜).
+    
+    Args:
+        path: 마커 파일 경로 (None이면 GRAPH_VERSION_PATH 설정 사용)
+    
+    Returns:
+        버전 문자열 (마커 파일이 없으면 None)
+    """
+    path = path or settings.graph_version_path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _cached_versions.pop(path, None)
+        return None
+    
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    cached = _cached_versions.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            version = f.read().strip() or None
+    except FileNotFoundError:
+        return None
+    _cached_versions[path] = (signature, version)
+    return version
+
+
+def bump_graph_version(path: Optional[str] = None) -> str:
+    """
+    그래프 버전 갱신 (ETL이 새 데이터를 적재한 뒤 호출)
+    
+    API 서버는 다음 캐시 조회 시 버전 변경을 감지하여 캐시된 답변을 버립니다.
+    
+    Args:
+        path: 마커 파일 경로 (None이면 GRAPH_VERSION_PATH 설정 사용)
+    
+    Returns:
+        새 버전 문자열
+    """
+    path = path or settings.graph_version_path
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    version = f"{datetime.now(timezone.utc).isoformat()}-{uuid.uuid4().hex[:8]}"
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, path)
+    return version
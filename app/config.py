@@ -19,6 +19,9 @@ class Settings(BaseSettings):
     neo4j_username: str
     neo4j_password: str
     neo4j_database: str = "neo4j"
+    neo4j_max_connection_pool_size: int = 50  # 공용 드라이버 커넥션 풀 크기
+    neo4j_connection_acquisition_timeout: float = 10.0  # 풀에서 커넥션을 얻기까지 최대 대기 시간 (초)
+    neo4j_max_connection_lifetime: float = 3600.0  # 커넥션 최대 수명 (초)
     
     # LLM Provider
     llm_provider: str = "openai"  # openai, anthropic, ollama
@@ -26,16 +29,91 @@ class Settings(BaseSettings):
     anthropic_api_key: Optional[str] = None
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama2"
+    ollama_pool_size: int = 10  # Ollama HTTP keep-alive 커넥션 풀 크기
+    ollama_connect_timeout: float = 10.0  # 연결 타임아웃 (초)
+    ollama_read_timeout: float = 300.0  # 읽기 타임아웃 (초, 로컬 모델 생성은 느릴 수 있음)
+    ollama_max_retries: int = 3  # 연결 실패/429/5xx 재시도 횟수 (생성 도중 읽기 타임아웃은 재시도하지 않음)
+    ollama_retry_backoff: float = 0.5  # 재시도 지수 백오프 기본 대기 시간 (초)
+    ollama_embed_concurrency: int = 4  # /api/embed 미지원 시 텍스트별 임베딩 동시 요청 수
+    
+    # LLM 호출 제어 (모든 Provider 공통)
+    llm_middleware_enabled: bool = True  # False면 Provider를 직접 호출
+    llm_requests_per_second: float = 5.0  # Provider별 토큰 버킷 속도 (0이면 제한 없음)
+    llm_burst: int = 10  # 토큰 버킷 최대 누적 호출 수
+    llm_max_in_flight: int = 8  # 동시에 진행할 수 있는 최대 호출 수
+    llm_coalesce: bool = True  # 같은 프롬프트의 진행 중 generate 호출 병합
+    llm_max_retries: int = 3  # 429 응답 재시도 횟수
+    llm_backoff_base: float = 1.0  # Retry-After가 없을 때 429 지수 백오프 기본 대기 시간 (초)
+    llm_backoff_max: float = 30.0  # 429 대기 최대 시간 (초)
+    llm_max_queue_seconds: float = 30.0  # 호출 전 대기가 이보다 길면 호출하지 않고 503 응답
+    
+    # Answer Context (답변 프롬프트에 넣을 검색 결과 토큰 예산)
+    answer_context_tokens: int = 3000  # 청크와 그래프 사실에 쓸 최대 토큰 수
+    answer_context_min_chunk_tokens: int = 64  # 예산이 이만큼 이상 남았을 때만 넘치는 청크를 잘라 넣음
+    token_encoding: str = "cl100k_base"  # tiktoken 인코딩 (로드 실패 시 UTF-8 바이트 수로 추정)
     
     # Embedding
     embedding_provider: str = "local"  # local, openai
     embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"
     openai_embedding_model: str = "text-embedding-3-small"
+    embedding_batch_size: int = 64  # 기사 간 청크를 모아 한 번에 임베딩할 목표 배치 크기
+    embedding_preload: bool = True  # 서버 시작 시 로컬 임베딩 모델 미리 로드
+    embedding_warmup: bool = True  # 미리 로드 후 더미 인코딩으로 워밍업
+    embedding_executor_workers: int = 2  # 질의 임베딩을 이벤트 루프 밖에서 계산할 스레드 수
+    embedding_cache_enabled: bool = True  # ETL 임베딩 디스크 캐시 사용 여부
+    embedding_cache_dir: str = ".cache/embeddings"
+    embedding_cache_max_entries: int = 500000  # 초과 시 LRU 축출
+    
+    # Answer Cache (/query 응답 캐시)
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 1000  # 초과 시 LRU 축출
+    answer_cache_ttl_seconds: float = 3600.0
+    answer_cache_similarity_threshold: float = 0.95  # 의미 유사도 캐시 히트 기준 (코사인 유사도)
+    graph_version_path: str = ".cache/graph_version"  # ETL이 적재 후 갱신하는 그래프 버전 마커
+    
+    # Text2Cypher 템플릿 캐시 (같은 형태의 구조적 질의는 LLM 호출 생략)
+    cypher_cache_enabled: bool = True
+    cypher_cache_path: str = ".cache/cypher_templates.json"
+    cypher_cache_max_entries: int = 2000
+    cypher_cache_flush_seconds: float = 60.0  # 변경된 템플릿을 파일에 기록하는 주기 (종료 시에도 기록)
+    
+    # Vector Search
+    vector_search_backend: str = "neo4j"  # neo4j (Neo4j Vector Index), local (로컬 IVF 인덱스), exact (전체 행렬 정확 검색)
+    local_index_path: str = ".cache/vector_index"  # 로컬 IVF 인덱스 디렉터리 (ETL이 재구축)
+    local_index_lists: int = 0  # IVF 클러스터 수 (0이면 sqrt(N) 자동)
+    local_index_probes: int = 8  # 질의당 탐색할 클러스터 수 (클수록 정확, 느림)
+    
+    # Hybrid Search (짧은 키워드 질의: 전문 검색 + 벡터 검색을 RRF로 결합)
+    hybrid_search_enabled: bool = True  # False면 짧은 질의는 Vector Retriever로 라우팅
+    hybrid_candidates: int = 20  # 전문/벡터 검색별 후보 수
+    hybrid_rrf_k: int = 60  # RRF 상수 (클수록 하위 순위 결과의 비중 증가)
+    
+    # Query Planner (/query 검색 단계 동시 실행)
+    query_speculative_retrieval: bool = True  # 의미 캐시 조회와 동시에 임베딩이 필요 없는 검색 시작 (캐시 히트 시 취소)
+    query_expand_split_threshold: int = 500  # Content id가 이보다 많을 때만 그래프 확장 쿼리를 나눠 동시에 실행
+    query_expand_concurrency: int = 4  # 그래프 확장 쿼리를 나눌 때 동시에 실행할 최대 쿼리 수
+    
+    # Retriever Routing (질의 임베딩 최근접 중심 분류기)
+    routing_classifier_enabled: bool = True  # False면 키워드 규칙(RetrieverSelector.route)만 사용
+    routing_min_margin: float = 0.02  # 1·2위 중심 유사도 차이가 이보다 작으면 키워드 규칙 사용
+    routing_cache_size: int = 4096  # 질의별 라우팅 결정 LRU 캐시 크기
+    routing_examples_path: str = ""  # 추가 라벨 예시 JSON ({"retriever 이름": ["질의", ...]})
+    
+    # Observability
+    log_level: str = "INFO"  # DEBUG면 검색 상세 로그(노드 목록, 사용된 쿼리) 출력
+    trace_log: bool = False  # 요청별 단계 span을 JSON 한 줄로 로깅 (app.trace 로거)
+    response_timings: bool = True  # /query 응답에 단계별 소요 시간(timings) 포함
     
     # Chunking
     chunk_size: int = 500
     chunk_overlap: int = 50
     
+    # ETL
+    neo4j_write_batch_size: int = 500  # UNWIND 배치당 행 수 (배치당 1개 트랜잭션)
+    etl_watermark_path: str = ".cache/etl_watermark.json"  # 증분 ETL 워터마크 파일
+    etl_watermark_column: str = "created_at"  # 증분 기준 컬럼 (updated_at 컬럼이 있으면 지정 권장)
+    etl_article_columns: str = "id,title,url,created_at,content,media_company_index,news_category_index"  # 기사 조회 컬럼
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
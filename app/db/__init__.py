@@ -0,0 +1,17 @@
+from .neo4j_pool import (
+    SharedNeo4jDriver,
+    SharedAsyncNeo4jDriver,
+    get_driver,
+    close_driver,
+    get_async_driver,
+    close_async_driver,
+)
+
+__all__ = [
+    "SharedNeo4jDriver",
+    "SharedAsyncNeo4jDriver",
+    "get_driver",
+    "close_driver",
+    "get_async_driver",
+    "close_async_driver",
+]
@@ -0,0 +1,193 @@
+"""프로세스 공용 Neo4j 드라이버 (커넥션 풀)"""
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Iterator, AsyncIterator, Optional
+from neo4j import GraphDatabase, AsyncGraphDatabase, Session, AsyncSession
+from app.config import settings
+
+
+def _driver_options() -> Dict[str, Any]:
+    """동기/비동기 드라이버 공통 풀 설정"""
+    return {
+        "auth": (settings.neo4j_username, settings.neo4j_password),
+        "max_connection_pool_size": settings.neo4j_max_connection_pool_size,
+        "connection_acquisition_timeout": settings.neo4j_connection_acquisition_timeout,
+        "max_connection_lifetime": settings.neo4j_max_connection_lifetime,
+    }
+
+
+class _SessionStats:
+    """세션 사용량 집계"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.total = 0
+        self.failed = 0
+        self.seconds = 0.0
+    
+    def opened(self):
+        with self._lock:
+            self.active += 1
+            self.total += 1
+            self.peak = max(self.peak, self.active)
+    
+    def closed(self, seconds: float, failed: bool):
+        with self._lock:
+            self.active -= 1
+            self.seconds += seconds
+            if failed:
+                self.failed += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_pool_size": settings.neo4j_max_connection_pool_size,
+                "acquisition_timeout": settings.neo4j_connection_acquisition_timeout,
+                "active_sessions": self.active,
+                "peak_sessions": self.peak,
+                "total_sessions": self.total,
+                "failed_sessions": self.failed,
+                "avg_session_ms": self.seconds / self.total * 1000 if self.total else 0.0,
+            }
+
+
+def _pool_connections(driver) -> Dict[str, int]:
+    """드라이버 내부 풀의 커넥션 수 (드라이버 버전에 따라 없을 수 있음)"""
+    pool = getattr(driver, "_pool", None)
+    if pool is None or not hasattr(pool, "connections"):
+        return {}
+    
+    try:
+        addresses = list(pool.connections.keys())
+        return {
+            "open_connections": sum(len(pool.connections.get(address, ())) for address in addresses),
+            "in_use_connections": sum(pool.in_use_connection_count(address) for address in addresses),
+        }
+    except Exception:
+        return {}
+
+
+class SharedNeo4jDriver:
+    """
+    프로세스 전체가 공유하는 Neo4j 드라이버
+    
+    드라이버는 내부에 커넥션 풀을 가지며 스레드 안전하므로 요청마다 새로
+    만들지 않고 하나를 재사용합니다. session()은 neo4j Driver.session()과
+    같은 방식으로 사용하며, 세션 사용량을 집계해 metrics()로 제공합니다.
+    """
+    
+    def __init__(self):
+        self.driver = GraphDatabase.driver(settings.neo4j_uri, **_driver_options())
+        self._stats = _SessionStats()
+    
+    @contextmanager
+    def session(self, **kwargs) -> Iterator[Session]:
+        """세션 열기 (사용 중 세션 수와 사용 시간 집계)"""
+        self._stats.opened()
+        start = time.perf_counter()
+        failed = False
+        try:
+            with self.driver.session(**kwargs) as session:
+                yield session
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._stats.closed(time.perf_counter() - start, failed)
+    
+    def verify_connectivity(self):
+        """서버 연결 확인 (시작 시 첫 커넥션을 미리 생성)"""
+        self.driver.verify_connectivity()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """커넥션 풀 사용량 지표"""
+        return {**self._stats.snapshot(), **_pool_connections(self.driver)}
+    
+    def close(self):
+        """드라이버 종료 (풀의 모든 커넥션 해제)"""
+        self.driver.close()
+
+
+class SharedAsyncNeo4jDriver:
+    """
+    이벤트 루프에서 사용하는 프로세스 공용 비동기 Neo4j 드라이버
+    
+    async 경로(/query)는 이 드라이버를 사용하여 쿼리 대기 중에도
+    이벤트 루프가 다른 요청을 처리할 수 있도록 합니다.
+    """
+    
+    def __init__(self):
+        self.driver = AsyncGraphDatabase.driver(settings.neo4j_uri, **_driver_options())
+        self._stats = _SessionStats()
+    
+    @asynccontextmanager
+    async def session(self, **kwargs) -> AsyncIterator[AsyncSession]:
+        """비동기 세션 열기 (사용 중 세션 수와 사용 시간 집계)"""
+        self._stats.opened()
+        start = time.perf_counter()
+        failed = False
+        try:
+            async with self.driver.session(**kwargs) as session:
+                yield session
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._stats.closed(time.perf_counter() - start, failed)
+    
+    async def verify_connectivity(self):
+        """서버 연결 확인"""
+        await self.driver.verify_connectivity()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """커넥션 풀 사용량 지표"""
+        return {**self._stats.snapshot(), **_pool_connections(self.driver)}
+    
+    async def close(self):
+        """드라이버 종료"""
+        await self.driver.close()
+
+
+_shared_driver: Optional[SharedNeo4jDriver] = None
+_shared_lock = threading.Lock()
+
+
+def get_driver() -> SharedNeo4jDriver:
+    """프로세스 공용 드라이버 반환 (처음 호출 시 생성)"""
+    global _shared_driver
+    if _shared_driver is None:
+        with _shared_lock:
+            if _shared_driver is None:
+                _shared_driver = SharedNeo4jDriver()
+    return _shared_driver
+
+
+def close_driver():
+    """프로세스 공용 드라이버 종료 (애플리케이션 종료 시 호출)"""
+    global _shared_driver
+    with _shared_lock:
+        if _shared_driver is not None:
+            _shared_driver.close()
+            _shared_driver = None
+
+
+_shared_async_driver: Optional[SharedAsyncNeo4jDriver] = None
+
+
+def get_async_driver() -> SharedAsyncNeo4jDriver:
+    """프로세스 공용 비동기 드라이버 반환 (이벤트 루프 스레드에서 호출)"""
+    global _shared_async_driver
+    if _shared_async_driver is None:
+        _shared_async_driver = SharedAsyncNeo4jDriver()
+    return _shared_async_driver
+
+
+async def close_async_driver():
+    """프로세스 공용 비동기 드라이버 종료"""
+    global _shared_async_driver
+    if _shared_async_driver is not None:
+        await _shared_async_driver.close()
+        _shared_async_driver = None
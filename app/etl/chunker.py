@@ -1,4 +1,5 @@
 """Content Chunking"""
+import hashlib
 import re
 from typing import List, Dict, Any
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -178,4 +179,19 @@ class Chunker:
             {"text": chunk, "chunk_index": idx}
             for idx, chunk in enumerate(chunks)
         ]
-
+    
+    @staticmethod
+    def content_id(article_id: Any, chunk_index: int, text: str) -> str:
+        """
+        청크의 결정적 ID 생성 (재적재 시 같은 청크는 같은 ID)
+        
+        Args:
+            article_id: 기사 ID
+            chunk_index: 청크 순서
+            text: 청크 텍스트
+            
+        Returns:
+            "{article_id}-{chunk_index}-{텍스트 sha256 앞 16자리}" 형식의 ID
+        """
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        return f"{article_id}-{chunk_index}-{text_hash}"
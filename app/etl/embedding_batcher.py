@@ -0,0 +1,91 @@
+"""기사 간 청크를 모아 임베딩하는 마이크로 배처"""
+import threading
+from typing import List, Any, Tuple, Optional
+from app.config import settings
+
+
+class EmbeddingBatcher:
+    """
+    여러 기사의 청크를 목표 크기 배치로 모아 EmbeddingGenerator에 전달
+    
+    기사 하나당 청크는 1~5개 수준이라 기사 단위로 임베딩하면 모델 배치가
+    거의 채워지지 않습니다. 배처는 청크를 목표 크기까지 모은 뒤 길이순으로
+    정렬해 배치(패딩 낭비 감소)하고, 결과 벡터를 원래 청크 순서로 되돌립니다.
+    """
+    
+    def __init__(self, embedding_gen, batch_size: Optional[int] = None):
+        self.embedding_gen = embedding_gen
+        self.batch_size = max(1, batch_size or settings.embedding_batch_size)
+        self._pending: List[Tuple[Any, List[str]]] = []
+        self._pending_count = 0
+        self._lock = threading.Lock()
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        텍스트를 길이순으로 정렬해 batch_size 단위로 임베딩
+        
+        Args:
+            texts: 임베딩할 텍스트 리스트
+        
+        Returns:
+            입력 순서와 동일한 임베딩 벡터 리스트
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            batch_vectors = self.embedding_gen.generate([texts[i] for i in indices])
+            for i, vector in zip(indices, batch_vectors):
+                vectors[i] = vector
+        
+        return vectors
+    
+    def add(self, owner: Any, texts: List[str]) -> List[Tuple[Any, List[List[float]]]]:
+        """
+        청크 텍스트를 대기열에 추가하고, 목표 크기에 도달하면 임베딩 수행
+        
+        Args:
+            owner: 결과를 돌려받을 식별자 (예: 기사 배치)
+            texts: owner의 청크 텍스트 리스트
+        
+        Returns:
+            임베딩이 완료된 (owner, vectors) 리스트 (목표 크기 미만이면 빈 리스트)
+        """
+        with self._lock:
+            self._pending.append((owner, texts))
+            self._pending_count += len(texts)
+            if self._pending_count < self.batch_size:
+                return []
+            groups = self._drain()
+        
+        return self._embed_groups(groups)
+    
+    def flush(self) -> List[Tuple[Any, List[List[float]]]]:
+        """대기 중인 모든 청크를 임베딩하여 반환"""
+        with self._lock:
+            groups = self._drain()
+        
+        return self._embed_groups(groups)
+    
+    def _drain(self) -> List[Tuple[Any, List[str]]]:
+        groups = self._pending
+        self._pending = []
+        self._pending_count = 0
+        return groups
+    
+    def _embed_groups(self, groups: List[Tuple[Any, List[str]]]) -> List[Tuple[Any, List[List[float]]]]:
+        """대기열 묶음을 한 번에 임베딩한 뒤 owner별로 벡터 분배"""
+        if not groups:
+            return []
+        
+        flat_texts = [text for _, texts in groups for text in texts]
+        vectors = self.embed(flat_texts) if flat_texts else []
+        
+        results = []
+        offset = 0
+        for owner, texts in groups:
+            results.append((owner, vectors[offset:offset + len(texts)]))
+            offset += len(texts)
+        
+        return results
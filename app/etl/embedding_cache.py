@@ -0,0 +1,238 @@
+"""콘텐츠 해시 기반 임베딩 캐시 (디스크 저장)"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import List, Dict, Optional
+import numpy as np
+from app.config import settings
+
+
+class EmbeddingCache:
+    """
+    (provider, model, sha256(text)) 키로 임베딩을 디스크에 보관하는 캐시
+    
+    provider/model 조합마다 디렉토리 하나를 사용하며, 슬롯 단위로
+    다음 파일을 memory-map 하여 읽고 씁니다.
+    - vectors.f32: float32 임베딩 행렬 (capacity x dim)
+    - keys.bin: 슬롯별 sha256 다이제스트 (32바이트, 빈 슬롯은 0)
+    - lru.i8: 슬롯별 마지막 사용 시점 (int64, 축출 순서 결정)
+    - meta.json: 차원, 용량 등 메타데이터
+    
+    항목 수가 max_entries에 도달하면 가장 오래 사용되지 않은 항목부터 축출합니다.
+    """
+    
+    # 용량 확장 시 최소 슬롯 수
+    MIN_CAPACITY = 1024
+    
+    # 가득 찼을 때 한 번에 축출할 비율
+    EVICT_FRACTION = 0.1
+    
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        cache_dir: Optional[str] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.provider = provider
+        self.model = model
+        self.max_entries = max(1, max_entries or settings.embedding_cache_max_entries)
+        
+        namespace = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{provider}__{model}")
+        self.path = os.path.join(cache_dir or settings.embedding_cache_dir, namespace)
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._dim: Optional[int] = None
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._lru: Optional[np.memmap] = None
+        self._slots: Dict[bytes, int] = {}
+        self._free: List[int] = []
+        self._tick = 0
+        
+        self._load()
+    
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """텍스트의 sha256 다이제스트"""
+        return hashlib.sha256(text.encode("utf-8")).digest()
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+    
+    def _load(self):
+        """기존 캐시 파일이 있으면 memory-map 하여 인덱스 복원"""
+        meta_path = self._file("meta.json")
+        if not os.path.exists(meta_path):
+            return
+        
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._open(meta["dim"], meta["capacity"])
+        except Exception as e:
+            print(f"⚠️  임베딩 캐시 로드 실패, 새로 생성합니다 ({self.path}): {e}")
+            self._dim = None
+            self._capacity = 0
+            self._slots = {}
+            self._free = []
+            return
+        
+        occupied = self._keys.any(axis=1)
+        for slot in range(self._capacity):
+            if occupied[slot]:
+                self._slots[self._keys[slot].tobytes()] = slot
+            else:
+                self._free.append(slot)
+        self._tick = int(self._lru.max()) if self._capacity else 0
+    
+    def _open(self, dim: int, capacity: int):
+        """파일을 capacity 크기로 확장한 뒤 memory-map"""
+        os.makedirs(self.path, exist_ok=True)
+        
+        for name, row_bytes in (("vectors.f32", dim * 4), ("keys.bin", 32), ("lru.i8", 8)):
+            file_path = self._file(name)
+            mode = "r+b" if os.path.exists(file_path) else "w+b"
+            with open(file_path, mode) as f:
+                f.truncate(capacity * row_bytes)
+        
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(capacity, dim))
+        self._keys = np.memmap(self._file("keys.bin"), dtype=np.uint8, mode="r+", shape=(capacity, 32))
+        self._lru = np.memmap(self._file("lru.i8"), dtype=np.int64, mode="r+", shape=(capacity,))
+        self._dim = dim
+        self._capacity = capacity
+        
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "provider": self.provider,
+                "model": self.model,
+                "dim": dim,
+                "capacity": capacity
+            }, f)
+    
+    def _grow(self):
+        """용량 확장 (max_entries까지 2배씩)"""
+        old_capacity = self._capacity
+        new_capacity = min(max(old_capacity * 2, self.MIN_CAPACITY), self.max_entries)
+        self._flush_unlocked()
+        self._vectors = self._keys = self._lru = None
+        self._open(self._dim, new_capacity)
+        self._free.extend(range(old_capacity, new_capacity))
+    
+    def _evict(self):
+        """가장 오래 사용되지 않은 항목을 EVICT_FRACTION 만큼 축출"""
+        count = max(1, int(len(self._slots) * self.EVICT_FRACTION))
+        used_slots = np.fromiter(self._slots.values(), dtype=np.int64)
+        oldest = used_slots[np.argsort(self._lru[used_slots], kind="stable")[:count]]
+        
+        for slot in oldest.tolist():
+            self._slots.pop(self._keys[slot].tobytes(), None)
+            self._keys[slot] = 0
+            self._free.append(slot)
+        
+        self.evictions += len(oldest)
+    
+    def _allocate(self) -> int:
+        if not self._free:
+            if self._capacity < self.max_entries:
+                self._grow()
+            else:
+                self._evict()
+        return self._free.pop()
+    
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        캐시 조회
+        
+        Args:
+            texts: 조회할 텍스트 리스트
+        
+        Returns:
+            텍스트별 임베딩 (캐시에 없으면 None)
+        """
+        results: List[Optional[List[float]]] = []
+        with self._lock:
+            for text in texts:
+                slot = self._slots.get(self.digest(text))
+                if slot is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    self._tick += 1
+                    self._lru[slot] = self._tick
+                    results.append(self._vectors[slot].tolist())
+        return results
+    
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """
+        임베딩 저장
+        
+        Args:
+            texts: 원본 텍스트 리스트
+            embeddings: 텍스트별 임베딩
+        """
+        if not texts:
+            return
+        
+        with self._lock:
+            if self._dim is None:
+                self._open(len(embeddings[0]), min(self.MIN_CAPACITY, self.max_entries))
+                self._free = list(range(self._capacity - 1, -1, -1))
+            
+            for text, embedding in zip(texts, embeddings):
+                if len(embedding) != self._dim:
+                    raise ValueError(
+                        f"임베딩 차원이 캐시와 다릅니다: {len(embedding)} != {self._dim} ({self.path})"
+                    )
+                
+                key = self.digest(text)
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._allocate()
+                    self._slots[key] = slot
+                
+                # 벡터를 먼저 쓰고 키를 기록 (중단 시 키가 잘못된 벡터를 가리키지 않도록)
+                self._vectors[slot] = np.asarray(embedding, dtype=np.float32)
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self._tick += 1
+                self._lru[slot] = self._tick
+    
+    def stats(self) -> Dict[str, float]:
+        """히트/미스 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._slots),
+            "capacity": self._capacity,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+    
+    def _flush_unlocked(self):
+        for mm in (self._vectors, self._keys, self._lru):
+            if mm is not None:
+                mm.flush()
+    
+    def flush(self):
+        """memory-map 변경 사항을 디스크에 기록"""
+        with self._lock:
+            self._flush_unlocked()
+    
+    def close(self):
+        """디스크 기록 후 memory-map 해제"""
+        with self._lock:
+            self._flush_unlocked()
+            self._vectors = self._keys = self._lru = None
@@ -1,7 +1,12 @@
 """Embedding Generator"""
+import asyncio
 import os
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any
 from app.config import settings
+from app.etl.embedding_cache import EmbeddingCache
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
 
@@ -9,14 +14,132 @@ from openai import OpenAI
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 
+# 프로세스 전역 SentenceTransformer 레지스트리 (모델 이름 → 모델/락/로드 정보)
+_models: Dict[str, SentenceTransformer] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+_model_info: Dict[str, Dict[str, Any]] = {}
+_registry_lock = threading.RLock()  # get_embedding_generator → load_embedding_model 재진입 허용
+
+
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    """
+    SentenceTransformer 모델을 프로세스당 한 번만 로드하여 반환
+    
+    Args:
+        model_name: 모델 이름 또는 경로
+    
+    Returns:
+        공유 모델 인스턴스
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    
+    with _registry_lock:
+        if model_name not in _models:
+            start = time.perf_counter()
+            _models[model_name] = SentenceTransformer(model_name)
+            _model_locks[model_name] = threading.Lock()
+            _model_info[model_name] = {
+                "model": model_name,
+                "load_seconds": round(time.perf_counter() - start, 3),
+                "warmup_seconds": None,
+                "loaded_at": time.time(),
+            }
+        return _models[model_name]
+
+
+def preload_embedding_model(warmup: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    설정된 로컬 임베딩 모델을 미리 로드 (서버 시작 시 호출)
+    
+    Args:
+        warmup: True면 더미 문장을 한 번 인코딩하여 첫 요청 지연 제거
+    
+    Returns:
+        모델 로드 정보 (로컬 Provider가 아니면 None)
+    """
+    if settings.embedding_provider != "local":
+        return None
+    
+    model_name = settings.embedding_model
+    model = load_embedding_model(model_name)
+    
+    if warmup and _model_info[model_name]["warmup_seconds"] is None:
+        start = time.perf_counter()
+        with _model_locks[model_name]:
+            model.encode(["warmup"], show_progress_bar=False)
+        _model_info[model_name]["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    
+    return _model_info[model_name]
+
+
+def embedding_model_info() -> Dict[str, Any]:
+    """로드된 임베딩 모델 정보 (헬스 체크용)"""
+    info = _model_info.get(settings.embedding_model) if settings.embedding_provider == "local" else None
+    return {
+        "provider": settings.embedding_provider,
+        "loaded": info is not None,
+        **(info or {}),
+    }
+
+
+_encode_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_encode_executor() -> ThreadPoolExecutor:
+    """
+    async 경로에서 임베딩 계산을 실행하는 크기 제한 스레드 풀
+    
+    동시 질의가 몰려도 encode 스레드 수는 embedding_executor_workers로 제한되고,
+    나머지는 이벤트 루프를 막지 않은 채 풀 대기열에서 기다립니다.
+    """
+    global _encode_executor
+    if _encode_executor is None:
+        with _registry_lock:
+            if _encode_executor is None:
+                _encode_executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.embedding_executor_workers),
+                    thread_name_prefix="embedding"
+                )
+    return _encode_executor
+
+
+def shutdown_encode_executor():
+    """임베딩 스레드 풀 종료 (서버 종료 시 호출)"""
+    global _encode_executor
+    if _encode_executor is not None:
+        _encode_executor.shutdown(wait=False)
+        _encode_executor = None
+
+
+_shared_generator: Optional["EmbeddingGenerator"] = None
+
+
+def get_embedding_generator() -> "EmbeddingGenerator":
+    """질의 시점에 사용하는 프로세스 공용 EmbeddingGenerator"""
+    global _shared_generator
+    if _shared_generator is None:
+        with _registry_lock:
+            if _shared_generator is None:
+                _shared_generator = EmbeddingGenerator()
+    return _shared_generator
+
+
 class EmbeddingGenerator:
     """임베딩 생성 클래스"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = False):
+        """
+        Args:
+            use_cache: True면 (provider, model, 텍스트 해시) 기반 디스크 캐시를 먼저 조회
+        """
         self.provider = settings.embedding_provider
         
         if self.provider == "local":
-            self.model = SentenceTransformer(settings.embedding_model)
+            # 모델은 프로세스당 한 번만 로드하여 공유
+            self.model = load_embedding_model(settings.embedding_model)
+            self._encode_lock = _model_locks[settings.embedding_model]
             self.openai_client = None
         elif self.provider == "openai":
             if not settings.openai_api_key:
@@ -25,19 +148,58 @@ class EmbeddingGenerator:
             self.model = None
         else:
             raise ValueError(f"지원하지 않는 임베딩 Provider: {self.provider}")
+        
+        self.cache: Optional[EmbeddingCache] = None
+        if use_cache:
+            self.cache = EmbeddingCache(self.provider, self.model_name)
+    
+    @property
+    def model_name(self) -> str:
+        """현재 Provider가 사용하는 임베딩 모델 이름"""
+        if self.provider == "openai":
+            return settings.openai_embedding_model
+        return settings.embedding_model
+    
+    def close(self):
+        """캐시 디스크 기록"""
+        if self.cache is not None:
+            self.cache.close()
     
     def generate(self, texts: List[str]) -> List[List[float]]:
         """
-        텍스트 리스트에 대한 임베딩 생성
+        텍스트 리스트에 대한 임베딩 생성 (캐시가 있으면 캐시 미스만 계산)
         
         Args:
             texts: 임베딩할 텍스트 리스트
-            
+        
         Returns:
             임베딩 벡터 리스트
         """
+        if self.cache is None:
+            return self._compute(texts)
+        
+        embeddings = self.cache.get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self._compute(missing_texts)
+            self.cache.put_many(missing_texts, computed)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+        
+        return embeddings
+    
+    def _compute(self, texts: List[str]) -> List[List[float]]:
+        """모델/API로 임베딩 계산"""
         if self.provider == "local":
-            embeddings = self.model.encode(texts, show_progress_bar=False)
+            # 공유 모델에 대한 동시 encode 호출 직렬화 (스레드 안전)
+            with self._encode_lock:
+                embeddings = self.model.encode(
+                    texts,
+                    batch_size=settings.embedding_batch_size,
+                    show_progress_bar=False
+                )
             return embeddings.tolist()
         elif self.provider == "openai":
             response = self.openai_client.embeddings.create(
@@ -54,9 +216,18 @@ class EmbeddingGenerator:
         
         Args:
             text: 임베딩할 텍스트
-            
+        
         Returns:
             임베딩 벡터
         """
         return self.generate([text])[0]
+    
+    async def agenerate(self, texts: List[str]) -> List[List[float]]:
+        """임베딩 생성을 전용 스레드 풀에서 실행 (이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_encode_executor(), self.generate, texts)
+    
+    async def agenerate_single(self, text: str) -> List[float]:
+        """단일 텍스트 임베딩을 전용 스레드 풀에서 실행"""
+        return (await self.agenerate([text]))[0]
 
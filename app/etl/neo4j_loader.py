@@ -1,5 +1,5 @@
 """Neo4j 데이터 로더"""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 import uuid
 from neo4j import GraphDatabase
 from app.config import settings
@@ -8,11 +8,78 @@ from app.config import settings
 class Neo4jLoader:
     """Neo4j 데이터 적재 클래스"""
     
-    def __init__(self):
+    # UNWIND 기반 벌크 쿼리 (행 리스트를 한 번의 왕복으로 적재)
+    BULK_MEDIA_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (m:Media {id: row.id})
+    SET m.name = row.name
+    """
+    
+    BULK_CATEGORY_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (c:Category {id: row.id})
+    SET c.name = row.name
+    """
+    
+    BULK_ARTICLE_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (a:Article {id: row.id})
+    SET a.title = row.title,
+        a.url = row.url,
+        a.created_at = row.created_at
+    """
+    
+    BULK_CONTENT_CYPHER = """
+    UNWIND $rows AS row
+    MERGE (c:Content {id: row.id})
+    SET c.text = row.text,
+        c.chunk_index = row.chunk_index,
+        c.embedding = row.embedding
+    """
+    
+    BULK_PUBLISHED_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (m:Media {id: row.media_id})
+    MATCH (a:Article {id: row.article_id})
+    MERGE (m)-[:PUBLISHED]->(a)
+    """
+    
+    BULK_BELONGS_TO_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (a:Article {id: row.article_id})
+    MATCH (c:Category {id: row.category_id})
+    MERGE (a)-[:BELONGS_TO]->(c)
+    """
+    
+    BULK_HAS_CHUNK_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (a:Article {id: row.article_id})
+    MATCH (c:Content {id: row.content_id})
+    MERGE (a)-[:HAS_CHUNK]->(c)
+    """
+    
+    # 기사별로 keep_ids에 없는 청크 삭제 (본문이 짧아지거나 바뀐 경우)
+    DELETE_STALE_CHUNKS_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (:Article {id: row.article_id})-[:HAS_CHUNK]->(c:Content)
+    WHERE NOT c.id IN row.keep_ids
+    DETACH DELETE c
+    """
+    
+    # MERGE가 인덱스를 사용하도록 id 유니크 제약조건 생성
+    CONSTRAINTS = [
+        "CREATE CONSTRAINT media_id IF NOT EXISTS FOR (n:Media) REQUIRE n.id IS UNIQUE",
+        "CREATE CONSTRAINT category_id IF NOT EXISTS FOR (n:Category) REQUIRE n.id IS UNIQUE",
+        "CREATE CONSTRAINT article_id IF NOT EXISTS FOR (n:Article) REQUIRE n.id IS UNIQUE",
+        "CREATE CONSTRAINT content_id IF NOT EXISTS FOR (n:Content) REQUIRE n.id IS UNIQUE",
+    ]
+    
+    def __init__(self, batch_size: Optional[int] = None):
         self.driver = GraphDatabase.driver(
             settings.neo4j_uri,
             auth=(settings.neo4j_username, settings.neo4j_password)
         )
+        self.batch_size = batch_size or settings.neo4j_write_batch_size
     
     def close(self):
         """드라이버 종료"""
@@ -113,29 +180,135 @@ class Neo4jLoader:
                 content_id=content_id
             )
     
-    def batch_create_nodes(self, nodes: List[Dict[str, Any]]):
-        """배치로 노드 생성 (성능 최적화)"""
+    def _write_in_batches(self, cypher: str, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """
+        UNWIND 쿼리를 배치 단위로 실행 (배치당 1개 쓰기 트랜잭션)
+        
+        Args:
+            cypher: `$rows` 파라미터를 UNWIND하는 쿼리
+            rows: 적재할 행 리스트
+            batch_size: 배치 크기 (None이면 인스턴스 기본값)
+            
+        Returns:
+            전송된 행 수
+        """
+        if not rows:
+            return 0
+        
+        size = batch_size or self.batch_size
+        
         with self.driver.session() as session:
-            for node in nodes:
-                node_type = node["type"]
-                if node_type == "Media":
-                    self.create_media(node["id"], node["name"])
-                elif node_type == "Category":
-                    self.create_category(node["id"], node["name"])
-                elif node_type == "Article":
-                    self.create_article(
-                        node["id"],
-                        node["title"],
-                        node["url"],
-                        node["created_at"]
-                    )
-                elif node_type == "Content":
-                    self.create_content(
-                        node["id"],
-                        node["text"],
-                        node["chunk_index"],
-                        node["embedding"]
-                    )
+            for start in range(0, len(rows), size):
+                batch = rows[start:start + size]
+                session.execute_write(lambda tx, b=batch: tx.run(cypher, rows=b).consume())
+        
+        return len(rows)
+    
+    def bulk_create_media(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Media 노드 벌크 생성 (rows: id, name)"""
+        rows = [{"id": str(row["id"]), "name": row["name"]} for row in rows]
+        return self._write_in_batches(self.BULK_MEDIA_CYPHER, rows, batch_size)
+    
+    def bulk_create_categories(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Category 노드 벌크 생성 (rows: id, name)"""
+        rows = [{"id": str(row["id"]), "name": row["name"]} for row in rows]
+        return self._write_in_batches(self.BULK_CATEGORY_CYPHER, rows, batch_size)
+    
+    def bulk_create_articles(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Article 노드 벌크 생성 (rows: id, title, url, created_at)"""
+        rows = [
+            {
+                "id": str(row["id"]),
+                "title": row["title"],
+                "url": row["url"],
+                "created_at": str(row["created_at"])
+            }
+            for row in rows
+        ]
+        return self._write_in_batches(self.BULK_ARTICLE_CYPHER, rows, batch_size)
+    
+    def bulk_create_contents(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Content 노드 벌크 생성 (rows: id, text, chunk_index, embedding)"""
+        rows = [
+            {
+                "id": row["id"],
+                "text": row["text"],
+                "chunk_index": row["chunk_index"],
+                "embedding": row["embedding"]
+            }
+            for row in rows
+        ]
+        return self._write_in_batches(self.BULK_CONTENT_CYPHER, rows, batch_size)
+    
+    def bulk_create_published_relationships(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """PUBLISHED 관계 벌크 생성 (rows: media_id, article_id)"""
+        rows = [
+            {"media_id": str(row["media_id"]), "article_id": str(row["article_id"])}
+            for row in rows
+        ]
+        return self._write_in_batches(self.BULK_PUBLISHED_CYPHER, rows, batch_size)
+    
+    def bulk_create_belongs_to_relationships(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """BELONGS_TO 관계 벌크 생성 (rows: article_id, category_id)"""
+        rows = [
+            {"article_id": str(row["article_id"]), "category_id": str(row["category_id"])}
+            for row in rows
+        ]
+        return self._write_in_batches(self.BULK_BELONGS_TO_CYPHER, rows, batch_size)
+    
+    def bulk_create_has_chunk_relationships(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """HAS_CHUNK 관계 벌크 생성 (rows: article_id, content_id)"""
+        rows = [
+            {"article_id": str(row["article_id"]), "content_id": row["content_id"]}
+            for row in rows
+        ]
+        return self._write_in_batches(self.BULK_HAS_CHUNK_CYPHER, rows, batch_size)
+    
+    def get_chunk_ids(self, article_ids: List[Any]) -> Set[str]:
+        """기사들에 연결된 기존 Content 청크 ID 조회"""
+        if not article_ids:
+            return set()
+        
+        with self.driver.session() as session:
+            result = session.run(
+                """
+                UNWIND $article_ids AS article_id
+                MATCH (:Article {id: article_id})-[:HAS_CHUNK]->(c:Content)
+                RETURN c.id AS id
+                """,
+                article_ids=[str(article_id) for article_id in article_ids]
+            )
+            return {record["id"] for record in result}
+    
+    def delete_stale_chunks(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """기사별로 현재 청크 목록에 없는 Content 삭제 (rows: article_id, keep_ids)"""
+        rows = [
+            {"article_id": str(row["article_id"]), "keep_ids": list(row["keep_ids"])}
+            for row in rows
+        ]
+        return self._write_in_batches(self.DELETE_STALE_CHUNKS_CYPHER, rows, batch_size)
+    
+    def ensure_constraints(self):
+        """노드 id 유니크 제약조건 생성 (MERGE 조회를 인덱스로 처리)"""
+        with self.driver.session() as session:
+            for cypher in self.CONSTRAINTS:
+                try:
+                    session.run(cypher).consume()
+                except Exception as e:
+                    # 기존 중복 노드가 있으면 생성 실패 (--clear 후 재적재 권장)
+                    print(f"⚠️  제약조건 생성 실패: {e}")
+    
+    def batch_create_nodes(self, nodes: List[Dict[str, Any]], batch_size: Optional[int] = None):
+        """배치로 노드 생성 (타입별로 묶어 UNWIND 벌크 적재)"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for node in nodes:
+            grouped.setdefault(node["type"], []).append(node)
+        
+        # 관계 생성 시 MATCH가 가능하도록 상위 노드부터 적재
+        self.bulk_create_media(grouped.get("Media", []), batch_size)
+        self.bulk_create_categories(grouped.get("Category", []), batch_size)
+        self.bulk_create_articles(grouped.get("Article", []), batch_size)
+        self.bulk_create_contents(grouped.get("Content", []), batch_size)
     
     def clear_all(self):
         """모든 노드와 관계 삭제 (테스트용)"""
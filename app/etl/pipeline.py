@@ -0,0 +1,429 @@
+"""스테이지 기반 동시 ETL 파이프라인"""
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Callable, Optional, Iterable, Iterator
+from tqdm import tqdm
+from app.etl.chunker import Chunker
+from app.etl.embedding_batcher import EmbeddingBatcher
+
+
+# 스테이지 종료 신호
+_SENTINEL = object()
+
+# 큐 대기 시 중단 이벤트를 확인하는 주기 (초)
+_POLL_INTERVAL = 0.2
+
+
+class StageStats:
+    """스테이지별 처리량 통계"""
+    
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def record(self, items: int, seconds: float):
+        """작업 1건의 처리 결과 기록"""
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+    
+    @property
+    def wall_seconds(self) -> float:
+        """스테이지 시작부터 종료까지 경과 시간"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at or time.perf_counter()
+        return end - self.started_at
+    
+    @property
+    def throughput(self) -> float:
+        """초당 처리량 (경과 시간 기준)"""
+        wall = self.wall_seconds
+        return self.items / wall if wall > 0 else 0.0
+    
+    def summary(self) -> str:
+        """통계 요약 문자열"""
+        return (
+            f"{self.name:<6} {self.items:>8} {self.unit:<8} "
+            f"경과 {self.wall_seconds:7.1f}s  작업 {self.busy_seconds:7.1f}s  "
+            f"{self.throughput:8.1f} {self.unit}/s"
+        )
+
+
+class ArticleBatch:
+    """스테이지 사이를 이동하는 기사 배치"""
+    
+    def __init__(self, articles: List[Dict[str, Any]], seq: int = 0):
+        self.articles = articles
+        # 조회 순서 (워터마크를 연속으로 적재된 페이지까지만 전진시키는 데 사용)
+        self.seq = seq
+        # (article_id, chunk) 쌍 리스트 - chunk는 text, chunk_index 포함
+        self.chunks: List[tuple] = []
+        self.embeddings: List[List[float]] = []
+
+
+class _Stage:
+    """워커 풀 하나로 구성된 파이프라인 스테이지"""
+    
+    def __init__(
+        self,
+        pipeline: "ETLPipeline",
+        stats: StageStats,
+        fn: Callable[[Any], Any],
+        workers: int,
+        in_queue: Optional[queue.Queue],
+        out_queue: Optional[queue.Queue],
+        flush: Optional[Callable[[], Any]] = None,
+    ):
+        self.pipeline = pipeline
+        self.stats = stats
+        self.fn = fn
+        self.flush = flush
+        self.workers = max(1, workers)
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.downstream: Optional["_Stage"] = None
+        self._alive = self.workers
+        self._lock = threading.Lock()
+        self.threads: List[threading.Thread] = []
+    
+    def start(self):
+        """워커 스레드 시작"""
+        self.stats.started_at = time.perf_counter()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work,
+                name=f"etl-{self.stats.name}-{i}",
+                daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+    
+    def _work(self):
+        try:
+            while True:
+                if self.in_queue is None:
+                    # 소스 스테이지: fn이 직접 다음 항목을 생성 (소진 시 StopIteration)
+                    if self.pipeline._stop.is_set():
+                        break
+                    try:
+                        if not self._run(self.fn):
+                            break
+                    except StopIteration:
+                        break
+                    continue
+                
+                item = self.pipeline._get(self.in_queue)
+                if item is _SENTINEL:
+                    break
+                
+                if not self._run(self.fn, item):
+                    break
+        except Exception as e:
+            self.pipeline._fail(self.stats.name, e)
+        finally:
+            self._worker_done()
+    
+    def _run(self, fn: Callable, *args) -> bool:
+        """작업 실행 후 결과를 하위 큐로 전달 (중단 시 False)"""
+        start = time.perf_counter()
+        results, count = fn(*args)
+        self.stats.record(count, time.perf_counter() - start)
+        
+        if self.out_queue is not None:
+            for result in results:
+                if not self.pipeline._put(self.out_queue, result):
+                    return False
+        return True
+    
+    def _worker_done(self):
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        
+        if last:
+            # 스테이지 내부 버퍼에 남은 작업 처리 (예: 임베딩 마이크로 배치)
+            if self.flush is not None and not self.pipeline._stop.is_set():
+                try:
+                    self._run(self.flush)
+                except Exception as e:
+                    self.pipeline._fail(self.stats.name, e)
+            
+            self.stats.finished_at = time.perf_counter()
+            # 마지막 워커가 하위 스테이지 워커 수만큼 종료 신호 전달
+            if self.downstream is not None:
+                for _ in range(self.downstream.workers):
+                    self.pipeline._put(self.out_queue, _SENTINEL, force=True)
+
+
+class ETLPipeline:
+    """
+    Supabase 조회 → 청킹 → 임베딩 → Neo4j 적재를 스테이지별 워커 풀로 동시 실행
+    
+    스테이지 사이는 크기가 제한된 큐로 연결되어 하위 스테이지가 느리면
+    상위 스테이지가 대기합니다 (backpressure). 네트워크 대기(조회/적재)와
+    CPU 작업(청킹/임베딩)이 겹쳐서 실행됩니다.
+    """
+    
+    def __init__(
+        self,
+        chunker,
+        embedding_gen,
+        loader,
+        queue_size: int = 4,
+        chunk_workers: int = 2,
+        embed_workers: int = 1,
+        write_workers: int = 2,
+        embedding_batch_size: Optional[int] = None,
+    ):
+        self.chunker = chunker
+        self.embedding_gen = embedding_gen
+        self.loader = loader
+        self.queue_size = queue_size
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.write_workers = write_workers
+        self.batcher = EmbeddingBatcher(embedding_gen, batch_size=embedding_batch_size)
+        
+        self.stats: Dict[str, StageStats] = {
+            "fetch": StageStats("fetch", "기사"),
+            "chunk": StageStats("chunk", "청크"),
+            "embed": StageStats("embed", "청크"),
+            "write": StageStats("write", "기사"),
+        }
+        
+        self._stop = threading.Event()
+        self._errors: List[tuple] = []
+        self._progress: Optional[tqdm] = None
+        self._progress_lock = threading.Lock()
+        
+        # 기사 페이지 이터레이터 (keyset 커서로 순서대로 조회)
+        self._page_iter: Optional[Iterator[List[Dict[str, Any]]]] = None
+        self._page_lock = threading.Lock()
+        self._next_seq = 0
+        
+        # 적재 완료 추적: seq → 페이지 마지막 기사 (빈 페이지는 None)
+        self._written: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._next_commit = 0
+        self._commit_lock = threading.Lock()
+        self._on_commit: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.committed: Optional[Dict[str, Any]] = None
+    
+    def _put(self, q: queue.Queue, item: Any, force: bool = False) -> bool:
+        """중단 이벤트를 확인하며 큐에 삽입 (force=True면 중단 중에도 시도)"""
+        while True:
+            if self._stop.is_set() and not force:
+                return False
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                if self._stop.is_set() and force:
+                    # 중단 중에는 하위 워커가 이미 종료했을 수 있으므로 포기
+                    return False
+    
+    def _get(self, q: queue.Queue) -> Any:
+        """중단 이벤트를 확인하며 큐에서 꺼냄 (중단 시 종료 신호 반환)"""
+        while True:
+            if self._stop.is_set():
+                return _SENTINEL
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+    
+    def _fail(self, stage_name: str, error: Exception):
+        """워커 오류 기록 후 전체 파이프라인 중단"""
+        print(f"⚠️  [{stage_name}] 스테이지 오류: {error}")
+        self._errors.append((stage_name, error))
+        self._stop.set()
+    
+    def _fetch_next(self):
+        """페이지 이터레이터에서 다음 페이지 조회 (소진 시 StopIteration)"""
+        with self._page_lock:
+            articles = next(self._page_iter)
+            seq = self._next_seq
+            self._next_seq += 1
+        
+        if not articles:
+            self._mark_written(seq, None)
+            return [], 0
+        return [ArticleBatch(articles, seq)], len(articles)
+    
+    def _mark_written(self, seq: int, last_article: Optional[Dict[str, Any]]):
+        """페이지 적재 완료 기록 후, 연속으로 완료된 지점까지 커밋 위치 전진"""
+        with self._commit_lock:
+            self._written[seq] = last_article
+            advanced = False
+            while self._next_commit in self._written:
+                last = self._written.pop(self._next_commit)
+                if last is not None:
+                    self.committed = last
+                    advanced = True
+                self._next_commit += 1
+            
+            if advanced and self._on_commit is not None:
+                self._on_commit(self.committed)
+    
+    def _chunk(self, batch: ArticleBatch):
+        """배치 내 모든 기사 본문 청킹"""
+        for article in batch.articles:
+            if article.get("content"):
+                for chunk in self.chunker.chunk_article(article["content"]):
+                    batch.chunks.append((article["id"], chunk))
+        return [batch], len(batch.chunks)
+    
+    def _embed(self, batch: ArticleBatch):
+        """청크를 마이크로 배처에 넣고, 목표 크기가 채워지면 여러 배치를 한 번에 임베딩"""
+        if not batch.chunks:
+            return [batch], 0
+        
+        texts = [chunk["text"] for _, chunk in batch.chunks]
+        return self._collect_embedded(self.batcher.add(batch, texts))
+    
+    def _flush_embeddings(self):
+        """스트림 종료 시 배처에 남은 청크 임베딩"""
+        return self._collect_embedded(self.batcher.flush())
+    
+    def _collect_embedded(self, ready: List[tuple]):
+        """임베딩이 완료된 배치에 벡터를 할당"""
+        batches = []
+        count = 0
+        for batch, vectors in ready:
+            batch.embeddings = vectors
+            batches.append(batch)
+            count += len(vectors)
+        return batches, count
+    
+    def _write(self, batch: ArticleBatch):
+        """
+        배치를 UNWIND 벌크 쿼리로 Neo4j에 적재
+        
+        청크 ID는 (기사 ID, 청크 순서, 텍스트 해시)로 결정되므로, 재적재 시
+        이미 있는 청크는 건너뛰고 새로 생기거나 바뀐 청크만 쓰며,
+        현재 본문에 없는 청크는 삭제합니다.
+        """
+        article_ids = [article["id"] for article in batch.articles]
+        existing_ids = self.loader.get_chunk_ids(article_ids)
+        
+        published_rows = []
+        belongs_to_rows = []
+        content_rows = []
+        has_chunk_rows = []
+        keep_ids: Dict[Any, List[str]] = {article_id: [] for article_id in article_ids}
+        
+        for article in batch.articles:
+            if article.get("media_company_index"):
+                published_rows.append({
+                    "media_id": article["media_company_index"],
+                    "article_id": article["id"]
+                })
+            if article.get("news_category_index"):
+                belongs_to_rows.append({
+                    "article_id": article["id"],
+                    "category_id": article["news_category_index"]
+                })
+        
+        for (article_id, chunk), embedding in zip(batch.chunks, batch.embeddings):
+            content_id = Chunker.content_id(article_id, chunk["chunk_index"], chunk["text"])
+            keep_ids[article_id].append(content_id)
+            if content_id in existing_ids:
+                continue
+            
+            content_rows.append({
+                "id": content_id,
+                "text": chunk["text"],
+                "chunk_index": chunk["chunk_index"],
+                "embedding": embedding
+            })
+            has_chunk_rows.append({
+                "article_id": article_id,
+                "content_id": content_id
+            })
+        
+        # 노드 → 관계 순으로 적재 (관계 MATCH가 노드를 찾을 수 있도록)
+        self.loader.bulk_create_articles(batch.articles)
+        self.loader.delete_stale_chunks([
+            {"article_id": article_id, "keep_ids": ids}
+            for article_id, ids in keep_ids.items()
+        ])
+        self.loader.bulk_create_contents(content_rows)
+        self.loader.bulk_create_published_relationships(published_rows)
+        self.loader.bulk_create_belongs_to_relationships(belongs_to_rows)
+        self.loader.bulk_create_has_chunk_relationships(has_chunk_rows)
+        
+        if self._progress is not None:
+            with self._progress_lock:
+                self._progress.update(len(batch.articles))
+        
+        self._mark_written(batch.seq, batch.articles[-1])
+        
+        return [], len(batch.articles)
+    
+    def run(
+        self,
+        pages: Iterable[List[Dict[str, Any]]],
+        on_commit: Optional[Callable[[Dict[str, Any]], None]] = None,
+        total_count: Optional[int] = None
+    ) -> Dict[str, StageStats]:
+        """
+        파이프라인 실행
+        
+        Args:
+            pages: 기사 페이지 이터러블 (예: SupabaseClient.iter_articles)
+            on_commit: 앞선 페이지가 모두 적재될 때마다 마지막 기사로 호출되는 콜백
+            total_count: 진행률 표시용 전체 기사 수 (선택)
+        
+        Returns:
+            스테이지 이름별 처리량 통계
+        """
+        self._on_commit = on_commit
+        self._page_iter = iter(pages)
+        
+        fetched_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        chunked_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        
+        # keyset 커서는 직전 페이지의 마지막 행에 의존하므로 조회 워커는 1개
+        # (조회는 다른 스테이지와 겹쳐서 실행되며, 큐가 가득 차면 대기)
+        fetch = _Stage(self, self.stats["fetch"], self._fetch_next, 1, None, fetched_queue)
+        chunk = _Stage(self, self.stats["chunk"], self._chunk, self.chunk_workers, fetched_queue, chunked_queue)
+        embed = _Stage(
+            self, self.stats["embed"], self._embed, self.embed_workers, chunked_queue, embedded_queue,
+            flush=self._flush_embeddings
+        )
+        write = _Stage(self, self.stats["write"], self._write, self.write_workers, embedded_queue, None)
+        fetch.downstream = chunk
+        chunk.downstream = embed
+        embed.downstream = write
+        stages = [fetch, chunk, embed, write]
+        
+        self._progress = tqdm(total=total_count, desc="기사 처리")
+        try:
+            for stage in stages:
+                stage.start()
+            
+            for stage in stages:
+                for thread in stage.threads:
+                    thread.join()
+        finally:
+            self._progress.close()
+            self._progress = None
+        
+        if self._errors:
+            stage_name, error = self._errors[0]
+            raise RuntimeError(f"ETL 파이프라인 '{stage_name}' 스테이지 실패: {error}") from error
+        
+        return self.stats
+    
+    def report(self):
+        """스테이지별 처리량 출력"""
+        print("\n[스테이지별 처리량]")
+        for stats in self.stats.values():
+            print(f"  {stats.summary()}")
@@ -1,5 +1,5 @@
 """Supabase REST API 클라이언트"""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from supabase import create_client, Client
 from app.config import settings
 
@@ -54,6 +54,118 @@ class SupabaseClient:
             
             return []
     
+    def get_articles_keyset(
+        self,
+        order_column: str = "created_at",
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: int = 100,
+        columns: Optional[str] = None,
+        descending: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        (order_column, id) 커서 기반 기사 페이지 조회 (keyset pagination)
+        
+        offset 방식과 달리 페이지가 뒤로 갈수록 느려지지 않고,
+        조회 중 새 기사가 추가되어도 행이 건너뛰어지거나 중복되지 않습니다.
+        
+        Args:
+            order_column: 정렬 기준 컬럼 (예: created_at, updated_at)
+            after: 직전 페이지 마지막 행의 (order_column 값, id) (None이면 처음부터)
+            limit: 페이지 크기
+            columns: 조회할 컬럼 (None이면 ETL_ARTICLE_COLUMNS 설정)
+            descending: True면 최신순, False면 오래된 순
+            
+        Returns:
+            (order_column, id) 순으로 정렬된 기사 리스트
+        """
+        columns = self._project(columns or settings.etl_article_columns, order_column)
+        
+        try:
+            query = self.client.table("news_article").select(columns)
+            
+            if after is not None:
+                value, last_id = after
+                op = "lt" if descending else "gt"
+                # (order_column, id) 튜플 비교
+                # 타임스탬프의 특수문자(:, +)를 위해 값은 큰따옴표로 감쌈
+                query = query.or_(
+                    f'{order_column}.{op}."{value}",'
+                    f'and({order_column}.eq."{value}",id.{op}.{last_id})'
+                )
+            
+            query = query.order(order_column, desc=descending).order("id", desc=descending).limit(limit)
+            
+            response = query.execute()
+            return response.data if response.data else []
+        except Exception as e:
+            error_msg = str(e)
+            print(f"⚠️  기사 조회 중 오류 ({order_column} 커서={after}, limit={limit}): {error_msg}")
+            
+            # RLS 관련 오류인지 확인
+            if "permission" in error_msg.lower() or "policy" in error_msg.lower() or "403" in error_msg or "401" in error_msg:
+                print("   🔒 RLS 정책 문제일 수 있습니다. debug_supabase.py 실행 권장")
+            
+            raise
+    
+    def iter_articles(
+        self,
+        page_size: int = 100,
+        columns: Optional[str] = None,
+        order_column: str = "created_at",
+        descending: bool = True,
+        after: Optional[Tuple[Any, Any]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        기사를 keyset 커서로 페이지 단위 순회 (마지막 행을 다음 페이지의 커서로 사용)
+        
+        Args:
+            page_size: 페이지 크기
+            columns: 조회할 컬럼 (None이면 ETL_ARTICLE_COLUMNS 설정)
+            order_column: 정렬 기준 컬럼
+            descending: True면 최신순, False면 오래된 순
+            after: 시작 커서 (order_column 값, id) (None이면 처음부터)
+            limit: 조회할 최대 기사 수 (None이면 전체)
+            
+        Yields:
+            기사 리스트 (페이지)
+        """
+        fetched = 0
+        while limit is None or fetched < limit:
+            size = page_size if limit is None else min(page_size, limit - fetched)
+            page = self.get_articles_keyset(
+                order_column=order_column,
+                after=after,
+                limit=size,
+                columns=columns,
+                descending=descending
+            )
+            if not page:
+                if fetched == 0 and after is None:
+                    print("⚠️  기사 데이터가 조회되지 않았습니다.")
+                    print("   python scripts/debug_supabase.py 실행하여 상세 진단 권장")
+                return
+            
+            yield page
+            
+            fetched += len(page)
+            after = (page[-1][order_column], page[-1]["id"])
+            
+            if len(page) < size:
+                return
+    
+    @staticmethod
+    def _project(columns: str, order_column: str) -> str:
+        """커서에 필요한 컬럼(order_column, id)이 프로젝션에 포함되도록 보정"""
+        if columns.strip() == "*":
+            return columns
+        
+        names = [name.strip() for name in columns.split(",") if name.strip()]
+        for required in ("id", order_column):
+            if required not in names:
+                names.append(required)
+        return ",".join(names)
+    
     def get_categories(self) -> List[Dict[str, Any]]:
         """카테고리 조회"""
         try:
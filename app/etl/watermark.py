@@ -0,0 +1,73 @@
+"""증분 ETL 워터마크 저장소"""
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from app.config import settings
+
+
+class WatermarkStore:
+    """
+    마지막으로 적재한 기사의 (워터마크 컬럼 값, id)를 JSON 파일로 보관
+    
+    다음 증분 실행은 이 위치 이후의 행만 Supabase에서 조회합니다.
+    """
+    
+    def __init__(self, path: Optional[str] = None, column: Optional[str] = None):
+        self.path = path or settings.etl_watermark_path
+        self.column = column or settings.etl_watermark_column
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        저장된 워터마크 조회
+        
+        Returns:
+            {"column", "value", "id", "updated_at"} 딕셔너리 (없거나 컬럼이 다르면 None)
+        """
+        if not os.path.exists(self.path):
+            return None
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                watermark = json.load(f)
+        except Exception as e:
+            print(f"⚠️  워터마크 파일을 읽을 수 없습니다 ({self.path}): {e}")
+            return None
+        
+        if watermark.get("column") != self.column:
+            print(
+                f"⚠️  워터마크 컬럼이 다릅니다 (저장: {watermark.get('column')}, 설정: {self.column}). "
+                "처음부터 다시 적재합니다."
+            )
+            return None
+        
+        return watermark
+    
+    def save(self, value: Any, article_id: Any):
+        """
+        워터마크 저장 (임시 파일에 쓴 뒤 교체하여 중단 시에도 손상되지 않도록 함)
+        
+        Args:
+            value: 워터마크 컬럼 값 (예: created_at)
+            article_id: 같은 값 내 순서를 정하는 기사 id
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        watermark = {
+            "column": self.column,
+            "value": str(value),
+            "id": article_id,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(watermark, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+    
+    def reset(self):
+        """워터마크 삭제 (다음 증분 실행은 전체 적재)"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
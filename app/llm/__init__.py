@@ -2,13 +2,25 @@ from .base import LLMProvider
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
 from .ollama_provider import OllamaProvider
-from .factory import get_llm_provider
+from .middleware import ManagedLLMProvider, LLMRateLimitedError, TokenBucket
+from .context_builder import ContextBuilder, AnswerContext, count_tokens, truncate_tokens
+from .factory import create_llm_provider, get_llm_provider, llm_provider_stats, close_llm_providers
 
 __all__ = [
     "LLMProvider",
     "OpenAIProvider",
     "AnthropicProvider",
     "OllamaProvider",
+    "ManagedLLMProvider",
+    "LLMRateLimitedError",
+    "TokenBucket",
+    "ContextBuilder",
+    "AnswerContext",
+    "count_tokens",
+    "truncate_tokens",
+    "create_llm_provider",
     "get_llm_provider",
+    "llm_provider_stats",
+    "close_llm_providers",
 ]
 
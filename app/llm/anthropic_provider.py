@@ -1,6 +1,6 @@
 """Anthropic LLM Provider"""
-from typing import List, Optional
-from anthropic import Anthropic
+from typing import List, Optional, AsyncIterator
+from anthropic import Anthropic, AsyncAnthropic
 from app.config import settings
 from app.llm.base import LLMProvider
 
@@ -12,6 +12,7 @@ class AnthropicProvider(LLMProvider):
         if not settings.anthropic_api_key:
             raise ValueError("ANTHROPIC_API_KEY가 설정되지 않았습니다.")
         self.client = Anthropic(api_key=settings.anthropic_api_key)
+        self.async_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
         self.model = "claude-3-sonnet-20240229"
     
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
@@ -28,6 +29,40 @@ class AnthropicProvider(LLMProvider):
         )
         return message.content[0].text
     
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """비동기 텍스트 생성"""
+        system = system_prompt or "You are a helpful assistant."
+        
+        message = await self.async_client.messages.create(
+            model=self.model,
+            max_tokens=1024,
+            system=system,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return message.content[0].text
+    
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """비동기 스트리밍 텍스트 생성"""
+        system = system_prompt or "You are a helpful assistant."
+        
+        async with self.async_client.messages.stream(
+            model=self.model,
+            max_tokens=1024,
+            system=system,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+    
+    async def aclose(self):
+        """동기/비동기 클라이언트의 커넥션 풀 종료"""
+        self.client.close()
+        await self.async_client.close()
+    
     def embedding(self, texts: List[str]) -> List[List[float]]:
         """임베딩 생성 (Anthropic은 임베딩 API가 없으므로 OpenAI 사용)"""
         # Anthropic은 임베딩 API를 제공하지 않으므로
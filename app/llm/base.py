@@ -1,6 +1,7 @@
 """LLM Provider 추상 인터페이스"""
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, AsyncIterator
 
 
 class LLMProvider(ABC):
@@ -14,12 +15,52 @@ class LLMProvider(ABC):
         Args:
             prompt: 사용자 프롬프트
             system_prompt: 시스템 프롬프트 (선택)
-            
+        
         Returns:
             생성된 텍스트
         """
         pass
     
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        비동기 텍스트 생성 (이벤트 루프를 막지 않음)
+        
+        기본 구현은 동기 generate를 스레드에서 실행합니다.
+        비동기 클라이언트가 있는 Provider는 이 메서드를 재정의합니다.
+        
+        Args:
+            prompt: 사용자 프롬프트
+            system_prompt: 시스템 프롬프트 (선택)
+        
+        Returns:
+            생성된 텍스트
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+    
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        비동기 스트리밍 텍스트 생성
+        
+        기본 구현은 agenerate 결과 전체를 한 번에 반환합니다.
+        스트리밍 API가 있는 Provider는 이 메서드를 재정의합니다.
+        
+        Args:
+            prompt: 사용자 프롬프트
+            system_prompt: 시스템 프롬프트 (선택)
+        
+        Yields:
+            생성되는 텍스트 조각
+        """
+        yield await self.agenerate(prompt, system_prompt)
+    
+    async def aclose(self):
+        """
+        HTTP 클라이언트 등 리소스 정리 (애플리케이션 종료 시 호출)
+        
+        기본 구현은 아무것도 하지 않습니다.
+        """
+        pass
+    
     @abstractmethod
     def embedding(self, texts: List[str]) -> List[List[float]]:
         """
@@ -27,7 +68,7 @@ class LLMProvider(ABC):
         
         Args:
             texts: 임베딩할 텍스트 리스트
-            
+        
         Returns:
             임베딩 벡터 리스트
         """
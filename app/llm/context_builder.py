@@ -0,0 +1,300 @@
+"""답변 프롬프트 컨텍스트 조립 (토큰 예산 기반)"""
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+import tiktoken
+from app.config import settings
+from app.models.schema import Node, Edge
+
+logger = logging.getLogger(__name__)
+
+# tiktoken 인코딩을 쓸 수 없을 때 토큰 수 추정에 쓰는 UTF-8 바이트 수 (한글 1자 ≈ 1토큰, 영문은 과대 추정)
+BYTES_PER_TOKEN = 3
+
+_encoding: Optional[tiktoken.Encoding] = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def get_token_encoding() -> Optional[tiktoken.Encoding]:
+    """
+    공용 tiktoken 인코딩 (TOKEN_ENCODING)
+    
+    인코딩 파일을 내려받을 수 없는 환경(오프라인, TIKTOKEN_CACHE_DIR 미준비)이면 None을 반환하며,
+    이때 토큰 수는 UTF-8 바이트 수로 추정합니다.
+    """
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    _encoding = tiktoken.get_encoding(settings.token_encoding)
+                except Exception as e:
+                    _encoding_failed = True
+                    logger.warning("[CONTEXT] tiktoken 인코딩 %s 로드 실패, 바이트 수로 토큰 추정: %s", settings.token_encoding, e)
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수"""
+    encoding = get_token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """텍스트를 앞에서부터 max_tokens 토큰까지 자르기"""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_token_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        # 한글은 한 글자가 여러 토큰으로 나뉠 수 있으므로 잘린 글자(U+FFFD)는 제거
+        return encoding.decode(tokens[:max_tokens]).rstrip("\ufffd")
+    return text.encode("utf-8")[:max_tokens * BYTES_PER_TOKEN].decode("utf-8", errors="ignore")
+
+
+class AnswerContext:
+    """조립된 답변 컨텍스트"""
+    
+    def __init__(
+        self,
+        text: str,
+        tokens: int,
+        chunks: int = 0,
+        facts: int = 0,
+        dropped: int = 0,
+        deduped_chars: int = 0
+    ):
+        self.text = text
+        self.tokens = tokens  # text의 토큰 수
+        self.chunks = chunks  # 포함한 Content 청크 수
+        self.facts = facts  # 포함한 그래프 사실(기사, 카테고리, 언론사) 수
+        self.dropped = dropped  # 예산 부족이나 중복으로 제외한 청크/사실 수
+        self.deduped_chars = deduped_chars  # 청크 간 겹침으로 잘라낸 글자 수
+
+
+class ContextBuilder:
+    """
+    검색 결과를 토큰 예산(ANSWER_CONTEXT_TOKENS) 안의 답변 컨텍스트로 조립
+    
+    Content 청크를 점수 높은 순으로 넣고, 연결된 기사의 제목·날짜·카테고리·언론사를 청크 머리말로 붙입니다.
+    같은 기사의 인접 청크는 CHUNK_OVERLAP 글자를 공유하므로 이미 넣은 청크와 겹치는 앞/뒤 부분은 잘라내며,
+    예산에 다 들어가지 않는 청크는 ANSWER_CONTEXT_MIN_CHUNK_TOKENS 이상 남았을 때만 잘라서 넣습니다.
+    남은 예산에는 청크가 없는 기사, 카테고리, 언론사 사실(Text2Cypher 결과 등)을 넣습니다.
+    """
+    
+    # 청크 순위에 쓰는 점수 (Retriever별로 하나가 기록됨, 앞쪽 우선)
+    SCORE_KEYS = ("rrf_score", "similarity_score", "lexical_score", "relevance_score")
+    
+    # 이보다 짧은 앞뒤 일치는 우연으로 보고 자르지 않음
+    MIN_OVERLAP_CHARS = 10
+    
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        min_chunk_tokens: Optional[int] = None,
+        overlap_chars: Optional[int] = None
+    ):
+        self.max_tokens = settings.answer_context_tokens if max_tokens is None else max_tokens
+        self.min_chunk_tokens = settings.answer_context_min_chunk_tokens if min_chunk_tokens is None else min_chunk_tokens
+        # 청커는 이전 청크 끝 overlap 글자 안의 마지막 문장을 이어 붙이므로 약간의 여유를 둠
+        overlap = settings.chunk_overlap if overlap_chars is None else overlap_chars
+        self.overlap_chars = max(overlap * 2, self.MIN_OVERLAP_CHARS)
+    
+    def build(self, nodes: List[Node], edges: List[Edge], fallback: str = "") -> AnswerContext:
+        """
+        노드/엣지로 답변 컨텍스트 조립
+        
+        Args:
+            nodes: 검색된 노드
+            edges: 검색된 엣지
+            fallback: 청크와 사실이 하나도 없을 때 사용할 텍스트 (Retriever 컨텍스트)
+        
+        Returns:
+            조립된 컨텍스트와 토큰 수
+        """
+        nodes_by_id = {node.id: node for node in nodes}
+        article_of, linked = self._link_articles(nodes_by_id, edges)
+        
+        remaining = self.max_tokens
+        dropped = 0
+        deduped_chars = 0
+        
+        chunk_blocks: List[str] = []
+        included_texts: List[str] = []
+        described_articles: Set[str] = set()
+        for node in self._ranked_chunks(nodes):
+            original = str(node.properties.get("text") or "").strip()
+            text = self._trim_overlap(original, included_texts)
+            deduped_chars += len(original) - len(text)
+            if not text:
+                dropped += 1
+                continue
+            
+            article_id = article_of.get(node.id)
+            header = f"[{len(chunk_blocks) + 1}]"
+            if article_id is not None:
+                header += " " + self._describe_article(nodes_by_id[article_id], linked)
+            
+            block = f"{header}\n{text}"
+            tokens = count_tokens(block) + 1  # 블록 구분자
+            if tokens > remaining:
+                text_budget = remaining - count_tokens(header) - 3  # 구분자, 줄바꿈, 말줄임표
+                if text_budget < self.min_chunk_tokens:
+                    dropped += 1
+                    continue
+                text = truncate_tokens(text, text_budget) + "…"
+                block = f"{header}\n{text}"
+                tokens = count_tokens(block) + 1
+                if tokens > remaining:
+                    dropped += 1
+                    continue
+            
+            chunk_blocks.append(block)
+            included_texts.append(text)
+            remaining -= tokens
+            if article_id is not None:
+                described_articles.add(article_id)
+        
+        fact_lines: List[str] = []
+        for fact in self._facts(nodes, linked, described_articles):
+            line = f"- {fact}"
+            tokens = count_tokens(line) + 1
+            if tokens > remaining:
+                dropped += 1
+                continue
+            fact_lines.append(line)
+            remaining -= tokens
+        
+        sections = []
+        if chunk_blocks:
+            sections.append("\n\n".join(chunk_blocks))
+        if fact_lines:
+            sections.append("관련 그래프 정보:\n" + "\n".join(fact_lines))
+        text = "\n\n".join(sections) or truncate_tokens(fallback, self.max_tokens)
+        
+        context = AnswerContext(
+            text=text,
+            tokens=count_tokens(text),
+            chunks=len(chunk_blocks),
+            facts=len(fact_lines),
+            dropped=dropped,
+            deduped_chars=deduped_chars
+        )
+        logger.debug(
+            "[CONTEXT] 청크 %d개, 사실 %d개, %d/%d 토큰 (제외 %d개, 겹침 제거 %d자)",
+            context.chunks, context.facts, context.tokens, self.max_tokens, context.dropped, context.deduped_chars
+        )
+        return context
+    
+    def _ranked_chunks(self, nodes: List[Node]) -> List[Node]:
+        """텍스트가 있는 Content 노드 (점수 높은 순, 점수가 같으면 검색 순서)"""
+        chunks = [node for node in nodes if node.type == "Content" and node.properties.get("text")]
+        return sorted(chunks, key=self._score, reverse=True)
+    
+    def _score(self, node: Node) -> float:
+        for key in self.SCORE_KEYS:
+            score = node.properties.get(key)
+            if isinstance(score, (int, float)):
+                return float(score)
+        return 0.0
+    
+    @staticmethod
+    def _link_articles(
+        nodes_by_id: Dict[str, Node],
+        edges: List[Edge]
+    ) -> Tuple[Dict[str, str], Dict[str, Dict[str, List[str]]]]:
+        """
+        엣지로 Article과 연결된 노드 찾기 (관계 방향과 이름에 의존하지 않고 노드 타입으로 판단)
+        
+        Returns:
+            (Content id → Article id, Article id → {"Category": [이름], "Media": [이름]}) 튜플
+        """
+        article_of: Dict[str, str] = {}
+        linked: Dict[str, Dict[str, List[str]]] = {}
+        for edge in edges:
+            source, target = nodes_by_id.get(edge.source), nodes_by_id.get(edge.target)
+            if source is None or target is None:
+                continue
+            if target.type == "Article":
+                source, target = target, source
+            if source.type != "Article":
+                continue
+            
+            if target.type == "Content":
+                article_of.setdefault(target.id, source.id)
+            elif target.type in ("Category", "Media"):
+                names = linked.setdefault(source.id, {}).setdefault(target.type, [])
+                name = str(target.properties.get("name") or target.label)
+                if name not in names:
+                    names.append(name)
+        return article_of, linked
+    
+    @staticmethod
+    def _describe_article(article: Node, linked: Dict[str, Dict[str, List[str]]]) -> str:
+        """기사 한 줄 설명 (제목, 날짜, 카테고리, 언론사)"""
+        properties = article.properties or {}
+        description = f"기사: {properties.get('title') or article.label}"
+        if properties.get("created_at"):
+            description += f" ({properties['created_at']})"
+        for node_type, label in (("Category", "카테고리"), ("Media", "언론사")):
+            names = linked.get(article.id, {}).get(node_type)
+            if names:
+                description += f" | {label}: {', '.join(names)}"
+        return description
+    
+    def _facts(
+        self,
+        nodes: List[Node],
+        linked: Dict[str, Dict[str, List[str]]],
+        described_articles: Set[str]
+    ) -> List[str]:
+        """청크 머리말에 나오지 않은 기사와, 어느 기사에도 연결되지 않은 카테고리/언론사 (검색 순서)"""
+        linked_names = {
+            (node_type, name)
+            for groups in linked.values()
+            for node_type, names in groups.items()
+            for name in names
+        }
+        
+        articles = [node for node in nodes if node.type == "Article" and node.id not in described_articles]
+        articles.sort(key=self._score, reverse=True)
+        facts = [self._describe_article(article, linked) for article in articles]
+        
+        for node in nodes:
+            if node.type not in ("Category", "Media"):
+                continue
+            name = str(node.properties.get("name") or node.label)
+            if (node.type, name) not in linked_names:
+                facts.append(f"{'카테고리' if node.type == 'Category' else '언론사'}: {name}")
+        return facts
+    
+    def _trim_overlap(self, text: str, included: List[str]) -> str:
+        """이미 넣은 청크에 포함되거나 앞/뒤가 겹치는 부분 제거"""
+        for previous in included:
+            if text in previous:
+                return ""
+            # 이전 청크 끝 == 이 청크 앞 (같은 기사의 다음 청크)
+            overlap = self._overlap_length(previous, text)
+            if overlap:
+                text = text[overlap:].lstrip()
+            # 이 청크 끝 == 이전 청크 앞 (같은 기사의 앞 청크가 더 낮은 점수)
+            overlap = self._overlap_length(text, previous)
+            if overlap:
+                text = text[:-overlap].rstrip()
+            if not text:
+                return ""
+        return text
+    
+    def _overlap_length(self, head: str, tail: str) -> int:
+        """head의 끝과 tail의 앞이 일치하는 최대 글자 수 (MIN_OVERLAP_CHARS 미만이면 0)"""
+        longest = min(len(head), len(tail), self.overlap_chars)
+        for length in range(longest, self.MIN_OVERLAP_CHARS - 1, -1):
+            if head.endswith(tail[:length]):
+                return length
+        return 0
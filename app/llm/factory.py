@@ -1,14 +1,20 @@
 """LLM Provider Factory"""
+import logging
+import threading
+from typing import Any, Dict, Optional
 from app.config import settings
 from app.llm.base import LLMProvider
+from app.llm.middleware import ManagedLLMProvider
 from app.llm.openai_provider import OpenAIProvider
 from app.llm.anthropic_provider import AnthropicProvider
 from app.llm.ollama_provider import OllamaProvider
 
+logger = logging.getLogger(__name__)
 
-def get_llm_provider() -> LLMProvider:
-    """설정에 따라 LLM Provider 인스턴스 반환"""
-    provider_name = settings.llm_provider.lower()
+
+def create_llm_provider(provider_name: Optional[str] = None) -> LLMProvider:
+    """설정(또는 provider_name)에 따라 새 LLM Provider 인스턴스 생성"""
+    provider_name = (provider_name or settings.llm_provider).lower()
     
     if provider_name == "openai":
         return OpenAIProvider()
@@ -19,3 +25,42 @@ def get_llm_provider() -> LLMProvider:
     else:
         raise ValueError(f"지원하지 않는 LLM Provider: {provider_name}")
 
+
+# Provider 이름 → 프로세스 공용 인스턴스 (SDK 클라이언트와 커넥션 풀을 요청 간에 재사용)
+_shared_providers: Dict[str, LLMProvider] = {}
+_shared_lock = threading.Lock()
+
+
+def get_llm_provider() -> LLMProvider:
+    """설정된 LLM Provider의 프로세스 공용 인스턴스 반환 (처음 호출 시 생성, LLM_MIDDLEWARE_ENABLED면 호출 제어 래퍼 적용)"""
+    provider_name = settings.llm_provider.lower()
+    provider = _shared_providers.get(provider_name)
+    if provider is None:
+        with _shared_lock:
+            provider = _shared_providers.get(provider_name)
+            if provider is None:
+                provider = create_llm_provider(provider_name)
+                if settings.llm_middleware_enabled:
+                    # 속도 제한, 동시 호출 상한, 동일 프롬프트 병합, 429 백오프
+                    provider = ManagedLLMProvider(provider, provider_name)
+                _shared_providers[provider_name] = provider
+    return provider
+
+
+def llm_provider_stats() -> Optional[Dict[str, Any]]:
+    """공용 LLM Provider 호출 통계 (호출 제어 래퍼가 없거나 아직 생성되지 않았으면 None)"""
+    provider = _shared_providers.get(settings.llm_provider.lower())
+    return provider.stats() if isinstance(provider, ManagedLLMProvider) else None
+
+
+async def close_llm_providers():
+    """공용 LLM Provider 전체 종료 (애플리케이션 종료 시 호출)"""
+    with _shared_lock:
+        providers = list(_shared_providers.items())
+        _shared_providers.clear()
+    
+    for provider_name, provider in providers:
+        try:
+            await provider.aclose()
+        except Exception as e:
+            logger.warning("[LLM] %s Provider 종료 실패: %s", provider_name, e)
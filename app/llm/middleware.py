@@ -0,0 +1,331 @@
+"""LLM Provider 호출 제어 (속도 제한, 동시 호출 상한, 동일 프롬프트 병합, 429 적응형 백오프)"""
+import asyncio
+import functools
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, AsyncIterator
+from app.config import settings
+from app.llm.base import LLMProvider
+from app.observability.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRateLimitedError(Exception):
+    """429 재시도를 모두 소진했거나 대기 시간이 LLM_MAX_QUEUE_SECONDS를 넘어 호출하지 않은 경우"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """SDK 예외(status_code) 또는 HTTP 클라이언트 예외(response.status_code)의 상태 코드"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """429 응답의 Retry-After 헤더 (초)"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷 (초당 rate개, 최대 burst개 누적)
+    
+    reserve는 토큰을 먼저 차감하고 기다려야 할 시간을 반환하므로 대기 중인 호출도
+    순서대로 자리를 잡습니다. rate가 0 이하이면 제한하지 않습니다.
+    """
+    
+    def __init__(self, rate: float, burst: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """토큰 하나를 예약하고 사용 가능해질 때까지 남은 시간(초) 반환"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+    
+    def release(self):
+        """예약했지만 사용하지 않은 토큰 반환"""
+        if self.rate > 0:
+            with self._lock:
+                self._tokens = min(self.burst, self._tokens + 1)
+    
+    def slow_down(self):
+        """429 응답 시 속도를 절반으로 (최저 기본 속도의 10%)"""
+        if self.base_rate > 0:
+            with self._lock:
+                self.rate = max(self.base_rate * 0.1, self.rate * 0.5)
+    
+    def recover(self):
+        """성공 응답마다 기본 속도의 10%씩 회복"""
+        if self.base_rate > 0 and self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class _Flight:
+    """동기 호출 병합용 진행 중 호출 (먼저 온 스레드가 실행, 나머지는 결과를 기다림)"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ManagedLLMProvider(LLMProvider):
+    """
+    LLMProvider 호출 제어 래퍼
+    
+    - 속도 제한: Provider별 토큰 버킷 (LLM_REQUESTS_PER_SECOND, LLM_BURST)
+    - 동시 호출 상한: 동기/비동기 경로 각각 LLM_MAX_IN_FLIGHT개
+    - 병합(single-flight): 같은 (프롬프트, 시스템 프롬프트)의 generate 호출이 진행 중이면
+      새로 호출하지 않고 그 결과를 함께 받음 (스트리밍은 병합하지 않음)
+    - 429 적응형 백오프: Retry-After(없으면 지수 백오프)만큼 모든 호출을 멈추고 버킷 속도를 절반으로 낮춘 뒤
+      LLM_MAX_RETRIES번까지 재시도, 성공하면 속도를 점진적으로 회복
+    - 대기 시간이 LLM_MAX_QUEUE_SECONDS를 넘으면 호출하지 않고 LLMRateLimitedError (부하 차단)
+    
+    결과는 /metrics의 graphrag_llm_calls_total / graphrag_llm_wait_seconds와 /health의 llm으로 확인합니다.
+    """
+    
+    def __init__(self, provider: LLMProvider, name: str):
+        self.provider = provider
+        self.name = name
+        self.bucket = TokenBucket(settings.llm_requests_per_second, settings.llm_burst)
+        self.max_in_flight = max(1, settings.llm_max_in_flight)
+        self.max_retries = max(0, settings.llm_max_retries)
+        self.coalesce = settings.llm_coalesce
+        
+        self.in_flight = 0
+        self._counts: Dict[str, int] = {}
+        self._cooldown_until = 0.0
+        self._consecutive_429 = 0
+        self._lock = threading.Lock()
+        
+        # 동기 경로
+        self._semaphore = threading.BoundedSemaphore(self.max_in_flight)
+        self._flights: Dict[str, _Flight] = {}
+        
+        # 비동기 경로 (이벤트 루프가 바뀌면 다시 생성)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, "asyncio.Future"] = {}
+    
+    def _count(self, outcome: str):
+        with self._lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+        get_metrics().llm_calls.inc(provider=self.name, outcome=outcome)
+    
+    def _change_in_flight(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+    
+    def _wait_seconds(self) -> float:
+        """토큰 예약 후 호출까지 기다릴 시간 (429 대기 포함, 너무 길면 부하 차단)"""
+        wait = max(self.bucket.reserve(), self._cooldown_until - time.monotonic())
+        if wait > settings.llm_max_queue_seconds:
+            self.bucket.release()
+            self._count("shed")
+            raise LLMRateLimitedError(f"{self.name} 호출 대기 시간 초과 ({wait:.1f}s)", wait)
+        if wait > 0:
+            get_metrics().llm_wait.observe(wait, provider=self.name)
+        return wait
+    
+    def _on_rate_limited(self, error: Exception, attempt: int):
+        """429: 모든 호출을 잠시 멈추고 속도를 낮춤 (재시도 소진 시 LLMRateLimitedError)"""
+        self._count("rate_limited")
+        self.bucket.slow_down()
+        with self._lock:
+            self._consecutive_429 += 1
+            delay = _retry_after(error)
+            if delay is None:
+                delay = settings.llm_backoff_base * (2 ** (self._consecutive_429 - 1))
+            delay = min(delay, settings.llm_backoff_max)
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        
+        if attempt >= self.max_retries:
+            raise LLMRateLimitedError(f"{self.name} 속도 제한 (429) 재시도 소진", delay) from error
+        self._count("retried")
+        logger.warning("[LLM] %s 429 응답, %.1fs 후 재시도 %d/%d", self.name, delay, attempt + 1, self.max_retries)
+    
+    def _on_success(self):
+        self.bucket.recover()
+        with self._lock:
+            self._consecutive_429 = 0
+        self._count("ok")
+    
+    @staticmethod
+    def _key(*parts: Optional[str]) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+    
+    def _call(self, func: Callable[[], Any]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            wait = self._wait_seconds()
+            if wait > 0:
+                time.sleep(wait)
+            with self._semaphore:
+                self._change_in_flight(1)
+                try:
+                    result = func()
+                except Exception as e:
+                    if _status_code(e) != 429:
+                        self._count("error")
+                        raise
+                    self._on_rate_limited(e, attempt)
+                    continue
+                finally:
+                    self._change_in_flight(-1)
+            self._on_success()
+            return result
+    
+    def _coalesced_call(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        
+        if not leader:
+            self._count("coalesced")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = self._call(func)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+    
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        func = functools.partial(self.provider.generate, prompt, system_prompt)
+        if not self.coalesce:
+            return self._call(func)
+        return self._coalesced_call(self._key("generate", prompt, system_prompt), func)
+    
+    def embedding(self, texts: List[str]) -> List[List[float]]:
+        return self._call(functools.partial(self.provider.embedding, texts))
+    
+    def _bind_loop(self):
+        """현재 이벤트 루프용 세마포어/진행 중 작업 (루프가 바뀌면 새로 생성)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._async_semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._tasks = {}
+    
+    async def _acall(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        self._bind_loop()
+        for attempt in range(self.max_retries + 1):
+            wait = self._wait_seconds()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._async_semaphore:
+                self._change_in_flight(1)
+                try:
+                    result = await func()
+                except Exception as e:
+                    if _status_code(e) != 429:
+                        self._count("error")
+                        raise
+                    self._on_rate_limited(e, attempt)
+                    continue
+                finally:
+                    self._change_in_flight(-1)
+            self._on_success()
+            return result
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        func = functools.partial(self.provider.agenerate, prompt, system_prompt)
+        if not self.coalesce:
+            return await self._acall(func)
+        
+        self._bind_loop()
+        key = self._key("generate", prompt, system_prompt)
+        task = self._tasks.get(key)
+        if task is None:
+            # 호출은 별도 작업으로 실행해 먼저 온 요청이 취소되어도 기다리는 요청은 결과를 받음
+            task = self._tasks[key] = asyncio.ensure_future(self._acall(func))
+            task.add_done_callback(lambda done: self._finish_task(key, done))
+        else:
+            self._count("coalesced")
+        return await asyncio.shield(task)
+    
+    def _finish_task(self, key: str, task: "asyncio.Future"):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # 모든 요청이 취소된 경우 예외 미확인 경고 방지
+    
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """스트리밍 생성 (병합하지 않음, 첫 토큰 전 429만 재시도)"""
+        self._bind_loop()
+        for attempt in range(self.max_retries + 1):
+            wait = self._wait_seconds()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._async_semaphore:
+                self._change_in_flight(1)
+                started = False
+                try:
+                    async for text in self.provider.astream(prompt, system_prompt):
+                        started = True
+                        yield text
+                except Exception as e:
+                    if started or _status_code(e) != 429:
+                        self._count("error")
+                        raise
+                    self._on_rate_limited(e, attempt)
+                    continue
+                finally:
+                    self._change_in_flight(-1)
+            self._on_success()
+            return
+    
+    async def aclose(self):
+        await self.provider.aclose()
+    
+    def stats(self) -> Dict[str, Any]:
+        """호출 통계 (헬스 체크용)"""
+        with self._lock:
+            counts = dict(self._counts)
+            cooldown = max(0.0, self._cooldown_until - time.monotonic())
+        return {
+            "provider": self.name,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rate_per_second": round(self.bucket.rate, 3),
+            "cooldown_seconds": round(cooldown, 3),
+            "calls": counts,
+        }
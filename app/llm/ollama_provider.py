@@ -1,44 +1,213 @@
 """Ollama LLM Provider"""
-from typing import List, Optional
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, AsyncIterator
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app.config import settings
 from app.llm.base import LLMProvider
 
+logger = logging.getLogger(__name__)
+
 
 class OllamaProvider(LLMProvider):
-    """Ollama Provider 구현 (로컬)"""
+    """
+    Ollama Provider 구현 (로컬)
+    
+    동기 호출은 requests.Session, 비동기 호출은 httpx.AsyncClient 하나를 Provider 수명 동안 재사용하므로
+    요청마다 TCP 연결을 새로 열지 않습니다 (keep-alive, 풀 크기 OLLAMA_POOL_SIZE).
+    연결 실패와 429/5xx 응답은 OLLAMA_MAX_RETRIES번까지 지수 백오프로 재시도하며,
+    생성 도중 읽기 타임아웃은 같은 생성을 다시 실행하게 되므로 재시도하지 않습니다.
+    """
+    
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    # 재사용한 keep-alive 연결이 서버 쪽에서 끊긴 경우 포함 (요청이 처리되기 전 오류)
+    ASYNC_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
     
     def __init__(self):
-        self.base_url = settings.ollama_base_url
+        self.base_url = settings.ollama_base_url.rstrip("/")
         self.model = settings.ollama_model
+        self.max_retries = max(0, settings.ollama_max_retries)
+        self.retry_backoff = settings.ollama_retry_backoff
+        self.timeout = (settings.ollama_connect_timeout, settings.ollama_read_timeout)
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.ollama_pool_size,
+            max_retries=Retry(
+                total=self.max_retries,
+                connect=self.max_retries,
+                read=0,
+                status=self.max_retries,
+                status_forcelist=self.RETRY_STATUSES,
+                allowed_methods=frozenset({"POST"}),
+                backoff_factor=self.retry_backoff,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # 비동기 클라이언트는 이벤트 루프에서 처음 사용할 때 생성
+        self._async_client: Optional[httpx.AsyncClient] = None
+        
+        # /api/embed(배치) 지원 여부 (None: 아직 모름, 구버전 Ollama는 /api/embeddings만 지원)
+        self._batch_embed: Optional[bool] = None
+        self._lock = threading.Lock()
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """텍스트 생성"""
-        url = f"{self.base_url}/api/generate"
-        payload = {
+    def _generate_payload(self, prompt: str, system_prompt: Optional[str], stream: bool = False) -> dict:
+        return {
             "model": self.model,
             "prompt": prompt,
             "system": system_prompt or "",
-            "stream": False
+            "stream": stream
         }
-        
-        response = requests.post(url, json=payload)
+    
+    def _post(self, path: str, payload: dict) -> requests.Response:
+        """풀링된 세션으로 POST (재시도는 세션 어댑터가 처리)"""
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
         response.raise_for_status()
+        return response
+    
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            connect_timeout, read_timeout = self.timeout
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=settings.ollama_pool_size,
+                    max_keepalive_connections=settings.ollama_pool_size
+                )
+            )
+        return self._async_client
+    
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """attempt번째 재시도 전 대기 시간 (Retry-After 헤더가 있으면 우선)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.retry_backoff * (2 ** attempt)
+    
+    async def _apost(self, path: str, payload: dict) -> httpx.Response:
+        """비동기 POST (연결 실패/429/5xx는 지수 백오프로 재시도)"""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await self.async_client.post(path, json=payload)
+            except self.ASYNC_RETRY_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+            
+            logger.warning("[OLLAMA] %s 요청 실패, 재시도 %d/%d", path, attempt + 1, self.max_retries)
+            await asyncio.sleep(self._retry_delay(attempt, response))
+    
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """텍스트 생성"""
+        response = self._post("/api/generate", self._generate_payload(prompt, system_prompt))
         return response.json().get("response", "")
     
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """비동기 텍스트 생성"""
+        response = await self._apost("/api/generate", self._generate_payload(prompt, system_prompt))
+        return response.json().get("response", "")
+    
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """비동기 스트리밍 텍스트 생성 (Ollama는 줄 단위 JSON으로 토큰을 전송)"""
+        payload = self._generate_payload(prompt, system_prompt, stream=True)
+        
+        for attempt in range(self.max_retries + 1):
+            started = False  # 첫 토큰을 보낸 뒤에는 재시도하지 않음
+            retry_response = None
+            try:
+                async with self.async_client.stream("POST", "/api/generate", json=payload) as response:
+                    if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                        retry_response = response
+                    else:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            data = json.loads(line)
+                            if data.get("error"):
+                                raise RuntimeError(f"Ollama 스트리밍 오류: {data['error']}")
+                            text = data.get("response", "")
+                            if text:
+                                started = True
+                                yield text
+                            if data.get("done"):
+                                break
+                        return
+            except self.ASYNC_RETRY_ERRORS:
+                if started or attempt == self.max_retries:
+                    raise
+            
+            logger.warning("[OLLAMA] 스트리밍 요청 실패, 재시도 %d/%d", attempt + 1, self.max_retries)
+            await asyncio.sleep(self._retry_delay(attempt, retry_response))
+    
     def embedding(self, texts: List[str]) -> List[List[float]]:
-        """임베딩 생성"""
-        url = f"{self.base_url}/api/embeddings"
-        embeddings = []
+        """
+        임베딩 생성
         
-        for text in texts:
-            payload = {
-                "model": self.model,
-                "prompt": text
-            }
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            embeddings.append(response.json().get("embedding", []))
+        /api/embed로 EMBEDDING_BATCH_SIZE개씩 묶어 요청하고, 이 API가 없는 구버전 Ollama는
+        /api/embeddings에 텍스트별 요청을 OLLAMA_EMBED_CONCURRENCY개까지 동시에 보냅니다.
+        """
+        if not texts:
+            return []
         
-        return embeddings
-
+        if self._batch_embed is not False:
+            try:
+                embeddings = []
+                batch_size = max(1, settings.embedding_batch_size)
+                for start in range(0, len(texts), batch_size):
+                    batch = texts[start:start + batch_size]
+                    response = self._post("/api/embed", {"model": self.model, "input": batch})
+                    embeddings.extend(response.json().get("embeddings", []))
+                self._batch_embed = True
+                return embeddings
+            except requests.HTTPError as e:
+                if self._batch_embed or not self._is_missing_endpoint(e.response):
+                    raise
+                with self._lock:
+                    if self._batch_embed is None:
+                        logger.info("[OLLAMA] /api/embed 미지원, /api/embeddings 동시 요청으로 대체")
+                        self._batch_embed = False
+        
+        workers = min(max(1, settings.ollama_embed_concurrency), len(texts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ollama-embed") as executor:
+            return list(executor.map(self._embed_single, texts))
+    
+    def _embed_single(self, text: str) -> List[float]:
+        response = self._post("/api/embeddings", {"model": self.model, "prompt": text})
+        return response.json().get("embedding", [])
+    
+    @staticmethod
+    def _is_missing_endpoint(response: Optional[requests.Response]) -> bool:
+        """라우트 자체가 없는 404 (모델이 없을 때의 404는 JSON 오류 본문을 반환)"""
+        if response is None or response.status_code != 404:
+            return False
+        try:
+            return "error" not in response.json()
+        except ValueError:
+            return True
+    
+    async def aclose(self):
+        """세션과 비동기 클라이언트의 커넥션 풀 종료"""
+        self.session.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
@@ -1,6 +1,6 @@
 """OpenAI LLM Provider"""
-from typing import List, Optional
-from openai import OpenAI
+from typing import List, Optional, AsyncIterator
+from openai import OpenAI, AsyncOpenAI
 from app.config import settings
 from app.llm.base import LLMProvider
 
@@ -12,22 +12,54 @@ class OpenAIProvider(LLMProvider):
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
         self.client = OpenAI(api_key=settings.openai_api_key)
+        self.async_client = AsyncOpenAI(api_key=settings.openai_api_key)
         self.model = "gpt-4o-mini"
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """텍스트 생성"""
+    def _messages(self, prompt: str, system_prompt: Optional[str]) -> List[dict]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
-        
+        return messages
+    
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """텍스트 생성"""
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=messages,
+            messages=self._messages(prompt, system_prompt),
+            temperature=0.7
+        )
+        return response.choices[0].message.content
+    
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """비동기 텍스트 생성"""
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt, system_prompt),
             temperature=0.7
         )
         return response.choices[0].message.content
     
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """비동기 스트리밍 텍스트 생성"""
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt, system_prompt),
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+    
+    async def aclose(self):
+        """동기/비동기 클라이언트의 커넥션 풀 종료"""
+        self.client.close()
+        await self.async_client.close()
+    
     def embedding(self, texts: List[str]) -> List[List[float]]:
         """임베딩 생성"""
         response = self.client.embeddings.create(
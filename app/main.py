@@ -1,15 +1,41 @@
 """FastAPI 서버"""
+import asyncio
 import os
 
 # tokenizers 경고 해결
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+import json
+import logging
+import math
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from app.models.schema import QueryRequest, QueryResponse, GraphResponse
-from app.retrievers.selector import RetrieverSelector
-from app.llm.factory import get_llm_provider
+from app.models.schema import QueryRequest, QueryResponse, GraphResponse, Node, Edge
+from app.retrievers.planner import QueryPlanner, QueryPlan
+from app.retrievers.registry import get_retriever_registry, close_retrievers
+from app.retrievers.router import get_query_router, train_query_router
+from app.observability import StepTimer, get_metrics, setup_logging
+from app.llm.factory import get_llm_provider, llm_provider_stats, close_llm_providers
+from app.llm.middleware import LLMRateLimitedError
+from app.llm.context_builder import ContextBuilder, AnswerContext, get_token_encoding
+from app.cache.answer_cache import get_answer_cache
+from app.cache.cypher_cache import get_cypher_cache
+from app.vector_index import get_exact_index, get_local_index
+from app.db.neo4j_pool import get_driver, close_driver, get_async_driver, close_async_driver
+from app.etl.embedding_generator import (
+    preload_embedding_model,
+    embedding_model_info,
+    get_encode_executor,
+    shutdown_encode_executor,
+)
+from app.config import settings
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="News GraphRAG Ontology Platform")
 
@@ -28,133 +54,227 @@ try:
 except Exception:
     pass  # frontend 폴더가 없을 수 있음
 
+# Cypher 템플릿 캐시 주기적 파일 기록 태스크 (startup에서 시작, shutdown에서 취소)
+_cypher_flush_task: Optional[asyncio.Task] = None
+
+
+async def _flush_cypher_cache_periodically():
+    """변경된 Cypher 템플릿을 CYPHER_CACHE_FLUSH_SECONDS마다 파일에 기록 (요청 경로에서는 쓰지 않음)"""
+    while True:
+        await asyncio.sleep(max(1.0, settings.cypher_cache_flush_seconds))
+        try:
+            await asyncio.to_thread(get_cypher_cache().flush)
+        except Exception as e:
+            logger.warning("[CYPHER_CACHE] 템플릿 캐시 기록 실패: %s", e)
+
+
+@app.on_event("startup")
+async def startup():
+    """공용 Neo4j 드라이버(동기/비동기) 생성, 임베딩 모델/토큰 인코딩/로컬 벡터 인덱스 미리 로드, 공유 Retriever/LLM Provider 생성, 라우팅 분류기 학습, Cypher 템플릿 캐시 주기적 기록 시작"""
+    global _cypher_flush_task
+    
+    try:
+        await asyncio.to_thread(get_driver().verify_connectivity)
+        await get_async_driver().verify_connectivity()
+    except Exception as e:
+        # Neo4j가 아직 준비되지 않았어도 서버는 시작 (요청 시 재시도)
+        logger.warning("[STARTUP] Neo4j 연결 확인 실패: %s", e)
+    
+    if settings.embedding_preload:
+        # 질의 임베딩과 같은 스레드 풀에서 로드/워밍업
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(
+            get_encode_executor(),
+            preload_embedding_model,
+            settings.embedding_warmup
+        )
+        if info:
+            logger.info(
+                "[STARTUP] 임베딩 모델 로드: %s (%ss, 워밍업 %ss)",
+                info["model"], info["load_seconds"], info["warmup_seconds"]
+            )
+    
+    # Retriever와 LLM Provider를 한 번 생성해 모든 요청이 공유 (종료 시 정리)
+    await asyncio.to_thread(get_retriever_registry().warmup)
+    try:
+        get_llm_provider()
+    except Exception as e:
+        logger.warning("[STARTUP] LLM Provider 생성 실패: %s", e)
+    
+    # 답변 컨텍스트 토큰 계산용 tiktoken 인코딩 로드 (첫 로드 시 인코딩 파일을 내려받음)
+    await asyncio.to_thread(get_token_encoding)
+    
+    if settings.routing_classifier_enabled:
+        # 라벨 예시 임베딩으로 라우팅 분류기 학습 (실패하면 키워드 규칙으로 라우팅)
+        try:
+            await asyncio.get_running_loop().run_in_executor(get_encode_executor(), train_query_router)
+        except Exception as e:
+            logger.warning("[STARTUP] 라우팅 분류기 학습 실패 (키워드 규칙 사용): %s", e)
+    
+    if settings.vector_search_backend == "local":
+        # 로컬 벡터 인덱스 미리 열기 (없으면 첫 검색은 Neo4j Vector Index 사용)
+        try:
+            if get_local_index().index() is None:
+                logger.warning("[STARTUP] 로컬 벡터 인덱스가 없습니다. scripts/build_local_index.py로 구축하세요.")
+        except Exception as e:
+            logger.warning("[STARTUP] 로컬 벡터 인덱스 로드 실패: %s", e)
+    elif settings.vector_search_backend == "exact":
+        # 정확 검색용 임베딩 행렬 미리 로드
+        try:
+            await asyncio.to_thread(get_exact_index().load)
+        except Exception as e:
+            logger.warning("[STARTUP] 정확 검색 행렬 로드 실패: %s", e)
+    
+    if settings.cypher_cache_enabled:
+        _cypher_flush_task = asyncio.create_task(_flush_cypher_cache_periodically())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """공유 Retriever/LLM Provider, 공용 Neo4j 드라이버와 임베딩 스레드 풀 종료, Cypher 템플릿 사용 기록 저장"""
+    if _cypher_flush_task is not None:
+        _cypher_flush_task.cancel()
+    if settings.cypher_cache_enabled:
+        get_cypher_cache().flush()
+    close_retrievers()
+    await close_llm_providers()
+    await close_async_driver()
+    close_driver()
+    shutdown_encode_executor()
+
 
 @app.get("/health")
 async def health():
     """헬스 체크"""
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "neo4j_pool": get_driver().metrics(),
+        "neo4j_async_pool": get_async_driver().metrics(),
+        "embedding_model": embedding_model_info(),
+        "answer_cache": get_answer_cache().stats() if settings.answer_cache_enabled else None,
+        "cypher_cache": get_cypher_cache().stats() if settings.cypher_cache_enabled else None,
+        "routing": get_query_router().stats(),
+        "retrievers": get_retriever_registry().stats(),
+        "llm": llm_provider_stats(),
+        "vector_search": {
+            "backend": settings.vector_search_backend,
+            "local_index": get_local_index().stats() if settings.vector_search_backend == "local" else None,
+            "exact_index": get_exact_index().stats()
+        }
+    }
 
 
-@app.post("/query", response_model=QueryResponse)
-async def query(request: QueryRequest):
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭 (요청 수, 요청/단계별 지연 시간 히스토그램)"""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
+
+ANSWER_SYSTEM_PROMPT = """당신은 뉴스 데이터를 분석하는 AI 어시스턴트입니다.
+사용자의 질의에 대해 검색된 뉴스 정보를 바탕으로 정확하고 유용한 답변을 제공하세요.
+검색된 정보를 최대한 활용하여 구체적이고 상세한 답변을 제공하세요."""
+
+
+def _store_cache(query_text: str, retriever_name: str, query_embedding: Optional[List[float]], response: QueryResponse):
+    """답변 캐시 저장 (요청별 소요 시간은 저장하지 않음)"""
+    if settings.answer_cache_enabled:
+        get_answer_cache().put(query_text, retriever_name, query_embedding, response.model_copy(update={"timings": None}))
+
+
+async def _retrieve(query_text: str, timer: StepTimer) -> QueryPlan:
     """
-    자연어 질의 처리
+    캐시 조회, 검색 및 관련성 필터링
     
     Args:
-        request: 질의 요청
-        
+        query_text: 사용자 질의
+        timer: 요청 단계별 소요 시간 기록
+    
     Returns:
-        질의 응답 (답변, 노드, 엣지)
+        실행 결과 (캐시 히트면 plan.cached에 응답)
     """
-    try:
-        # 1. Retriever 선택
-        retriever, retriever_name = RetrieverSelector.select(request.query)
-        
-        # 2. 검색 수행
-        nodes, edges, context = retriever.retrieve(request.query)
-        
-        # 사용된 쿼리 정보 가져오기 (retriever에 쿼리 정보가 있는 경우)
-        used_query = getattr(retriever, 'last_query', None) or getattr(retriever, 'last_cypher', None)
-        
-        # 검색 결과 로깅 (상세 정보)
+    plan = await QueryPlanner(query_text, timer).execute()
+    if plan.cached is not None:
+        return plan
+    
+    nodes, edges = plan.nodes, plan.edges
+    retriever_name = plan.retriever_name
+    used_query = plan.used_query
+    
+    # 검색 결과 로깅 (상세 정보, DEBUG 레벨에서만 구성)
+    if logger.isEnabledFor(logging.DEBUG):
+        _log_search_results(query_text, retriever_name, used_query, nodes, edges)
+    
+    # 3. 검색 결과 필터링 (관련성 높은 노드만 유지)
+    # 유사도 점수가 있는 노드만 필터링
+    filtered_nodes = []
+    filtered_edges = []
+    
+    for node in nodes:
         try:
-            print(f"\n{'='*80}")
-            print(f"[SEARCH] 질의: {request.query}")
-            print(f"[SEARCH] 사용된 Retriever: {retriever_name}")
-            if used_query:
-                print(f"[SEARCH] 사용된 쿼리:\n{used_query}")
-            print(f"[SEARCH] 초기 검색 결과: 노드 {len(nodes)}개, 엣지 {len(edges)}개")
-            
-            # 각 노드 정보 로깅
-            for i, node in enumerate(nodes, 1):
-                try:
-                    score = node.properties.get("similarity_score") or node.properties.get("relevance_score")
-                    label = str(node.label) if node.label else "N/A"
-                    label_display = label[:50] + "..." if len(label) > 50 else label
-                    score_display = f"{score:.3f}" if score is not None and isinstance(score, (int, float)) else "N/A"
-                    print(f"  노드 {i}: ID={node.id}, 타입={node.type}, 레이블={label_display}, 점수={score_display}")
-                except Exception as e:
-                    print(f"  노드 {i}: 로깅 오류 - {str(e)}")
-        except Exception as e:
-            print(f"[SEARCH] 로깅 오류: {str(e)}")
-        
-        # 3. 검색 결과 필터링 (관련성 높은 노드만 유지)
-        # 유사도 점수가 있는 노드만 필터링
-        filtered_nodes = []
-        filtered_edges = []
-        
-        for node in nodes:
-            try:
-                # 유사도 점수가 있으면 임계값 확인, 없으면 포함
-                score = node.properties.get("similarity_score") or node.properties.get("relevance_score")
-                if score is None or (isinstance(score, (int, float)) and score >= 0.5):  # 기본 임계값
-                    filtered_nodes.append(node)
-                else:
-                    score_display = f"{score:.3f}" if isinstance(score, (int, float)) else str(score)
-                    print(f"[FILTER] 노드 제외: ID={node.id}, 타입={node.type}, 점수={score_display} (임계값 미만)")
-            except Exception as e:
-                # 에러 발생 시 노드 포함 (안전장치)
-                print(f"[FILTER] 노드 필터링 오류 (포함): ID={node.id}, 오류={str(e)}")
+            # 유사도 점수가 있으면 임계값 확인, 없으면 포함
+            score = node.properties.get("similarity_score") or node.properties.get("relevance_score")
+            if score is None or (isinstance(score, (int, float)) and score >= 0.5):  # 기본 임계값
                 filtered_nodes.append(node)
-        
-        # 필터링된 노드와 연결된 엣지만 유지
-        filtered_node_ids = {node.id for node in filtered_nodes}
-        for edge in edges:
-            if edge.source in filtered_node_ids and edge.target in filtered_node_ids:
-                filtered_edges.append(edge)
-        
-        nodes = filtered_nodes
-        edges = filtered_edges
-        
-        try:
-            print(f"[SEARCH] 필터링 후: 노드 {len(nodes)}개, 엣지 {len(edges)}개")
-            node_ids = [str(node.id) for node in nodes]
-            print(f"[SEARCH] 최종 반환 노드 ID 목록: {node_ids}")
-            print(f"{'='*80}\n")
+            else:
+                logger.debug("[FILTER] 노드 제외: ID=%s, 타입=%s, 점수=%s (임계값 미만)", node.id, node.type, score)
         except Exception as e:
-            print(f"[SEARCH] 로깅 오류: {str(e)}")
-        
-        # 4. LLM으로 답변 생성
-        llm = get_llm_provider()
-        
-        system_prompt = """당신은 뉴스 데이터를 분석하는 AI 어시스턴트입니다.
-사용자의 질의에 대해 검색된 뉴스 정보를 바탕으로 정확하고 유용한 답변을 제공하세요.
-검색된 정보를 최대한 활용하여 구체적이고 상세한 답변을 제공하세요."""
-        
-        # 검색된 노드 정보를 상세히 구성
-        node_info_parts = []
-        for i, node in enumerate(nodes[:10], 1):  # 상위 10개 노드 정보
-            node_type = node.type
-            node_label = node.label
-            properties = node.properties or {}
-            
-            if node_type == "Article":
-                title = properties.get("title", node_label)
-                url = properties.get("url", "")
-                created_at = properties.get("created_at", "")
-                node_info_parts.append(f"{i}. 기사: {title}" + (f" ({created_at})" if created_at else ""))
-            elif node_type == "Content":
-                text = properties.get("text", node_label)
-                score = properties.get("similarity_score") or properties.get("relevance_score")
-                score_str = f" (유사도: {score:.3f})" if score else ""
-                node_info_parts.append(f"{i}. 콘텐츠: {text[:100]}...{score_str}")
-            elif node_type == "Category":
-                name = properties.get("name", node_label)
-                node_info_parts.append(f"{i}. 카테고리: {name}")
-            elif node_type == "Media":
-                name = properties.get("name", node_label)
-                node_info_parts.append(f"{i}. 언론사: {name}")
-        
-        node_info = "\n".join(node_info_parts) if node_info_parts else "검색된 노드 정보가 없습니다."
+            # 에러 발생 시 노드 포함 (안전장치)
+            logger.debug("[FILTER] 노드 필터링 오류 (포함): ID=%s, 오류=%s", node.id, e)
+            filtered_nodes.append(node)
+    
+    # 필터링된 노드와 연결된 엣지만 유지
+    filtered_node_ids = {node.id for node in filtered_nodes}
+    for edge in edges:
+        if edge.source in filtered_node_ids and edge.target in filtered_node_ids:
+            filtered_edges.append(edge)
+    
+    nodes = filtered_nodes
+    edges = filtered_edges
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[SEARCH] 필터링 후: 노드 %d개, 엣지 %d개", len(nodes), len(edges))
+        logger.debug("[SEARCH] 최종 반환 노드 ID 목록: %s", [str(node.id) for node in nodes])
+    
+    plan.nodes, plan.edges = nodes, edges
+    return plan
+
+
+def _log_search_results(query_text: str, retriever_name: str, used_query: Optional[str], nodes: List[Node], edges: List[Edge]):
+    """검색 결과 상세 로깅 (DEBUG)"""
+    try:
+        logger.debug("[SEARCH] 질의: %s", query_text)
+        logger.debug("[SEARCH] 사용된 Retriever: %s", retriever_name)
+        if used_query:
+            logger.debug("[SEARCH] 사용된 쿼리:\n%s", used_query)
+        logger.debug("[SEARCH] 초기 검색 결과: 노드 %d개, 엣지 %d개", len(nodes), len(edges))
         
-        user_prompt = f"""
-사용자 질의: {request.query}
+        # 각 노드 정보 로깅
+        for i, node in enumerate(nodes, 1):
+            score = node.properties.get("similarity_score") or node.properties.get("relevance_score")
+            label = str(node.label) if node.label else "N/A"
+            label_display = label[:50] + "..." if len(label) > 50 else label
+            score_display = f"{score:.3f}" if score is not None and isinstance(score, (int, float)) else "N/A"
+            logger.debug("  노드 %d: ID=%s, 타입=%s, 레이블=%s, 점수=%s", i, node.id, node.type, label_display, score_display)
+    except Exception as e:
+        logger.debug("[SEARCH] 로깅 오류: %s", e)
+
 
-검색된 노드 정보 (총 {len(nodes)}개):
-{node_info}
+def _build_answer_prompt(query_text: str, plan: QueryPlan, timer: StepTimer) -> Tuple[str, AnswerContext]:
+    """
+    검색 결과를 토큰 예산(ANSWER_CONTEXT_TOKENS) 안의 컨텍스트로 조립해 답변 생성용 사용자 프롬프트 구성
+    
+    Returns:
+        (사용자 프롬프트, 조립된 컨텍스트) 튜플
+    """
+    with timer.step("context"):
+        answer_context = ContextBuilder().build(plan.nodes, plan.edges, fallback=plan.context or "")
+    get_metrics().context_tokens.observe(answer_context.tokens, retriever=plan.retriever_name or "unknown")
+    
+    user_prompt = f"""
+사용자 질의: {query_text}
 
-검색된 콘텐츠:
-{context}
+검색된 정보 (노드 {len(plan.nodes)}개 중 콘텐츠 {answer_context.chunks}개, 그래프 정보 {answer_context.facts}개):
+{answer_context.text or "검색된 정보가 없습니다."}
 
 위 정보를 바탕으로 사용자의 질의에 대해 구체적이고 상세한 답변을 제공해주세요.
 - 검색된 노드의 정보를 최대한 활용하세요
@@ -162,70 +282,225 @@ async def query(request: QueryRequest):
 - 검색된 콘텐츠의 내용을 바탕으로 답변하세요
 - 검색된 정보가 질의와 관련이 없다면, 그 사실을 명확히 알려주세요
 """
+
+    return user_prompt, answer_context
+
+
+def _log_answer(answer: str):
+    """LLM 답변 로깅 (DEBUG)"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    answer_str = str(answer) if answer else ""
+    logger.debug("[LLM] 생성된 답변 길이: %d자", len(answer_str))
+    if answer_str:
+        preview = answer_str[:200] + "..." if len(answer_str) > 200 else answer_str
+        logger.debug("[LLM] 답변 미리보기: %s", preview)
+
+
+def _log_query_error(query_text: str, e: Exception):
+    """질의 처리 오류 로깅 (상세 추적 포함)"""
+    logger.exception("[ERROR] 검색 중 오류 발생 (질의: %s): %s", query_text, e)
+
+
+def _response_timings(timer: StepTimer) -> Optional[Dict[str, float]]:
+    return timer.timings if settings.response_timings else None
+
+
+def _observe(endpoint: str, plan: Optional[QueryPlan], status: str, timer: StepTimer):
+    """요청 메트릭 기록과 span 로깅"""
+    retriever_name = plan.retriever_name if plan is not None else None
+    cache = plan.cached.cache if plan is not None and plan.cached is not None else None
+    get_metrics().observe(endpoint, retriever_name, cache, status, timer)
+    timer.log(endpoint=endpoint, retriever=retriever_name, cache=cache, status=status)
+
+
+@app.post("/query", response_model=QueryResponse)
+async def query(request: QueryRequest):
+    """
+    자연어 질의 처리
+    
+    Neo4j는 비동기 드라이버, LLM은 비동기 클라이언트로 호출하고 임베딩 계산은
+    전용 스레드 풀에서 실행하므로 처리 중에도 이벤트 루프를 막지 않습니다.
+    서로 의존하지 않는 검색 단계는 QueryPlanner가 동시에 실행하며,
+    단계별 소요 시간(ms)은 응답의 timings에 담깁니다.
+    
+    Args:
+        request: 질의 요청
+    
+    Returns:
+        질의 응답 (답변, 노드, 엣지)
+    """
+    timer = StepTimer()
+    plan = None
+    status = "error"
+    try:
+        with timer.step("total"):
+            plan = await _retrieve(request.query, timer)
+            if plan.cached is None:
+                nodes, edges = plan.nodes, plan.edges
+                
+                # 4. LLM으로 답변 생성
+                llm = get_llm_provider()
+                user_prompt, answer_context = _build_answer_prompt(request.query, plan, timer)
+                with timer.step("generation"):
+                    answer = await llm.agenerate(user_prompt, system_prompt=ANSWER_SYSTEM_PROMPT)
+                _log_answer(answer)
         
-        answer = llm.generate(user_prompt, system_prompt=system_prompt)
-        
-        # LLM 답변 로깅
-        try:
-            answer_str = str(answer) if answer else ""
-            print(f"[LLM] 생성된 답변 길이: {len(answer_str)}자")
-            if answer_str:
-                preview = answer_str[:200] + "..." if len(answer_str) > 200 else answer_str
-                print(f"[LLM] 답변 미리보기: {preview}")
-        except Exception as e:
-            print(f"[LLM] 로깅 오류: {str(e)}")
-        
-        # 4. Retriever 종료
-        if hasattr(retriever, "close"):
-            retriever.close()
+        status = "ok"
+        if plan.cached is not None:
+            return plan.cached.model_copy(update={"timings": _response_timings(timer)})
         
         # 최종 응답 로깅
-        try:
-            print(f"[RESPONSE] 최종 반환: 노드 {len(nodes)}개, 엣지 {len(edges)}개")
-        except Exception as e:
-            print(f"[RESPONSE] 로깅 오류: {str(e)}")
+        logger.debug("[RESPONSE] 최종 반환: 노드 %d개, 엣지 %d개, 단계별 소요 시간(ms): %s", len(nodes), len(edges), timer.timings)
         
-        return QueryResponse(
+        response = QueryResponse(
             answer=answer,
             nodes=nodes,
             edges=edges,
-            retriever_used=retriever_name,
-            context=context
+            retriever_used=plan.retriever_name,
+            context=answer_context.text,
+            context_tokens=answer_context.tokens,
+            timings=_response_timings(timer)
+        )
+        _store_cache(request.query, plan.retriever_name, plan.query_embedding, response)
+        return response
+    
+    except LLMRateLimitedError as e:
+        # LLM Provider 속도 제한: 재시도 가능한 과부하이므로 503 + Retry-After
+        logger.warning("[QUERY] LLM 속도 제한: %s", e)
+        status = "rate_limited"
+        raise HTTPException(
+            status_code=503,
+            detail=f"LLM 요청이 많아 잠시 후 다시 시도해 주세요: {str(e)}",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
         )
     
     except Exception as e:
-        import traceback
-        error_detail = str(e)
-        error_traceback = traceback.format_exc()
-        print(f"\n{'='*80}")
-        print(f"[ERROR] 검색 중 오류 발생")
-        print(f"[ERROR] 질의: {request.query}")
-        print(f"[ERROR] 오류 메시지: {error_detail}")
-        print(f"[ERROR] 상세 추적:")
-        print(error_traceback)
-        print(f"{'='*80}\n")
-        raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {error_detail}")
+        _log_query_error(request.query, e)
+        raise HTTPException(status_code=500, detail=f"검색 중 오류 발생: {str(e)}")
+    
+    finally:
+        _observe("/query", plan, status, timer)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """server-sent event 한 건을 직렬화"""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    """
+    자연어 질의 처리 (server-sent events 스트리밍)
+    
+    검색이 끝나는 즉시 retrieval 이벤트로 노드/엣지를 보내고,
+    이후 LLM 답변을 token 이벤트로 생성되는 대로 전송합니다.
+    
+    이벤트 순서:
+        - retrieval: {"nodes", "edges", "retriever_used", "context", "context_tokens", "cache", "timings"}
+        - token: {"text"} (여러 번)
+        - done: {"answer", "timings"} (전체 답변, generation/total 포함 단계별 소요 시간)
+        - error: {"detail"} (오류 발생 시, 이후 스트림 종료)
+    """
+    async def event_stream() -> AsyncIterator[str]:
+        timer = StepTimer()
+        plan = None
+        status = "error"
+        try:
+            with timer.step("total"):
+                plan = await _retrieve(request.query, timer)
+                
+                cached = plan.cached
+                if cached is not None:
+                    # 캐시 응답은 답변 전체를 한 번에 전송
+                    yield _sse("retrieval", {
+                        "nodes": cached.nodes,
+                        "edges": cached.edges,
+                        "retriever_used": cached.retriever_used,
+                        "context": cached.context,
+                        "context_tokens": cached.context_tokens,
+                        "cache": cached.cache,
+                        "timings": _response_timings(timer)
+                    })
+                    answer = cached.answer
+                    yield _sse("token", {"text": answer})
+                else:
+                    nodes, edges = plan.nodes, plan.edges
+                    user_prompt, answer_context = _build_answer_prompt(request.query, plan, timer)
+                    yield _sse("retrieval", {
+                        "nodes": nodes,
+                        "edges": edges,
+                        "retriever_used": plan.retriever_name,
+                        "context": answer_context.text,
+                        "context_tokens": answer_context.tokens,
+                        "cache": None,
+                        "timings": _response_timings(timer)
+                    })
+                    
+                    llm = get_llm_provider()
+                    answer_parts = []
+                    with timer.step("generation"):
+                        async for token in llm.astream(user_prompt, system_prompt=ANSWER_SYSTEM_PROMPT):
+                            answer_parts.append(token)
+                            yield _sse("token", {"text": token})
+                    
+                    answer = "".join(answer_parts)
+                    _log_answer(answer)
+                    _store_cache(request.query, plan.retriever_name, plan.query_embedding, QueryResponse(
+                        answer=answer,
+                        nodes=nodes,
+                        edges=edges,
+                        retriever_used=plan.retriever_name,
+                        context=answer_context.text,
+                        context_tokens=answer_context.tokens
+                    ))
+            
+            status = "ok"
+            yield _sse("done", {"answer": answer, "timings": _response_timings(timer)})
+        
+        except LLMRateLimitedError as e:
+            logger.warning("[QUERY] LLM 속도 제한: %s", e)
+            status = "rate_limited"
+            yield _sse("error", {
+                "detail": f"LLM 요청이 많아 잠시 후 다시 시도해 주세요: {str(e)}",
+                "retry_after": max(1, math.ceil(e.retry_after))
+            })
+        
+        except Exception as e:
+            _log_query_error(request.query, e)
+            yield _sse("error", {"detail": f"검색 중 오류 발생: {str(e)}"})
+        
+        finally:
+            _observe("/query/stream", plan, status, timer)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 리버스 프록시(nginx)가 응답을 버퍼링하지 않도록 설정
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @app.get("/graph", response_model=GraphResponse)
-async def get_graph(limit: int = 100):
+def get_graph(limit: int = 100):
     """
     그래프 데이터 조회 (시각화용)
     
+    동기 드라이버를 사용하므로 일반 함수로 선언하여 FastAPI 스레드 풀에서 실행합니다.
+    
     Args:
         limit: 반환할 노드 수 제한
-        
+    
     Returns:
         그래프 데이터 (노드, 엣지)
     """
-    from neo4j import GraphDatabase
-    from app.config import settings
     from app.models.schema import Node, Edge
     
-    driver = GraphDatabase.driver(
-        settings.neo4j_uri,
-        auth=(settings.neo4j_username, settings.neo4j_password)
-    )
+    driver = get_driver()
     
     try:
         with driver.session() as session:
@@ -286,7 +561,7 @@ async def get_graph(limit: int = 100):
             )
             edge_count_record = count_result.single()
             total_edge_count = edge_count_record["edge_count"] if edge_count_record else 0
-            print(f"[DEBUG] 조회된 노드 {len(node_ids_list)}개 간의 관계 수: {total_edge_count}")
+            logger.debug("[GRAPH] 조회된 노드 %d개 간의 관계 수: %s", len(node_ids_list), total_edge_count)
             
             result = session.run(
                 """
@@ -323,7 +598,7 @@ async def get_graph(limit: int = 100):
                     properties=dict(rel) if hasattr(rel, "__dict__") else None
                 ))
             
-            print(f"[DEBUG] 조회된 엣지 수: {len(edges)}")
+            logger.debug("[GRAPH] 조회된 엣지 수: %d", len(edges))
             
             # 누락된 노드들 조회 및 추가
             if additional_node_ids:
@@ -369,18 +644,19 @@ async def get_graph(limit: int = 100):
                     valid_edges.append(edge)
                 else:
                     invalid_count += 1
-                    print(f"[DEBUG] 유효하지 않은 엣지: {edge.source} -> {edge.target} (source 존재: {edge.source in final_node_ids}, target 존재: {edge.target in final_node_ids})")
+                    logger.debug(
+                        "[GRAPH] 유효하지 않은 엣지: %s -> %s (source 존재: %s, target 존재: %s)",
+                        edge.source, edge.target, edge.source in final_node_ids, edge.target in final_node_ids
+                    )
             
-            print(f"[DEBUG] 유효한 엣지: {len(valid_edges)}개, 유효하지 않은 엣지: {invalid_count}개")
+            logger.debug("[GRAPH] 유효한 엣지: %d개, 유효하지 않은 엣지: %d개", len(valid_edges), invalid_count)
             edges = valid_edges
         
-        print(f"[DEBUG] 최종 반환: 노드 {len(nodes)}개, 엣지 {len(edges)}개")
+        logger.debug("[GRAPH] 최종 반환: 노드 %d개, 엣지 %d개", len(nodes), len(edges))
         return GraphResponse(nodes=nodes, edges=edges)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        driver.close()
 
 
 if __name__ == "__main__":
@@ -30,7 +30,10 @@ class QueryResponse(BaseModel):
     nodes: List[Node]
     edges: List[Edge]
     retriever_used: str
-    context: Optional[str] = None
+    context: Optional[str] = None  # 답변 생성에 사용한 컨텍스트 (토큰 예산 안에서 조립)
+    context_tokens: Optional[int] = None  # context의 토큰 수
+    cache: Optional[str] = None  # 캐시 응답이면 "exact" 또는 "semantic"
+    timings: Optional[Dict[str, float]] = None  # 단계별 소요 시간 (ms, 동시 실행 단계는 겹침)
 
 
 class GraphResponse(BaseModel):
@@ -0,0 +1,12 @@
+from .tracing import StepTimer
+from .metrics import Counter, Histogram, QueryMetrics, get_metrics
+from .log import setup_logging
+
+__all__ = [
+    "StepTimer",
+    "Counter",
+    "Histogram",
+    "QueryMetrics",
+    "get_metrics",
+    "setup_logging",
+]
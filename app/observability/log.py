@@ -0,0 +1,31 @@
+"""애플리케이션 로깅 설정"""
+import logging
+import sys
+from app.config import settings
+
+_configured = False
+
+
+def setup_logging():
+    """
+    "app" 로거 설정 (LOG_LEVEL, 한 번만 적용)
+    
+    상세 검색 로그(노드 목록, 사용된 쿼리 등)는 DEBUG, 캐시 히트/시작 정보는 INFO,
+    대체 경로로 전환한 오류는 WARNING 레벨로 기록됩니다.
+    TRACE_LOG=true이면 요청별 span 목록을 app.trace 로거로 JSON 한 줄씩 기록합니다.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    logger = logging.getLogger("app")
+    logger.setLevel(settings.log_level.upper())
+    logger.addHandler(handler)
+    logger.propagate = False
+    
+    if settings.trace_log:
+        logging.getLogger("app.trace").setLevel(logging.DEBUG)
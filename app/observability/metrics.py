@@ -0,0 +1,188 @@
+"""Prometheus 텍스트 형식 메트릭 (/metrics)"""
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.observability.tracing import StepTimer
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 답변 컨텍스트 토큰 수 히스토그램 버킷
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 16000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if math.isinf(value) else repr(float(value))
+
+
+class Counter:
+    """레이블별 누적 카운터"""
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """레이블별 누적 버킷 히스토그램"""
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # 레이블 값 → (버킷별 개수, 합계, 전체 개수)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class QueryMetrics:
+    """
+    /query 요청 메트릭
+    
+    - graphrag_requests_total: 엔드포인트/Retriever/캐시/결과별 요청 수
+    - graphrag_request_duration_seconds: 요청 전체 지연 시간
+    - graphrag_stage_duration_seconds: Retriever별 단계(route, embedding, retrieval.vector_search,
+      retrieval.expand, retrieval.cypher_generation, retrieval.cypher_execution, generation 등) 지연 시간
+    - graphrag_llm_calls_total: LLM Provider 호출 결과별 수 (ok, error, rate_limited, retried, coalesced, shed)
+    - graphrag_llm_wait_seconds: LLM 호출이 속도 제한/429 대기로 기다린 시간
+    - graphrag_context_tokens: 답변 프롬프트에 넣은 검색 컨텍스트 토큰 수
+    """
+    
+    def __init__(self):
+        self.requests = Counter(
+            "graphrag_requests_total",
+            "Number of query requests.",
+            ("endpoint", "retriever", "cache", "status")
+        )
+        self.request_duration = Histogram(
+            "graphrag_request_duration_seconds",
+            "End-to-end query request latency in seconds.",
+            ("endpoint", "retriever", "cache")
+        )
+        self.stage_duration = Histogram(
+            "graphrag_stage_duration_seconds",
+            "Query stage latency in seconds, per retriever.",
+            ("retriever", "stage")
+        )
+        self.llm_calls = Counter(
+            "graphrag_llm_calls_total",
+            "LLM provider calls by outcome.",
+            ("provider", "outcome")
+        )
+        self.llm_wait = Histogram(
+            "graphrag_llm_wait_seconds",
+            "Time LLM calls waited for the rate limiter or a 429 cooldown.",
+            ("provider",)
+        )
+        self.context_tokens = Histogram(
+            "graphrag_context_tokens",
+            "Tokens of retrieved context packed into the answer prompt.",
+            ("retriever",),
+            buckets=TOKEN_BUCKETS
+        )
+    
+    def observe(
+        self,
+        endpoint: str,
+        retriever: Optional[str],
+        cache: Optional[str],
+        status: str,
+        timer: StepTimer,
+        total_step: str = "total"
+    ):
+        """요청 하나의 단계별 시간 기록 (total_step은 요청 전체 시간으로 기록)"""
+        retriever = retriever or "unknown"
+        cache = cache or "miss"
+        self.requests.inc(endpoint=endpoint, retriever=retriever, cache=cache, status=status)
+        for stage, elapsed_ms in timer.timings.items():
+            if stage == total_step:
+                self.request_duration.observe(elapsed_ms / 1000, endpoint=endpoint, retriever=retriever, cache=cache)
+            else:
+                self.stage_duration.observe(elapsed_ms / 1000, retriever=retriever, stage=stage)
+    
+    def render(self) -> str:
+        lines = []
+        metrics = (
+            self.requests,
+            self.request_duration,
+            self.stage_duration,
+            self.llm_calls,
+            self.llm_wait,
+            self.context_tokens,
+        )
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_shared_metrics: Optional[QueryMetrics] = None
+
+
+def get_metrics() -> QueryMetrics:
+    """프로세스 공용 메트릭"""
+    global _shared_metrics
+    if _shared_metrics is None:
+        _shared_metrics = QueryMetrics()
+    return _shared_metrics
@@ -0,0 +1,80 @@
+"""요청 단위 단계별 소요 시간 / span 기록"""
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+trace_logger = logging.getLogger("app.trace")
+
+
+class StepTimer:
+    """
+    요청 하나의 단계별 소요 시간(ms)과 span 기록
+    
+    span은 요청 시작 기준 시작 시각(start_ms)과 소요 시간(duration_ms)을 가지므로
+    동시에 실행된 단계가 겹쳐 보입니다. 동시 실행 단계는 각자 시간을 기록하므로
+    단계별 합계가 전체 시간보다 클 수 있습니다.
+    """
+    
+    def __init__(self, parent: Optional["StepTimer"] = None, prefix: str = ""):
+        if parent is None:
+            self.trace_id = uuid.uuid4().hex[:16]
+            self.timings: Dict[str, float] = {}
+            self.spans: List[Dict[str, Any]] = []
+            self._start = time.perf_counter()
+            self._prefix = prefix
+        else:
+            # 하위 타이머: 부모와 같은 기록에 "prefix.단계" 이름으로 추가
+            self.trace_id = parent.trace_id
+            self.timings = parent.timings
+            self.spans = parent.spans
+            self._start = parent._start
+            self._prefix = f"{parent._prefix}{prefix}"
+    
+    def child(self, prefix: str) -> "StepTimer":
+        """prefix 아래에 단계를 기록하는 하위 타이머 (예: Retriever 내부 단계)"""
+        return StepTimer(self, f"{prefix}.")
+    
+    @contextmanager
+    def step(self, name: str, **attributes: Any) -> Iterator[None]:
+        """with 블록의 실행 시간을 name으로 기록 (예외가 발생해도 기록)"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if error is not None:
+                attributes["error"] = error
+            self.record(name, time.perf_counter() - start, start, attributes)
+    
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        start: Optional[float] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        name = self._prefix + name
+        elapsed_ms = round(seconds * 1000, 2)
+        if start is None:
+            start = time.perf_counter() - seconds
+        
+        self.timings[name] = elapsed_ms
+        span = {"name": name, "start_ms": round((start - self._start) * 1000, 2), "duration_ms": elapsed_ms}
+        if attributes:
+            span["attributes"] = attributes
+        self.spans.append(span)
+    
+    def log(self, **attributes: Any):
+        """span 목록을 JSON 한 줄로 기록 (app.trace 로거, DEBUG 레벨)"""
+        if trace_logger.isEnabledFor(logging.DEBUG):
+            trace_logger.debug(json.dumps(
+                {"trace_id": self.trace_id, **attributes, "spans": self.spans},
+                ensure_ascii=False,
+                default=str
+            ))
@@ -1,14 +1,30 @@
-from .base import BaseRetriever
+from .base import BaseRetriever, RetrievalState
+from .graph_builder import GraphResultBuilder
 from .text2cypher import Text2CypherRetriever
 from .vector import VectorRetriever
 from .vector_cypher import VectorCypherRetriever
+from .hybrid import HybridRetriever
 from .selector import RetrieverSelector
+from .router import QueryRouter, get_query_router
+from .registry import RetrieverRegistry, get_retriever_registry, get_retriever, close_retrievers
+from .planner import QueryPlanner, QueryPlan
 
 __all__ = [
     "BaseRetriever",
+    "RetrievalState",
+    "GraphResultBuilder",
     "Text2CypherRetriever",
     "VectorRetriever",
     "VectorCypherRetriever",
+    "HybridRetriever",
     "RetrieverSelector",
+    "QueryRouter",
+    "get_query_router",
+    "RetrieverRegistry",
+    "get_retriever_registry",
+    "get_retriever",
+    "close_retrievers",
+    "QueryPlanner",
+    "QueryPlan",
 ]
 
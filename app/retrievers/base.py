@@ -1,20 +1,105 @@
 """Base Retriever 추상 클래스"""
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Dict, Any
+from contextvars import ContextVar
+from typing import List, Tuple, Dict, Any, Optional
 from app.models.schema import Node, Edge
+from app.observability.tracing import StepTimer
+
+
+class RetrievalState:
+    """
+    검색 호출 하나의 상태 (단계별 소요 시간, 사용된 쿼리, 미리 시작한 검색)
+    
+    Retriever 인스턴스는 프로세스 전체가 공유하므로 요청별 상태는 인스턴스가 아니라
+    여기에 저장합니다. 상태는 contextvar로 전달되어 같은 요청에서 만든 asyncio 작업과
+    asyncio.to_thread 스레드는 같은 상태를 보고, 동시에 처리되는 다른 요청과는 섞이지 않습니다.
+    """
+    
+    def __init__(self, timer: Optional[StepTimer] = None):
+        self.timer = timer or StepTimer()
+        self.used_query: Optional[str] = None  # 실행한 Cypher/검색 설명 (로깅/응답용)
+        self.prefetch: Optional[Tuple[str, "asyncio.Future"]] = None  # (질의, 미리 시작한 검색 작업)
+    
+    def discard_prefetch(self):
+        """미리 시작했으나 사용하지 않은 검색 취소"""
+        if self.prefetch is not None:
+            self.prefetch[1].cancel()
+            self.prefetch = None
+
+
+_current_state: ContextVar[Optional[RetrievalState]] = ContextVar("retrieval_state", default=None)
 
 
 class BaseRetriever(ABC):
-    """Retriever 기본 인터페이스"""
+    """
+    Retriever 기본 인터페이스
+    
+    인스턴스는 RetrieverRegistry가 한 번 만들어 모든 요청이 공유하므로 (스레드/코루틴 안전)
+    요청별 값은 인스턴스 속성이 아니라 state(RetrievalState)에 기록합니다.
+    """
+    
+    # 검색에 질의 임베딩이 필요한지 (False면 플래너가 임베딩 계산을 기다리지 않고 검색 시작)
+    uses_query_embedding = True
+    
+    # 질의 임베딩 유사도로 답변 캐시를 재사용할 수 있는지
+    # (False면 정확 일치로만 캐시 조회, 질의의 이름/숫자가 결과를 결정하는 검색용)
+    semantic_cache = True
+    
+    def begin(self, timer: Optional[StepTimer] = None) -> RetrievalState:
+        """
+        현재 요청의 검색 상태 시작 (start_prefetch / 검색 작업 생성 전에 호출)
+        
+        Args:
+            timer: 검색 내부 단계를 기록할 타이머 (플래너는 요청 타이머의 하위 타이머 전달)
+        """
+        state = RetrievalState(timer)
+        _current_state.set(state)
+        return state
+    
+    def end(self, state: RetrievalState):
+        """요청의 검색 상태 정리 (사용하지 않은 미리 시작한 검색 취소)"""
+        state.discard_prefetch()
+    
+    @property
+    def state(self) -> RetrievalState:
+        """현재 요청의 검색 상태 (begin 없이 호출되면 새로 시작)"""
+        state = _current_state.get()
+        if state is None:
+            state = self.begin()
+        return state
+    
+    @property
+    def timer(self) -> StepTimer:
+        """현재 요청의 검색 내부 단계별 소요 시간"""
+        return self.state.timer
+    
+    def close(self):
+        """공유 리소스 정리 (애플리케이션 종료 시 RetrieverRegistry가 호출, 기본 구현은 없음)"""
+        pass
+    
+    def start_prefetch(self, query: str):
+        """
+        질의 임베딩 없이 시작할 수 있는 검색 단계를 미리 시작 (실행 중인 이벤트 루프에서 호출)
+        
+        플래너가 임베딩 계산 전에 호출하며, 이후 aretrieve가 결과를 사용합니다.
+        기본 구현은 아무것도 하지 않습니다.
+        """
+        pass
     
     @abstractmethod
-    def retrieve(self, query: str) -> Tuple[List[Node], List[Edge], str]:
+    def retrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
         """
         질의에 대한 검색 수행
         
         Args:
             query: 사용자 질의
-            
+            query_embedding: 이미 계산된 질의 임베딩 (있으면 벡터 검색에서 재사용)
+        
         Returns:
             (nodes, edges, context) 튜플
             - nodes: 검색된 노드 리스트
@@ -22,4 +107,16 @@ class BaseRetriever(ABC):
             - context: 검색 컨텍스트 (LLM에 전달할 텍스트)
         """
         pass
-
+    
+    async def aretrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """
+        비동기 검색 (이벤트 루프를 막지 않음)
+        
+        기본 구현은 retrieve를 스레드에서 실행합니다.
+        비동기 드라이버를 사용하는 Retriever는 이 메서드를 재정의합니다.
+        """
+        return await asyncio.to_thread(self.retrieve, query, query_embedding)
@@ -0,0 +1,124 @@
+"""Retriever 결과(노드/엣지) 조립"""
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.schema import Node, Edge
+
+
+def _is_relationship(value: Any) -> bool:
+    return hasattr(value, "type") and hasattr(value, "start_node") and hasattr(value, "end_node")
+
+
+def _is_node(value: Any) -> bool:
+    return hasattr(value, "id") and hasattr(value, "labels")
+
+
+def node_label(properties: Dict[str, Any], node_type: str, node_id: str) -> str:
+    """노드 표시 이름 (Content는 본문 앞부분, 그 외는 name/title)"""
+    if node_type == "Content":
+        return properties.get("text", "")[:50] + "..."
+    return properties.get("name") or properties.get("title") or properties.get("text", "")[:50] or node_id
+
+
+class GraphResultBuilder:
+    """
+    Neo4j 레코드를 API 응답용 Node/Edge로 변환하며 중복을 제거하는 빌더
+    
+    노드는 id, 엣지는 (source, target, relationship) 키로 인덱싱한 딕셔너리에 보관하므로
+    레코드 수와 관계없이 중복 확인이 O(1)이고, 같은 Neo4j 노드/관계는 한 번만 변환됩니다.
+    결과 순서는 처음 추가된 순서를 유지합니다.
+    """
+    
+    def __init__(self):
+        self._nodes: Dict[str, Node] = {}
+        self._edges: Dict[Tuple[str, str, str], Edge] = {}
+    
+    @property
+    def nodes(self) -> List[Node]:
+        return list(self._nodes.values())
+    
+    @property
+    def edges(self) -> List[Edge]:
+        return list(self._edges.values())
+    
+    def get_node(self, node_id: str) -> Optional[Node]:
+        return self._nodes.get(node_id)
+    
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self._nodes
+    
+    def count(self, node_type: str) -> int:
+        """특정 타입의 노드 수"""
+        return sum(1 for node in self._nodes.values() if node.type == node_type)
+    
+    def add(self, node: Node) -> Node:
+        """이미 만든 Node 추가 (같은 id가 있으면 기존 노드 반환)"""
+        return self._nodes.setdefault(node.id, node)
+    
+    def add_node(
+        self,
+        neo4j_node,
+        node_type: Optional[str] = None,
+        extra_properties: Optional[Dict[str, Any]] = None
+    ) -> Node:
+        """
+        Neo4j 노드 추가 (이미 추가된 노드는 변환하지 않고 기존 Node 반환)
+        
+        Args:
+            neo4j_node: Neo4j Node 객체
+            node_type: 노드 타입 (None이면 첫 번째 레이블)
+            extra_properties: 속성에 덧붙일 값 (예: relevance_score)
+        """
+        node_id = str(neo4j_node.id)
+        node = self._nodes.get(node_id)
+        if node is not None:
+            return node
+        
+        if node_type is None:
+            labels = list(neo4j_node.labels)
+            node_type = labels[0] if labels else "Unknown"
+        
+        properties = dict(neo4j_node)
+        if extra_properties:
+            properties.update(extra_properties)
+        
+        node = Node(
+            id=node_id,
+            label=node_label(properties, node_type, node_id),
+            type=node_type,
+            properties=properties
+        )
+        self._nodes[node_id] = node
+        return node
+    
+    def add_relationship(self, rel) -> Edge:
+        """Neo4j 관계 추가 (같은 source/target/타입의 엣지는 한 번만)"""
+        start_id = str(rel.start_node.id)
+        end_id = str(rel.end_node.id)
+        key = (start_id, end_id, rel.type)
+        
+        edge = self._edges.get(key)
+        if edge is None:
+            edge = Edge(
+                source=start_id,
+                target=end_id,
+                relationship=rel.type,
+                properties=dict(rel) if hasattr(rel, "__dict__") else None
+            )
+            self._edges[key] = edge
+        return edge
+    
+    def add_value(self, value: Any):
+        """레코드 값이 노드/관계이면 추가 (그 외 값은 무시)"""
+        if value is None:
+            return
+        if _is_relationship(value):
+            self.add_relationship(value)
+        elif _is_node(value):
+            self.add_node(value)
+    
+    def add_record(self, record):
+        """레코드의 모든 노드/관계 값 추가"""
+        for key in record.keys():
+            self.add_value(record[key])
+    
+    def build(self) -> Tuple[List[Node], List[Edge]]:
+        return self.nodes, self.edges
@@ -0,0 +1,216 @@
+"""Hybrid Retriever (전문 검색 + 벡터 검색)"""
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Tuple, Optional
+from app.config import settings
+from app.db.neo4j_pool import get_async_driver
+from app.models.schema import Node, Edge
+from app.retrievers.graph_builder import GraphResultBuilder
+from app.retrievers.vector import VectorRetriever
+
+logger = logging.getLogger(__name__)
+
+
+# Lucene 질의 문법의 특수 문자
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+# Lucene 불리언 연산자 (소문자로 바꿔 일반 단어로 검색)
+_LUCENE_OPERATORS = {"AND", "OR", "NOT"}
+
+
+class HybridRetriever(VectorRetriever):
+    """
+    전문 검색(키워드)과 벡터 검색 결과를 Reciprocal Rank Fusion으로 결합
+    
+    이름, 회사명, 종목 코드 같은 짧은 키워드 질의는 임베딩만으로는 정확히 찾기 어려우므로
+    Content.text / Article.title 전문 인덱스 검색을 벡터 검색과 동시에 실행하고,
+    두 순위 목록을 RRF(점수 = Σ 1 / (k + 순위))로 합칩니다. LLM 호출은 없습니다.
+    """
+    
+    FULLTEXT_INDEX = "news-fulltext"
+    
+    # 전문 검색 (Article 제목이 일치하면 첫 번째 청크를 대표 Content로 사용)
+    FULLTEXT_CYPHER = """
+    CALL db.index.fulltext.queryNodes('news-fulltext', $query, {limit: $k})
+    YIELD node, score
+    CALL {
+        WITH node
+        OPTIONAL MATCH (node)-[:HAS_CHUNK]->(chunk:Content)
+        WITH node, chunk
+        ORDER BY chunk.chunk_index
+        WITH node, collect(chunk) AS chunks
+        RETURN CASE WHEN node:Content THEN node ELSE head(chunks) END AS c
+    }
+    WITH c, max(score) AS score
+    WHERE c IS NOT NULL
+    RETURN c, score
+    ORDER BY score DESC
+    LIMIT $k
+    """
+    
+    def __init__(
+        self,
+        top_k: int = 5,
+        similarity_threshold: float = 0.5,
+        candidates: Optional[int] = None,
+        rrf_k: Optional[int] = None
+    ):
+        super().__init__(top_k=top_k, similarity_threshold=similarity_threshold)
+        self.candidates = max(candidates or settings.hybrid_candidates, top_k)  # 검색별 후보 수
+        self.rrf_k = rrf_k or settings.hybrid_rrf_k
+    
+    def start_prefetch(self, query: str):
+        """전문 검색은 질의 임베딩이 필요 없으므로 임베딩 계산과 동시에 시작"""
+        state = self.state
+        state.discard_prefetch()
+        state.prefetch = (query, asyncio.ensure_future(self._alexical_search(query)))
+    
+    @staticmethod
+    def lucene_query(query: str) -> Optional[str]:
+        """
+        사용자 질의를 Lucene 질의로 변환 (특수 문자 이스케이프, 단어 OR 검색)
+        
+        Returns:
+            Lucene 질의 문자열 (검색할 단어가 없으면 None)
+        """
+        terms = []
+        for term in query.split():
+            if term in _LUCENE_OPERATORS:
+                term = term.lower()
+            term = _LUCENE_SPECIAL.sub(r"\\\1", term)
+            if term:
+                terms.append(term)
+        return " ".join(terms) or None
+    
+    def _fulltext_label(self) -> str:
+        return f"CALL db.index.fulltext.queryNodes('{self.FULLTEXT_INDEX}', [query], {{limit: {self.candidates}}})"
+    
+    def _lexical_search(self, query: str) -> List[Tuple[Any, float]]:
+        """전문 인덱스 검색 (인덱스가 없으면 빈 결과)"""
+        lucene_query = self.lucene_query(query)
+        if lucene_query is None:
+            return []
+        
+        try:
+            with self.timer.step("lexical_search"), self.driver.session() as session:
+                result = session.run(self.FULLTEXT_CYPHER, query=lucene_query, k=self.candidates)
+                return [(record["c"], record["score"]) for record in result]
+        except Exception as e:
+            logger.warning("[HYBRID] 전문 검색 오류: %s, 벡터 검색 결과만 사용", e)
+            return []
+    
+    async def _alexical_search(self, query: str) -> List[Tuple[Any, float]]:
+        """_lexical_search의 비동기 버전"""
+        lucene_query = self.lucene_query(query)
+        if lucene_query is None:
+            return []
+        
+        try:
+            with self.timer.step("lexical_search"):
+                async with get_async_driver().session() as session:
+                    result = await session.run(self.FULLTEXT_CYPHER, query=lucene_query, k=self.candidates)
+                    return [(record["c"], record["score"]) async for record in result]
+        except Exception as e:
+            logger.warning("[HYBRID] 전문 검색 오류: %s, 벡터 검색 결과만 사용", e)
+            return []
+    
+    def retrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """전문 검색 + 벡터 검색 후 RRF 결합"""
+        if query_embedding is None:
+            query_embedding = self.embedding_generator.generate_single(query)
+        
+        vector_results, vector_query = self._vector_search(query_embedding, self.candidates)
+        lexical_results = self._lexical_search(query)
+        
+        builder, context_parts = self._build_fused_nodes(vector_results, lexical_results, vector_query)
+        self._expand(builder)
+        
+        nodes, edges = builder.build()
+        return nodes, edges, self._build_context(context_parts)
+    
+    async def aretrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """전문 검색 + 벡터 검색 후 RRF 결합 (두 검색을 동시에 실행)"""
+        state = self.state
+        if state.prefetch is not None and state.prefetch[0] == query:
+            lexical_search = state.prefetch[1]  # 플래너가 임베딩 계산 전에 시작한 전문 검색
+            state.prefetch = None
+        else:
+            lexical_search = self._alexical_search(query)
+        
+        async def vector_search():
+            # 임베딩 계산 중에도 전문 검색은 이미 진행 중
+            embedding = query_embedding
+            if embedding is None:
+                embedding = await self.embedding_generator.agenerate_single(query)
+            return await self._avector_search(embedding, self.candidates)
+        
+        (vector_results, vector_query), lexical_results = await asyncio.gather(
+            vector_search(),
+            lexical_search
+        )
+        
+        builder, context_parts = self._build_fused_nodes(vector_results, lexical_results, vector_query)
+        await self._aexpand(builder)
+        
+        nodes, edges = builder.build()
+        return nodes, edges, self._build_context(context_parts)
+    
+    def fuse(
+        self,
+        vector_results: List[Tuple[Any, float]],
+        lexical_results: List[Tuple[Any, float]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal Rank Fusion
+        
+        벡터 결과는 유사도 임계값 이상만 순위에 포함합니다.
+        
+        Returns:
+            [{"node", "rrf_score", "similarity_score", "lexical_score"}] (RRF 점수 내림차순)
+        """
+        fused: Dict[int, Dict[str, Any]] = {}
+        
+        ranked_vector = [(node, score) for node, score in vector_results if score >= self.similarity_threshold]
+        for source, results in (("similarity_score", ranked_vector), ("lexical_score", lexical_results)):
+            for rank, (node, score) in enumerate(results, start=1):
+                entry = fused.setdefault(node.id, {"node": node, "rrf_score": 0.0})
+                if source in entry:
+                    continue  # 같은 목록 안의 중복은 최고 순위만 반영
+                entry[source] = score
+                entry["rrf_score"] += 1.0 / (self.rrf_k + rank)
+        
+        return sorted(fused.values(), key=lambda entry: entry["rrf_score"], reverse=True)
+    
+    def _build_fused_nodes(
+        self,
+        vector_results: List[Tuple[Any, float]],
+        lexical_results: List[Tuple[Any, float]],
+        vector_query: str
+    ) -> Tuple[GraphResultBuilder, List[str]]:
+        """RRF 상위 K개 Content 노드와 컨텍스트 생성"""
+        fused = self.fuse(vector_results, lexical_results)
+        
+        # 쿼리 정보 저장 (로깅용)
+        self.state.used_query = f"{vector_query}\n+ {self._fulltext_label()}\n→ RRF(k={self.rrf_k}) top-{self.top_k}"
+        
+        builder = GraphResultBuilder()
+        context_parts = []
+        for entry in fused[:self.top_k]:
+            scores = {key: entry[key] for key in ("rrf_score", "similarity_score", "lexical_score") if key in entry}
+            builder.add_node(entry["node"], "Content", scores)
+            context_parts.append(entry["node"].get("text", ""))
+        
+        logger.debug(
+            "[HYBRID] 벡터 후보 %d개, 전문 검색 후보 %d개 → RRF 상위 %d개",
+            len(vector_results), len(lexical_results), len(context_parts)
+        )
+        return builder, context_parts
@@ -0,0 +1,130 @@
+"""/query 검색 실행 계획 (독립 단계 동시 실행)"""
+import asyncio
+import logging
+from typing import List, Optional
+from app.cache.answer_cache import get_answer_cache
+from app.config import settings
+from app.etl.embedding_generator import get_embedding_generator
+from app.models.schema import QueryResponse, Node, Edge
+from app.retrievers.base import BaseRetriever
+from app.retrievers.registry import get_retriever
+from app.retrievers.router import get_query_router
+from app.observability.tracing import StepTimer
+
+logger = logging.getLogger(__name__)
+
+
+class QueryPlan:
+    """QueryPlanner.execute 결과"""
+    
+    def __init__(self, retriever_name: str):
+        self.retriever_name = retriever_name
+        self.cached: Optional[QueryResponse] = None  # 캐시 히트 시 캐시된 응답
+        self.query_embedding: Optional[List[float]] = None
+        self.nodes: List[Node] = []
+        self.edges: List[Edge] = []
+        self.context: str = ""
+        self.used_query: Optional[str] = None
+
+
+class QueryPlanner:
+    """
+    /query 검색 단계 실행 계획
+    
+    단계 간 의존 관계는 route → 정확 일치 캐시 → 질의 임베딩 → 의미 유사도 캐시 → 검색이며,
+    의존 관계가 없는 단계는 동시에 실행합니다.
+    
+    route는 QueryRouter의 질의별 캐시(또는 키워드 규칙)로 먼저 결정하고, 처음 보는 질의는
+    질의 임베딩을 먼저 계산해 분류합니다 (route_classify). 이 경우 임베딩은 이미 계산되어
+    있으므로 의미 캐시 조회와 검색이 그대로 재사용합니다.
+    
+    - 의미 캐시를 쓰지 않는 Retriever(Text2Cypher)는 정확 일치 캐시만 조회하며, 질의 임베딩이
+      필요 없으면 임베딩을 계산하지 않고 바로 검색을 시작합니다.
+    - 질의 임베딩이 필요 없지만 의미 캐시를 쓰는 Retriever는 임베딩 계산/의미 캐시 조회와 동시에
+      검색을 시작합니다 (QUERY_SPECULATIVE_RETRIEVAL, 캐시 히트 시 취소).
+    - 임베딩이 필요한 Retriever도 임베딩 없이 가능한 단계(Hybrid의 전문 검색)는 먼저 시작합니다.
+    
+    단계별 소요 시간은 timer에 기록됩니다 (Retriever 내부 단계는 "retrieval.단계").
+    """
+    
+    def __init__(self, query_text: str, timer: Optional[StepTimer] = None):
+        self.query_text = query_text
+        self.timer = timer or StepTimer()
+    
+    async def execute(self) -> QueryPlan:
+        """캐시 조회와 검색 실행 (캐시 히트면 plan.cached에 응답)"""
+        router = get_query_router()
+        with self.timer.step("route"):
+            retriever_name = router.route(self.query_text)
+        
+        cache = get_answer_cache() if settings.answer_cache_enabled else None
+        if cache is not None:
+            with self.timer.step("cache_exact"):
+                cached = cache.get_exact(self.query_text)
+            if cached is not None:
+                logger.info("[CACHE] 정확 일치 히트: %s", self.query_text)
+                plan = QueryPlan(retriever_name or cached.retriever_used)
+                plan.cached = cached.model_copy(update={"cache": "exact"})
+                return plan
+        
+        query_embedding = None
+        if retriever_name is None:
+            # 처음 보는 질의: 임베딩으로 분류 (임베딩은 아래 단계에서 재사용)
+            query_embedding = await self._embed()
+            with self.timer.step("route_classify"):
+                retriever_name = router.route(self.query_text, query_embedding)
+        plan = QueryPlan(retriever_name)
+        plan.query_embedding = query_embedding
+        
+        retriever = get_retriever(plan.retriever_name)
+        state = retriever.begin(self.timer.child("retrieval"))
+        retrieval = None
+        semantic_cache = cache is not None and retriever.semantic_cache
+        try:
+            if not retriever.uses_query_embedding and (not semantic_cache or settings.query_speculative_retrieval):
+                # 임베딩이 필요 없는 검색은 바로 시작
+                retrieval = asyncio.ensure_future(self._retrieve(retriever, None))
+            else:
+                retriever.start_prefetch(self.query_text)
+            
+            if plan.query_embedding is None and (semantic_cache or retriever.uses_query_embedding):
+                plan.query_embedding = await self._embed()
+            
+            if semantic_cache:
+                with self.timer.step("cache_semantic"):
+                    hit = cache.get_similar(plan.query_embedding, plan.retriever_name)
+                if hit is not None:
+                    cached, score = hit
+                    logger.info("[CACHE] 의미 유사도 히트 (유사도 %.3f): %s", score, self.query_text)
+                    plan.cached = cached.model_copy(update={"cache": "semantic"})
+                    return plan
+            
+            if retrieval is None:
+                retrieval = asyncio.ensure_future(self._retrieve(retriever, plan.query_embedding))
+            plan.nodes, plan.edges, plan.context = await retrieval
+            
+            # 사용된 쿼리 정보 (로깅/응답용)
+            plan.used_query = state.used_query
+        finally:
+            self._discard(retrieval)
+            retriever.end(state)
+        
+        return plan
+    
+    async def _embed(self) -> List[float]:
+        with self.timer.step("embedding"):
+            return await get_embedding_generator().agenerate_single(self.query_text)
+    
+    async def _retrieve(self, retriever: BaseRetriever, query_embedding: Optional[List[float]]):
+        with self.timer.step("retrieval"):
+            return await retriever.aretrieve(self.query_text, query_embedding)
+    
+    @staticmethod
+    def _discard(task: Optional[asyncio.Future]):
+        """사용하지 않은 검색 작업 취소 (이미 끝났으면 예외를 확인 처리)"""
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
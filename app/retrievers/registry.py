@@ -0,0 +1,95 @@
+"""공유 Retriever 인스턴스 레지스트리"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+from app.retrievers.base import BaseRetriever
+from app.retrievers.selector import RetrieverSelector
+
+logger = logging.getLogger(__name__)
+
+
+class RetrieverRegistry:
+    """
+    Retriever 이름 → 프로세스 공용 인스턴스
+    
+    Retriever는 드라이버, EmbeddingGenerator, LLM Provider를 잡고 있으므로 요청마다 만들지 않고
+    처음 요청될 때(또는 서버 시작 시 warmup) 한 번 만들어 모든 요청이 공유합니다.
+    요청별 상태는 RetrievalState(contextvar)에 기록되므로 동시 요청이 같은 인스턴스를 사용해도 안전합니다.
+    서버 종료 시 close가 각 인스턴스의 close를 호출합니다.
+    """
+    
+    def __init__(self, factories: Optional[Dict[str, Callable[[], BaseRetriever]]] = None):
+        self.factories = dict(factories or RetrieverSelector.RETRIEVERS)
+        self._instances: Dict[str, BaseRetriever] = {}
+        self._created_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: str) -> BaseRetriever:
+        """name에 해당하는 공유 Retriever (없으면 생성)"""
+        retriever = self._instances.get(name)
+        if retriever is not None:
+            return retriever
+        
+        with self._lock:
+            if name not in self._instances:
+                if name not in self.factories:
+                    raise ValueError(f"알 수 없는 Retriever: {name}")
+                start = time.perf_counter()
+                self._instances[name] = self.factories[name]()
+                self._created_seconds[name] = round(time.perf_counter() - start, 3)
+            return self._instances[name]
+    
+    def warmup(self, names: Optional[Iterable[str]] = None):
+        """Retriever를 미리 생성 (서버 시작 시 호출, 실패한 Retriever는 첫 요청 때 다시 시도)"""
+        for name in names or self.factories:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning("[REGISTRY] %s Retriever 생성 실패: %s", name, e)
+    
+    def close(self):
+        """모든 공유 Retriever 정리 (서버 종료 시 호출)"""
+        with self._lock:
+            instances = list(self._instances.items())
+            self._instances.clear()
+            self._created_seconds.clear()
+        
+        for name, retriever in instances:
+            try:
+                retriever.close()
+            except Exception as e:
+                logger.warning("[REGISTRY] %s Retriever 종료 실패: %s", name, e)
+    
+    def stats(self) -> Dict[str, float]:
+        """생성된 Retriever와 생성 소요 시간(초) (헬스 체크용)"""
+        with self._lock:
+            return dict(self._created_seconds)
+
+
+_shared_registry: Optional[RetrieverRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_retriever_registry() -> RetrieverRegistry:
+    """프로세스 공용 RetrieverRegistry"""
+    global _shared_registry
+    if _shared_registry is None:
+        with _registry_lock:
+            if _shared_registry is None:
+                _shared_registry = RetrieverRegistry()
+    return _shared_registry
+
+
+def get_retriever(name: str) -> BaseRetriever:
+    """공유 Retriever 인스턴스"""
+    return get_retriever_registry().get(name)
+
+
+def close_retrievers():
+    """공유 Retriever 전체 정리 (애플리케이션 종료 시 호출)"""
+    global _shared_registry
+    with _registry_lock:
+        if _shared_registry is not None:
+            _shared_registry.close()
+            _shared_registry = None
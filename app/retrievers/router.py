@@ -0,0 +1,251 @@
+"""질의 임베딩 기반 Retriever 라우팅 분류기"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.cache.answer_cache import AnswerCache
+from app.config import settings
+from app.etl.embedding_generator import get_embedding_generator
+from app.retrievers.selector import RetrieverSelector
+
+logger = logging.getLogger(__name__)
+
+
+# 라벨 예시 질의 (Retriever 이름 → 질의 목록)
+# hybrid 라벨은 HYBRID_SEARCH_ENABLED=false이면 vector로 라우팅됩니다.
+ROUTING_EXAMPLES: Dict[str, List[str]] = {
+    "text2cypher": [
+        "모든 카테고리 목록을 보여줘",
+        "카테고리별 기사 수는 몇 개야?",
+        "어떤 카테고리가 가장 많은 기사를 가지고 있어?",
+        "언론사 목록을 알려줘",
+        "어떤 언론사가 가장 많은 기사를 발행했어?",
+        "각 언론사별 기사 수는?",
+        "언론사가 발행한 기사 목록",
+        "특정 카테고리에 속한 기사들",
+        "데이터베이스에 있는 모든 노드 타입은?",
+        "기사와 카테고리의 관계는?",
+        "가장 최근에 발행된 기사 10개",
+        "기사가 하나도 없는 카테고리는?",
+        "경제 카테고리 기사는 몇 개야?",
+        "전체 기사 수를 알려줘",
+    ],
+    "hybrid": [
+        "AI",
+        "경제",
+        "반도체",
+        "해킹 방지",
+        "인공지능 기술",
+        "경제 뉴스",
+        "금융 시장",
+        "최근 AI 뉴스",
+        "전기차 배터리",
+        "부동산 대출 규제",
+        "해킹 방지하는 방법",
+        "삼성전자 실적",
+        "금리 인상",
+        "기후 변화 대응",
+    ],
+    "vector_cypher": [
+        "최근 AI 기술 동향을 분석해줘",
+        "경제 뉴스의 주요 트렌드를 요약해줘",
+        "정치 관련 기사들을 비교 분석해줘",
+        "최근 1개월간 인공지능 관련 뉴스 요약",
+        "경제 분야에서 가장 많이 다뤄진 주제는?",
+        "정치 뉴스에서 반복적으로 나타나는 키워드는?",
+        "언론사별로 발행한 경제 뉴스 비교",
+        "카테고리별 기술 트렌드 분석",
+        "AI와 관련된 기사 중에서 가장 최근 것들",
+        "경제 뉴스에서 언급된 주요 기업들",
+        "금리 인상이 부동산 시장에 미친 영향은?",
+        "반도체 수출 감소의 원인과 결과를 설명해줘",
+        "전기차 보조금 정책 변화가 업계에 어떤 의미가 있어?",
+        "최근 해킹 사고들의 공통된 패턴은 뭐야?",
+    ],
+}
+
+
+def load_routing_examples(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    라벨 예시 질의 로드 (기본 예시 + ROUTING_EXAMPLES_PATH JSON 파일)
+    
+    JSON 파일 형식: {"text2cypher": ["질의", ...], "hybrid": [...], "vector_cypher": [...]}
+    """
+    examples = {label: list(queries) for label, queries in ROUTING_EXAMPLES.items()}
+    path = settings.routing_examples_path if path is None else path
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            extra = json.load(f)
+        for label, queries in extra.items():
+            if label not in RetrieverSelector.RETRIEVERS:
+                raise ValueError(f"알 수 없는 Retriever 라벨: {label}")
+            examples.setdefault(label, []).extend(queries)
+    return examples
+
+
+class QueryRouter:
+    """
+    질의 임베딩 최근접 중심(nearest centroid) 분류기
+    
+    라벨 예시 질의의 임베딩을 Retriever별로 평균·정규화한 중심 벡터를 만들고,
+    질의 임베딩과 코사인 유사도가 가장 높은 중심의 Retriever로 라우팅합니다.
+    임베딩은 /query가 의미 캐시와 검색에 어차피 계산하는 값을 재사용하므로
+    분류 비용은 (라벨 수 × 차원) 행렬곱 한 번입니다.
+    
+    1·2위 유사도 차이가 ROUTING_MIN_MARGIN보다 작으면 키워드 규칙(RetrieverSelector.route)을 따르며,
+    결정은 정규화한 질의 문자열별로 LRU 캐시해 같은 질의는 임베딩 없이 바로 라우팅합니다.
+    """
+    
+    def __init__(self, min_margin: Optional[float] = None, cache_size: Optional[int] = None):
+        self.min_margin = settings.routing_min_margin if min_margin is None else min_margin
+        self.cache_size = max(0, settings.routing_cache_size if cache_size is None else cache_size)
+        
+        self.labels: List[str] = []
+        self.centroids: Optional[np.ndarray] = None  # (라벨 수, 차원) 정규화 행렬
+        
+        self.classified = 0
+        self.rule_fallbacks = 0
+        self.cache_hits = 0
+        
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+    
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+    
+    def fit(self, examples: Dict[str, List[str]], embeddings: Optional[Dict[str, List[List[float]]]] = None):
+        """
+        라벨별 중심 벡터 계산
+        
+        Args:
+            examples: Retriever 이름 → 예시 질의 목록
+            embeddings: 예시 질의 임베딩 (없으면 공용 EmbeddingGenerator로 계산)
+        """
+        if embeddings is None:
+            generator = get_embedding_generator()
+            embeddings = {label: generator.generate(queries) for label, queries in examples.items() if queries}
+        
+        labels = []
+        centroids = []
+        for label, vectors in embeddings.items():
+            if not vectors:
+                continue
+            centroid = self._unit(np.asarray(vectors, dtype=np.float32)).mean(axis=0)
+            labels.append(label)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+        
+        with self._lock:
+            self.labels = labels
+            self.centroids = np.vstack(centroids) if centroids else None
+            self._cache.clear()
+    
+    def scores(self, query_embedding: List[float]) -> List[Tuple[str, float]]:
+        """라벨별 코사인 유사도 (높은 순)"""
+        if self.centroids is None:
+            return []
+        vector = self._unit(np.asarray(query_embedding, dtype=np.float32))
+        similarities = self.centroids @ vector
+        order = np.argsort(-similarities)
+        return [(self.labels[i], float(similarities[i])) for i in order]
+    
+    def classify(self, query: str, query_embedding: List[float]) -> str:
+        """임베딩으로 Retriever 결정 (확신이 낮으면 키워드 규칙)"""
+        ranked = self.scores(query_embedding)
+        if not ranked:
+            return RetrieverSelector.route(query)
+        
+        margin = ranked[0][1] - ranked[1][1] if len(ranked) > 1 else ranked[0][1]
+        if margin < self.min_margin:
+            self.rule_fallbacks += 1
+            return RetrieverSelector.route(query)
+        
+        self.classified += 1
+        return self._available(ranked[0][0])
+    
+    def route(self, query: str, query_embedding: Optional[List[float]] = None) -> Optional[str]:
+        """
+        질의에 맞는 Retriever 이름 결정
+        
+        Args:
+            query: 사용자 질의
+            query_embedding: 질의 임베딩 (없으면 캐시된 결정만 사용)
+        
+        Returns:
+            Retriever 이름. 분류기가 학습되지 않았으면 키워드 규칙 결과,
+            캐시에 없고 임베딩도 없으면 None (임베딩 계산 후 다시 호출)
+        """
+        if self.centroids is None:
+            return RetrieverSelector.route(query)
+        
+        key = AnswerCache.normalize(query)
+        with self._lock:
+            name = self._cache.get(key)
+            if name is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return name
+        
+        if query_embedding is None:
+            return None
+        
+        name = self.classify(query, query_embedding)
+        if self.cache_size:
+            with self._lock:
+                self._cache[key] = name
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return name
+    
+    @staticmethod
+    def _available(name: str) -> str:
+        if name == "hybrid" and not settings.hybrid_search_enabled:
+            return "vector"
+        return name
+    
+    @staticmethod
+    def _unit(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+    
+    def stats(self) -> Dict[str, object]:
+        """라우팅 통계 (헬스 체크용)"""
+        with self._lock:
+            cached = len(self._cache)
+        return {
+            "trained": self.trained,
+            "labels": list(self.labels),
+            "classified": self.classified,
+            "rule_fallbacks": self.rule_fallbacks,
+            "cache_hits": self.cache_hits,
+            "cached_queries": cached,
+        }
+
+
+_shared_router: Optional[QueryRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_query_router() -> QueryRouter:
+    """프로세스 공용 QueryRouter (학습은 train_query_router로 수행)"""
+    global _shared_router
+    if _shared_router is None:
+        with _router_lock:
+            if _shared_router is None:
+                _shared_router = QueryRouter()
+    return _shared_router
+
+
+def train_query_router() -> QueryRouter:
+    """공용 QueryRouter를 라벨 예시로 학습 (서버 시작 시 호출)"""
+    router = get_query_router()
+    examples = load_routing_examples()
+    router.fit(examples)
+    logger.info(
+        "[ROUTER] 라우팅 분류기 학습: %s",
+        ", ".join(f"{label} {len(queries)}개" for label, queries in examples.items())
+    )
+    return router
@@ -1,6 +1,8 @@
 """Retriever 자동 선택 로직"""
 from typing import Tuple
+from app.config import settings
 from app.retrievers.base import BaseRetriever
+from app.retrievers.hybrid import HybridRetriever
 from app.retrievers.text2cypher import Text2CypherRetriever
 from app.retrievers.vector import VectorRetriever
 from app.retrievers.vector_cypher import VectorCypherRetriever
@@ -21,16 +23,24 @@ class RetrieverSelector:
         "영향", "원인", "결과", "의미"
     ]
     
+    # Retriever 이름 → 클래스
+    RETRIEVERS = {
+        "text2cypher": Text2CypherRetriever,
+        "vector": VectorRetriever,
+        "vector_cypher": VectorCypherRetriever,
+        "hybrid": HybridRetriever,
+    }
+    
     @classmethod
-    def select(cls, query: str) -> Tuple[BaseRetriever, str]:
+    def route(cls, query: str) -> str:
         """
-        질의에 따라 Retriever 선택
+        질의에 맞는 Retriever 이름 결정 (인스턴스는 만들지 않음)
         
         Args:
             query: 사용자 질의
-            
+        
         Returns:
-            (retriever, retriever_name) 튜플
+            "text2cypher", "vector", "vector_cypher", "hybrid" 중 하나
         """
         query_lower = query.lower()
         query_length = len(query.split())
@@ -44,11 +54,27 @@ class RetrieverSelector:
         # 선택 로직
         if has_structural and not has_analytical:
             # 관계/구조 질문 → Text2Cypher
-            return Text2CypherRetriever(), "text2cypher"
+            return "text2cypher"
         elif query_length <= 5 and not has_analytical:
-            # 짧은 의미 검색 → Vector
-            return VectorRetriever(), "vector"
+            # 짧은 키워드 검색 → Hybrid (전문 검색 + 벡터), 비활성화 시 Vector
+            return "hybrid" if settings.hybrid_search_enabled else "vector"
         else:
             # 긴 질문, 분석형 질문 → VectorCypher
-            return VectorCypherRetriever(), "vector_cypher"
+            return "vector_cypher"
+    
+    @classmethod
+    def select(cls, query: str) -> Tuple[BaseRetriever, str]:
+        """
+        질의에 따라 Retriever 선택 (RetrieverRegistry의 공유 인스턴스)
+        
+        Args:
+            query: 사용자 질의
+        
+        Returns:
+            (retriever, retriever_name) 튜플
+        """
+        from app.retrievers.registry import get_retriever  # registry가 RETRIEVERS를 참조하므로 지연 import
+        
+        retriever_name = cls.route(query)
+        return get_retriever(retriever_name), retriever_name
 
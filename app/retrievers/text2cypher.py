@@ -1,15 +1,24 @@
 """Text2Cypher Retriever"""
-from typing import List, Tuple
-from neo4j import GraphDatabase
+import logging
+from typing import List, Tuple, Optional, Dict, Any
+from app.cache.cypher_cache import get_cypher_cache
 from app.config import settings
+from app.db.neo4j_pool import get_driver, get_async_driver
 from app.llm.factory import get_llm_provider
 from app.models.schema import Node, Edge
 from app.retrievers.base import BaseRetriever
+from app.retrievers.graph_builder import GraphResultBuilder
+
+logger = logging.getLogger(__name__)
 
 
 class Text2CypherRetriever(BaseRetriever):
     """자연어를 Cypher로 변환하여 검색"""
     
+    uses_query_embedding = False
+    # "한겨레 기사 목록"과 "조선일보 기사 목록"은 임베딩이 거의 같지만 결과가 다름
+    semantic_cache = False
+    
     ONTOLOGY_SCHEMA = """
     온톨로지 구조:
     
@@ -25,20 +34,30 @@ class Text2CypherRetriever(BaseRetriever):
     - (Article)-[:HAS_CHUNK]->(Content): 기사가 본문 청크를 가짐
     """
     
+    # LLM 오류 시 사용하는 기본 쿼리 (관계 포함)
+    FALLBACK_CYPHER = """
+    MATCH (a:Article)-[r1:HAS_CHUNK]->(c:Content)
+    OPTIONAL MATCH (a)-[r2:BELONGS_TO]->(cat:Category)
+    OPTIONAL MATCH (m:Media)-[r3:PUBLISHED]->(a)
+    RETURN a, r1, c, r2, cat, r3, m
+    LIMIT 20
+    """
+    
+    # 질의에서 슬롯으로 추출할 언론사/카테고리 이름
+    VOCABULARY_CYPHER = """
+    MATCH (n)
+    WHERE (n:Media OR n:Category) AND n.name IS NOT NULL
+    RETURN CASE WHEN n:Media THEN 'media' ELSE 'category' END AS kind, n.name AS name
+    """
+    
     def __init__(self):
-        self.driver = GraphDatabase.driver(
-            settings.neo4j_uri,
-            auth=(settings.neo4j_username, settings.neo4j_password)
-        )
+        self.driver = get_driver()
         self.llm = get_llm_provider()
+        self.cache = get_cypher_cache() if settings.cypher_cache_enabled else None
     
-    def close(self):
-        """드라이버 종료"""
-        self.driver.close()
-    
-    def _generate_cypher(self, query: str) -> str:
-        """자연어 질의를 Cypher로 변환"""
-        prompt = f"""
+    def _cypher_prompt(self, query: str) -> str:
+        """Cypher 생성 프롬프트"""
+        return f"""
         다음은 Neo4j 그래프 데이터베이스의 온톨로지 구조입니다:
         
         {self.ONTOLOGY_SCHEMA}
@@ -56,8 +75,11 @@ class Text2CypherRetriever(BaseRetriever):
         
         Cypher 쿼리만 반환하세요 (설명 없이):
         """
-        
-        cypher = self.llm.generate(prompt).strip()
+    
+    @staticmethod
+    def _clean_cypher(cypher: str) -> str:
+        """LLM 응답에서 코드 블록 표시 제거"""
+        cypher = cypher.strip()
         
         # ```cypher 또는 ``` 제거
         if cypher.startswith("```"):
@@ -70,87 +92,159 @@ class Text2CypherRetriever(BaseRetriever):
         
         return cypher
     
-    def retrieve(self, query: str) -> Tuple[List[Node], List[Edge], str]:
-        """Cypher 쿼리를 생성하고 실행하여 결과 반환"""
+    def _generate_cypher(self, query: str) -> str:
+        """자연어 질의를 Cypher로 변환"""
+        with self.timer.step("cypher_generation"):
+            return self._clean_cypher(self.llm.generate(self._cypher_prompt(query)))
+    
+    async def _agenerate_cypher(self, query: str) -> str:
+        """자연어 질의를 Cypher로 변환 (비동기)"""
+        with self.timer.step("cypher_generation"):
+            return self._clean_cypher(await self.llm.agenerate(self._cypher_prompt(query)))
+    
+    def _lookup_template(self, query: str) -> Tuple[Optional[str], list, Optional[Tuple[str, Dict[str, Any]]]]:
+        """
+        질의 형태로 캐시된 Cypher 템플릿 조회
+        
+        Returns:
+            (shape, slots, (템플릿, 파라미터) 또는 None) 튜플 (캐시할 수 없는 질의면 shape는 None)
+        """
+        if self.cache is None:
+            return None, [], None
+        
+        shape, slots = self.cache.extract(query)
+        if shape is None:
+            logger.debug("[TEXT2CYPHER] 엔티티 이름이 다른 단어의 일부로 쓰여 템플릿 캐시 사용 안 함: %s", query)
+            return None, slots, None
+        cached = self.cache.lookup(shape, slots)
+        if cached is not None:
+            logger.debug("[TEXT2CYPHER] 캐시된 Cypher 템플릿 사용: %s %s", shape, cached[1])
+        return shape, slots, cached
+    
+    def _store_template(self, shape: Optional[str], slots: list, cypher: str):
+        """실행에 성공하고 결과가 있는 생성 Cypher를 템플릿으로 저장"""
+        if self.cache is not None and shape is not None:
+            if self.cache.store(shape, slots, cypher):
+                logger.debug("[TEXT2CYPHER] Cypher 템플릿 저장: %s", shape)
+    
+    def _invalidate_template(self, shape: str, error: Exception):
+        logger.warning("[TEXT2CYPHER] 캐시된 템플릿 실행 오류: %s, 템플릿 삭제 후 다시 생성", error)
+        self.cache.invalidate(shape)
+    
+    def _records(self, cypher: str, params: Optional[Dict[str, Any]] = None, step: str = "cypher_execution") -> list:
+        with self.timer.step(step), self.driver.session() as session:
+            result = session.run(cypher, params or {})
+            return list(result)
+    
+    async def _arecords(self, cypher: str, params: Optional[Dict[str, Any]] = None, step: str = "cypher_execution") -> list:
+        with self.timer.step(step):
+            async with get_async_driver().session() as session:
+                result = await session.run(cypher, params or {})
+                return [record async for record in result]
+    
+    def retrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """Cypher 쿼리를 생성(또는 캐시된 템플릿 사용)하고 실행하여 결과 반환 (query_embedding은 사용하지 않음)"""
+        if self.cache is not None and self.cache.needs_vocabulary():
+            try:
+                self.cache.set_vocabulary((r["kind"], r["name"]) for r in self._records(self.VOCABULARY_CYPHER, step="vocabulary"))
+            except Exception as e:
+                logger.warning("[TEXT2CYPHER] 엔티티 이름 로드 실패: %s", e)
+        
+        shape, slots, cached = self._lookup_template(query)
+        if cached is not None:
+            cypher, params = cached
+            self.state.used_query = f"{cypher}\n// params: {params}"
+            try:
+                records = self._records(cypher, params)
+                logger.debug("[TEXT2CYPHER] 쿼리 실행 결과: %d개 레코드", len(records))
+                return self._build_result(records)
+            except Exception as e:
+                self._invalidate_template(shape, e)
+        
+        generated = True
         try:
             cypher = self._generate_cypher(query)
-            print(f"[TEXT2CYPHER] 생성된 Cypher 쿼리:\n{cypher}")
+            logger.debug("[TEXT2CYPHER] 생성된 Cypher 쿼리:\n%s", cypher)
         except Exception as e:
-            print(f"[TEXT2CYPHER] LLM 오류: {e}, 기본 쿼리 사용")
-            # LLM 오류 시 기본 쿼리 사용 (관계 포함)
-            cypher = """
-            MATCH (a:Article)-[r1:HAS_CHUNK]->(c:Content)
-            OPTIONAL MATCH (a)-[r2:BELONGS_TO]->(cat:Category)
-            OPTIONAL MATCH (m:Media)-[r3:PUBLISHED]->(a)
-            RETURN a, r1, c, r2, cat, r3, m
-            LIMIT 20
-            """
+            logger.warning("[TEXT2CYPHER] LLM 오류: %s, 기본 쿼리 사용", e)
+            cypher = self.FALLBACK_CYPHER
+            generated = False
         
         # 쿼리 정보 저장 (로깅용)
-        self.last_cypher = cypher
+        self.state.used_query = cypher
         
         try:
-            with self.driver.session() as session:
-                result = session.run(cypher)
-                records = list(result)
-            print(f"[TEXT2CYPHER] 쿼리 실행 결과: {len(records)}개 레코드")
+            records = self._records(cypher)
+            logger.debug("[TEXT2CYPHER] 쿼리 실행 결과: %d개 레코드", len(records))
         except Exception as e:
-            print(f"[TEXT2CYPHER] Cypher 실행 오류: {e}")
+            logger.warning("[TEXT2CYPHER] Cypher 실행 오류: %s", e)
             return [], [], f"Cypher 쿼리 실행 오류: {str(e)}"
         
-        nodes = []
-        edges = []
-        node_ids = set()
+        # 결과가 없는 쿼리는 잘못 생성됐을 수 있으므로 템플릿으로 재사용하지 않음
+        if generated and records:
+            self._store_template(shape, slots, cypher)
         
-        # 관계를 먼저 수집하여 노드 ID 추출
-        relationship_nodes = set()
+        return self._build_result(records)
+    
+    async def aretrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """Cypher 쿼리를 비동기로 생성(또는 캐시된 템플릿 사용)하고 실행하여 결과 반환"""
+        if self.cache is not None and self.cache.needs_vocabulary():
+            try:
+                records = await self._arecords(self.VOCABULARY_CYPHER, step="vocabulary")
+                self.cache.set_vocabulary((r["kind"], r["name"]) for r in records)
+            except Exception as e:
+                logger.warning("[TEXT2CYPHER] 엔티티 이름 로드 실패: %s", e)
         
+        shape, slots, cached = self._lookup_template(query)
+        if cached is not None:
+            cypher, params = cached
+            self.state.used_query = f"{cypher}\n// params: {params}"
+            try:
+                records = await self._arecords(cypher, params)
+                logger.debug("[TEXT2CYPHER] 쿼리 실행 결과: %d개 레코드", len(records))
+                return self._build_result(records)
+            except Exception as e:
+                self._invalidate_template(shape, e)
+        
+        generated = True
+        try:
+            cypher = await self._agenerate_cypher(query)
+            logger.debug("[TEXT2CYPHER] 생성된 Cypher 쿼리:\n%s", cypher)
+        except Exception as e:
+            logger.warning("[TEXT2CYPHER] LLM 오류: %s, 기본 쿼리 사용", e)
+            cypher = self.FALLBACK_CYPHER
+            generated = False
+        
+        # 쿼리 정보 저장 (로깅용)
+        self.state.used_query = cypher
+        
+        try:
+            records = await self._arecords(cypher)
+            logger.debug("[TEXT2CYPHER] 쿼리 실행 결과: %d개 레코드", len(records))
+        except Exception as e:
+            logger.warning("[TEXT2CYPHER] Cypher 실행 오류: %s", e)
+            return [], [], f"Cypher 쿼리 실행 오류: {str(e)}"
+        
+        # 결과가 없는 쿼리는 잘못 생성됐을 수 있으므로 템플릿으로 재사용하지 않음
+        if generated and records:
+            self._store_template(shape, slots, cypher)
+        
+        return self._build_result(records)
+    
+    def _build_result(self, records) -> Tuple[List[Node], List[Edge], str]:
+        """Cypher 결과 레코드를 노드/엣지/컨텍스트로 변환"""
+        builder = GraphResultBuilder()
         for record in records:
-            for key in record.keys():
-                value = record[key]
-                if value is None:
-                    continue
-                
-                # Neo4j Relationship 객체 처리 (먼저 처리하여 관련 노드 ID 수집)
-                if hasattr(value, "type") and hasattr(value, "start_node") and hasattr(value, "end_node"):
-                    rel_type = value.type
-                    start_id = str(value.start_node.id)
-                    end_id = str(value.end_node.id)
-                    relationship_nodes.add(start_id)
-                    relationship_nodes.add(end_id)
-                    
-                    # 중복 엣지 방지
-                    edge_key = f"{start_id}-{end_id}-{rel_type}"
-                    if edge_key not in {f"{e.source}-{e.target}-{e.relationship}" for e in edges}:
-                        edges.append(Edge(
-                            source=start_id,
-                            target=end_id,
-                            relationship=rel_type,
-                            properties=dict(value) if hasattr(value, "__dict__") else None
-                        ))
-        
-        # 노드 처리
-        for record in records:
-            for key in record.keys():
-                value = record[key]
-                if value is None:
-                    continue
-                
-                # Neo4j Node 객체 처리
-                if hasattr(value, "id") and hasattr(value, "labels"):
-                    node_id = str(value.id)
-                    if node_id not in node_ids:
-                        node_ids.add(node_id)
-                        labels = list(value.labels)
-                        node_type = labels[0] if labels else "Unknown"
-                        properties = dict(value)
-                        
-                        nodes.append(Node(
-                            id=node_id,
-                            label=properties.get("name") or properties.get("title") or properties.get("text", "")[:50] or node_id,
-                            type=node_type,
-                            properties=properties
-                        ))
+            builder.add_record(record)
+        nodes, edges = builder.build()
         
         # 컨텍스트 생성
         context = f"검색된 노드 수: {len(nodes)}, 관계 수: {len(edges)}"
@@ -1,209 +1,296 @@
 """Vector Retriever"""
-from typing import List, Tuple
-from neo4j import GraphDatabase
+import asyncio
+import logging
+from typing import List, Tuple, Any, Optional
 from app.config import settings
-from app.etl.embedding_generator import EmbeddingGenerator
+from app.db.neo4j_pool import get_driver, get_async_driver
+from app.etl.embedding_generator import get_embedding_generator
 from app.models.schema import Node, Edge
 from app.retrievers.base import BaseRetriever
+from app.retrievers.graph_builder import GraphResultBuilder
+from app.vector_index import get_exact_index, get_local_index
+
+logger = logging.getLogger(__name__)
 
 
 class VectorRetriever(BaseRetriever):
     """벡터 유사도 기반 검색"""
     
+    # Vector Index를 사용한 검색 (Neo4j 5.x 이상)
+    INDEX_CYPHER = """
+    CALL db.index.vector.queryNodes('content-embeddings', $k, $queryVector)
+    YIELD node, score
+    MATCH (node:Content)
+    RETURN node, score
+    ORDER BY score DESC
+    LIMIT $k
+    """
+    
+    # 로컬 인덱스 / 정확 검색 결과의 Content 노드 조회
+    FETCH_CYPHER = """
+    MATCH (c:Content)
+    WHERE id(c) IN $ids
+    RETURN c
+    """
+    
+    # Content 노드에서 Article로 확장
+    EXPAND_CYPHER = """
+    MATCH (c:Content)
+    WHERE id(c) IN $content_ids
+    MATCH (a:Article)-[r:HAS_CHUNK]->(c)
+    OPTIONAL MATCH (a)-[:BELONGS_TO]->(cat:Category)
+    OPTIONAL MATCH (m:Media)-[:PUBLISHED]->(a)
+    RETURN DISTINCT a, cat, m, r, c
+    """
+    
     def __init__(self, top_k: int = 5, similarity_threshold: float = 0.5):
-        self.driver = GraphDatabase.driver(
-            settings.neo4j_uri,
-            auth=(settings.neo4j_username, settings.neo4j_password)
-        )
-        self.embedding_generator = EmbeddingGenerator()
+        self.driver = get_driver()
+        self.embedding_generator = get_embedding_generator()
         self.top_k = top_k
         self.similarity_threshold = similarity_threshold  # 유사도 임계값
     
-    def close(self):
-        """드라이버 종료"""
-        self.driver.close()
+    def _index_query_label(self, k: int) -> str:
+        return f"CALL db.index.vector.queryNodes('content-embeddings', {k}, [queryVector])"
     
-    def retrieve(self, query: str) -> Tuple[List[Node], List[Edge], str]:
+    def retrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
         """벡터 검색 수행"""
-        # 쿼리 임베딩 생성
-        query_embedding = self.embedding_generator.generate_single(query)
-        
-        # Vector Index를 사용한 검색 (Neo4j 5.x 이상)
-        cypher = """
-        CALL db.index.vector.queryNodes('content-embeddings', $k, $queryVector)
-        YIELD node, score
-        MATCH (node:Content)
-        RETURN node, score
-        ORDER BY score DESC
-        LIMIT $k
-        """
+        # 쿼리 임베딩 생성 (호출 측에서 이미 계산했으면 재사용)
+        if query_embedding is None:
+            query_embedding = self.embedding_generator.generate_single(query)
         
-        scored_records = []  # 초기화
-        used_query = None
+        scored_records, used_query = self._vector_search(query_embedding, self.top_k)
         
-        try:
-            with self.driver.session() as session:
-                result = session.run(cypher, queryVector=query_embedding, k=self.top_k)
-                records = list(result)
-                used_query = f"CALL db.index.vector.queryNodes('content-embeddings', {self.top_k}, [queryVector])"
-                
-                # Vector Index를 사용하는 경우: score가 이미 반환됨
-                for record in records:
-                    node = record["node"]
-                    score = record["score"]
-                    scored_records.append(({"node": node}, score))
-                
-                # 점수 순으로 정렬
-                scored_records.sort(key=lambda x: x[1], reverse=True)
-        except Exception as e:
-            print(f"[VECTOR] Vector Index 오류: {e}, 대체 쿼리 사용")
-            # Vector Index가 없는 경우 대체 쿼리
-            # 모든 Content 노드의 embedding과 비교
-            cypher = """
-            MATCH (c:Content)
-            WHERE c.embedding IS NOT NULL
-            RETURN c, c.embedding as embedding
-            LIMIT 100
-            """
-            used_query = cypher.strip()
+        # 쿼리 정보 저장 (로깅용)
+        self.state.used_query = used_query
+        
+        # Content 노드에서 Article로 확장하여 노드와 엣지 추가
+        builder, context_parts = self._build_content_nodes(scored_records)
+        self._expand(builder)
+        
+        nodes, edges = builder.build()
+        return nodes, edges, self._build_context(context_parts)
+    
+    async def aretrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """벡터 검색 수행 (비동기 드라이버, 임베딩은 전용 스레드 풀에서 계산)"""
+        if query_embedding is None:
+            query_embedding = await self.embedding_generator.agenerate_single(query)
+        
+        scored_records, used_query = await self._avector_search(query_embedding, self.top_k)
+        
+        # 쿼리 정보 저장 (로깅용)
+        self.state.used_query = used_query
+        
+        builder, context_parts = self._build_content_nodes(scored_records)
+        await self._aexpand(builder)
+        
+        nodes, edges = builder.build()
+        return nodes, edges, self._build_context(context_parts)
+    
+    def _vector_search(self, query_embedding: List[float], k: int) -> Tuple[List[Tuple[Any, float]], str]:
+        """
+        상위 k개 Content 벡터 검색 (백엔드 선택 및 Vector Index 오류 시 정확 검색 대체)
+        
+        Returns:
+            ([(Content 노드, 유사도)], 사용한 쿼리 라벨) 튜플 (유사도 내림차순)
+        """
+        with self.timer.step("vector_search"):
+            hits, used_query = self._search_hits(query_embedding, k=k)
+            if hits is None:
+                try:
+                    with self.driver.session() as session:
+                        result = session.run(self.INDEX_CYPHER, queryVector=query_embedding, k=k)
+                        records = list(result)
+                    return self._score_index_records(records), self._index_query_label(k)
+                except Exception as e:
+                    logger.warning("[VECTOR] Vector Index 오류: %s, 정확 검색으로 대체", e)
+                    hits, used_query = self._search_hits(query_embedding, fallback=True, k=k)
             
             with self.driver.session() as session:
-                result = session.run(cypher)
+                result = session.run(self.FETCH_CYPHER, ids=[node_id for node_id, _ in hits])
                 records = list(result)
+            return self._score_hit_records(hits, records), used_query
+    
+    async def _avector_search(self, query_embedding: List[float], k: int) -> Tuple[List[Tuple[Any, float]], str]:
+        """_vector_search의 비동기 버전 (로컬 검색은 첫 행렬 로드를 포함해 이벤트 루프 밖에서 실행)"""
+        with self.timer.step("vector_search"):
+            driver = get_async_driver()
             
-            # 코사인 유사도 계산
-            import numpy as np
-            query_vec = np.array(query_embedding)
+            hits, used_query = await asyncio.to_thread(self._search_hits, query_embedding, False, k)
+            if hits is None:
+                try:
+                    async with driver.session() as session:
+                        result = await session.run(self.INDEX_CYPHER, queryVector=query_embedding, k=k)
+                        records = [record async for record in result]
+                    return self._score_index_records(records), self._index_query_label(k)
+                except Exception as e:
+                    logger.warning("[VECTOR] Vector Index 오류: %s, 정확 검색으로 대체", e)
+                    hits, used_query = await asyncio.to_thread(self._search_hits, query_embedding, True, k)
             
-            for record in records:
-                content_embedding = record["embedding"]
-                if content_embedding:
-                    content_vec = np.array(content_embedding)
-                    similarity = np.dot(query_vec, content_vec) / (
-                        np.linalg.norm(query_vec) * np.linalg.norm(content_vec)
-                    )
-                    scored_records.append(({"node": record["c"]}, similarity))
+            async with driver.session() as session:
+                result = await session.run(self.FETCH_CYPHER, ids=[node_id for node_id, _ in hits])
+                records = [record async for record in result]
+            return self._score_hit_records(hits, records), used_query
+    
+    def _expand(self, builder: GraphResultBuilder):
+        """빌더의 Content 노드에서 Article/Category/Media로 확장"""
+        with self.timer.step("expand"):
+            content_ids = [int(node.id) for node in builder.nodes if node.type == "Content"]
+            if not content_ids:
+                return
             
-            # 상위 K개 선택 (유사도 점수 기준)
-            scored_records.sort(key=lambda x: x[1], reverse=True)
+            try:
+                with self.driver.session() as session:
+                    result = session.run(self.EXPAND_CYPHER, content_ids=content_ids)
+                    expand_records = list(result)
+                self._add_expansion(builder, expand_records)
+            except Exception as e:
+                logger.warning("[VECTOR] 엣지 확장 오류: %s", e, exc_info=True)
+    
+    async def _aexpand(self, builder: GraphResultBuilder):
+        """
+        _expand의 비동기 버전
         
-        # 쿼리 정보 저장 (로깅용)
-        self.last_query = used_query
+        확장 쿼리는 인덱스를 타는 UNWIND 한 번이므로 보통은 쿼리 하나로 실행하고,
+        Content id가 QUERY_EXPAND_SPLIT_THRESHOLD개를 넘을 때만 나눠서 동시에 실행합니다
+        (나눌 때마다 세션과 왕복이 하나씩 늘어남).
+        """
+        with self.timer.step("expand"):
+            content_ids = [int(node.id) for node in builder.nodes if node.type == "Content"]
+            if not content_ids:
+                return
+            
+            try:
+                if len(content_ids) > settings.query_expand_split_threshold:
+                    id_groups = self._split_ids(content_ids, settings.query_expand_concurrency)
+                else:
+                    id_groups = [content_ids]
+                results = await asyncio.gather(*(self._aexpand_records(ids) for ids in id_groups))
+                self._add_expansion(builder, [record for records in results for record in records])
+            except Exception as e:
+                logger.warning("[VECTOR] 엣지 확장 오류: %s", e, exc_info=True)
+    
+    async def _aexpand_records(self, content_ids: List[int]) -> list:
+        async with get_async_driver().session() as session:
+            result = await session.run(self.EXPAND_CYPHER, content_ids=content_ids)
+            return [record async for record in result]
+    
+    @staticmethod
+    def _split_ids(ids: List[int], parts: int) -> List[List[int]]:
+        """id 목록을 최대 parts개의 연속 구간으로 분할"""
+        parts = max(1, min(parts, len(ids)))
+        size = -(-len(ids) // parts)
+        return [ids[i:i + size] for i in range(0, len(ids), size)]
+    
+    def _search_hits(
+        self,
+        query_embedding: List[float],
+        fallback: bool = False,
+        k: Optional[int] = None
+    ) -> Tuple[Optional[List[Tuple[int, float]]], Optional[str]]:
+        """
+        프로세스 내 벡터 검색
         
-        nodes = []
-        edges = []
-        context_parts = []
+        VECTOR_SEARCH_BACKEND=local이면 IVF 인덱스, exact이면 전체 임베딩 행렬로 정확 검색합니다.
+        fallback=True이면 (Neo4j Vector Index가 없거나 구축 중일 때) 백엔드와 관계없이 정확 검색합니다.
+        
+        Returns:
+            ((Neo4j 내부 id, 유사도) 리스트, 쿼리 라벨) 튜플
+            (Neo4j Vector Index를 사용해야 하면 (None, None))
+        """
+        k = k or self.top_k
+        backend = "exact" if fallback else settings.vector_search_backend
+        fetch_label = "MATCH (c:Content) WHERE id(c) IN $ids"
         
-        # 유사도 점수 기반 필터링 및 정렬
-        filtered_scored_records = []
-        seen_node_ids = set()  # 중복 제거용
-        for record_dict, score in scored_records:
-            # 유사도 임계값 이상인 것만 포함
-            if score >= self.similarity_threshold:
-                node_id = str(record_dict["node"].id)
-                # 중복 노드 제거
-                if node_id not in seen_node_ids:
-                    seen_node_ids.add(node_id)
-                    filtered_scored_records.append((record_dict, score))
-        
-        # 상위 K개만 선택
-        for record_dict, score in filtered_scored_records[:self.top_k]:
-            content_node = record_dict["node"]
-            node_id = str(content_node.id)
-            properties = dict(content_node)
+        if backend == "local":
+            try:
+                hits = get_local_index().search(query_embedding, k)
+            except Exception as e:
+                logger.warning("[VECTOR] 로컬 인덱스 오류: %s, Neo4j Vector Index 사용", e)
+                return None, None
             
-            nodes.append(Node(
-                id=node_id,
-                label=properties.get("text", "")[:50] + "...",
-                type="Content",
-                properties={**properties, "similarity_score": score}  # 유사도 점수 포함
-            ))
+            if hits is None:
+                logger.warning("[VECTOR] 로컬 인덱스가 아직 구축되지 않았습니다. Neo4j Vector Index 사용")
+                return None, None
+            return hits, f"local IVF index top-{k} + {fetch_label}"
+        
+        if backend == "exact":
+            hits = get_exact_index().search(query_embedding, k)
+            return hits, f"exact top-{k} over Content embedding matrix + {fetch_label}"
+        
+        return None, None
+    
+    @staticmethod
+    def _score_hit_records(hits: List[Tuple[int, float]], records) -> List[Tuple[Any, float]]:
+        """프로세스 내 검색 점수를 조회한 Content 노드에 붙임 (인덱스 로드 후 삭제된 노드는 제외)"""
+        nodes_by_id = {record["c"].id: record["c"] for record in records}
+        return [(nodes_by_id[node_id], score) for node_id, score in hits if node_id in nodes_by_id]
+    
+    @staticmethod
+    def _score_index_records(records) -> List[Tuple[Any, float]]:
+        """Vector Index 결과 (score가 이미 반환됨)를 점수 순으로 정렬"""
+        scored_records = [(record["node"], record["score"]) for record in records]
+        scored_records.sort(key=lambda x: x[1], reverse=True)
+        return scored_records
+    
+    def _build_content_nodes(self, scored_records: List[Tuple[Any, float]]) -> Tuple[GraphResultBuilder, List[str]]:
+        """
+        유사도 임계값 이상인 상위 K개 Content 노드 생성
+        
+        Returns:
+            (Content 노드가 추가된 결과 빌더, 컨텍스트 텍스트 리스트) 튜플
+        """
+        builder = GraphResultBuilder()
+        context_parts = []
+        
+        # 유사도 점수 기반 필터링 및 중복 제거 후 상위 K개만 선택
+        for content_node, score in scored_records:
+            if len(context_parts) >= self.top_k:
+                break
+            if score < self.similarity_threshold or builder.has_node(str(content_node.id)):
+                continue
             
-            context_parts.append(properties.get("text", ""))
+            builder.add_node(content_node, "Content", {"similarity_score": score})  # 유사도 점수 포함
+            context_parts.append(content_node.get("text", ""))
         
-        # Content 노드에서 Article로 확장하여 노드와 엣지 추가
-        if nodes:
-            content_ids = [int(node.id) for node in nodes]
-            cypher_expand = """
-            MATCH (c:Content)
-            WHERE id(c) IN $content_ids
-            MATCH (a:Article)-[r:HAS_CHUNK]->(c)
-            OPTIONAL MATCH (a)-[:BELONGS_TO]->(cat:Category)
-            OPTIONAL MATCH (m:Media)-[:PUBLISHED]->(a)
-            RETURN DISTINCT a, cat, m, r, c
-            """
+        return builder, context_parts
+    
+    @staticmethod
+    def _add_expansion(builder: GraphResultBuilder, expand_records):
+        """확장 쿼리 결과의 Article, Category, Media 노드와 HAS_CHUNK 엣지 추가"""
+        articles = 0
+        for record in expand_records:
+            article = record.get("a")
+            if article:
+                if not builder.has_node(str(article.id)):
+                    articles += 1
+                builder.add_node(article, "Article")
             
-            try:
-                with self.driver.session() as session:
-                    result = session.run(cypher_expand, content_ids=content_ids)
-                    expand_records = list(result)
-                
-                # Article, Category, Media 노드 추가
-                added_article_ids = set()
-                for record in expand_records:
-                    # Article 노드 추가
-                    article = record.get("a")
-                    if article:
-                        article_id = str(article.id)
-                        if article_id not in added_article_ids:
-                            added_article_ids.add(article_id)
-                            article_props = dict(article)
-                            nodes.append(Node(
-                                id=article_id,
-                                label=article_props.get("title", article_id),
-                                type="Article",
-                                properties=article_props
-                            ))
-                    
-                    # Category 노드 추가
-                    category = record.get("cat")
-                    if category:
-                        cat_id = str(category.id)
-                        # 중복 체크 (이미 추가된 노드인지 확인)
-                        if not any(n.id == cat_id for n in nodes):
-                            cat_props = dict(category)
-                            nodes.append(Node(
-                                id=cat_id,
-                                label=cat_props.get("name", cat_id),
-                                type="Category",
-                                properties=cat_props
-                            ))
-                    
-                    # Media 노드 추가
-                    media = record.get("m")
-                    if media:
-                        media_id = str(media.id)
-                        if not any(n.id == media_id for n in nodes):
-                            media_props = dict(media)
-                            nodes.append(Node(
-                                id=media_id,
-                                label=media_props.get("name", media_id),
-                                type="Media",
-                                properties=media_props
-                            ))
-                    
-                    # 엣지 추가
-                    rel = record.get("r")
-                    if rel:
-                        start_id = str(rel.start_node.id)
-                        end_id = str(rel.end_node.id)
-                        edges.append(Edge(
-                            source=start_id,
-                            target=end_id,
-                            relationship=rel.type,
-                            properties=None
-                        ))
-                
-                print(f"[VECTOR] 그래프 확장: Article {len(added_article_ids)}개, 엣지 {len(edges)}개 추가")
-            except Exception as e:
-                print(f"[VECTOR] 엣지 확장 오류: {e}")
-                import traceback
-                traceback.print_exc()
+            category = record.get("cat")
+            if category:
+                builder.add_node(category, "Category")
+            
+            media = record.get("m")
+            if media:
+                builder.add_node(media, "Media")
+            
+            rel = record.get("r")
+            if rel:
+                builder.add_relationship(rel)
         
-        # 컨텍스트 생성 (상위 3개만 사용)
+        logger.debug("[VECTOR] 그래프 확장: Article %d개, 엣지 %d개 추가", articles, len(builder.edges))
+    
+    @staticmethod
+    def _build_context(context_parts: List[str]) -> str:
+        """컨텍스트 생성 (상위 3개만 사용)"""
         context = "\n\n".join(context_parts[:3])
         if not context:
             context = "검색어와 관련된 콘텐츠를 찾을 수 없습니다."
-        
-        return nodes, edges, context
-
+        return context
@@ -1,175 +1,179 @@
 """VectorCypher Retriever"""
-from typing import List, Tuple
-from neo4j import GraphDatabase
-from app.config import settings
-from app.etl.embedding_generator import EmbeddingGenerator
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple, Optional
+from app.db.neo4j_pool import get_async_driver
 from app.models.schema import Node, Edge
-from app.retrievers.base import BaseRetriever
 from app.retrievers.vector import VectorRetriever
 
+logger = logging.getLogger(__name__)
 
-class VectorCypherRetriever(BaseRetriever):
+
+class VectorCypherRetriever(VectorRetriever):
     """벡터 검색 결과를 기반으로 그래프 확장"""
     
-    def __init__(self, top_k: int = 5, similarity_threshold: float = 0.5):
-        self.driver = GraphDatabase.driver(
-            settings.neo4j_uri,
-            auth=(settings.neo4j_username, settings.neo4j_password)
-        )
-        self.vector_retriever = VectorRetriever(top_k=top_k, similarity_threshold=similarity_threshold)
-        self.top_k = top_k
-        self.similarity_threshold = similarity_threshold
+    # 벡터 검색 + Article/Category/Media 확장 + 관계를 한 번에 조회 (Neo4j Vector Index 사용)
+    FUSED_INDEX_CYPHER = """
+    CALL db.index.vector.queryNodes('content-embeddings', $k, $queryVector)
+    YIELD node AS c, score
+    WHERE score >= $threshold
+    OPTIONAL MATCH (a:Article)-[r1:HAS_CHUNK]->(c)
+    OPTIONAL MATCH (a)-[r2:BELONGS_TO]->(cat:Category)
+    OPTIONAL MATCH (m:Media)-[r3:PUBLISHED]->(a)
+    RETURN c, score, a, cat, m, r1, r2, r3
+    ORDER BY score DESC
+    """
     
-    def close(self):
-        """드라이버 종료"""
-        self.driver.close()
-        self.vector_retriever.close()
+    # 프로세스 내 검색(로컬/정확) 결과의 Content 조회 + 확장 + 관계를 한 번에 조회
+    FUSED_IDS_CYPHER = """
+    MATCH (c:Content)
+    WHERE id(c) IN $ids
+    OPTIONAL MATCH (a:Article)-[r1:HAS_CHUNK]->(c)
+    OPTIONAL MATCH (a)-[r2:BELONGS_TO]->(cat:Category)
+    OPTIONAL MATCH (m:Media)-[r3:PUBLISHED]->(a)
+    RETURN c, a, cat, m, r1, r2, r3
+    """
     
-    def retrieve(self, query: str) -> Tuple[List[Node], List[Edge], str]:
-        """벡터 검색 후 그래프 확장"""
-        # 1. 벡터 검색으로 관련 Content 노드 찾기
-        content_nodes, _, content_context = self.vector_retriever.retrieve(query)
-        
-        if not content_nodes:
-            return [], [], "관련 콘텐츠를 찾을 수 없습니다."
-        
-        # 2. 찾은 Content 노드에서 Article로 확장
-        # Content 노드의 유사도 점수 추출
-        # Content 노드의 id는 Neo4j 내부 ID (숫자) 또는 properties.id (UUID 문자열)일 수 있음
-        content_scores = {}
-        content_neo4j_ids = []  # Neo4j 내부 ID
-        content_property_ids = []  # properties.id (UUID)
-        
-        for node in content_nodes:
-            # node.id는 Neo4j 내부 ID (숫자 문자열)
-            content_neo4j_ids.append(int(node.id))
-            # properties에 id가 있으면 UUID 문자열
-            prop_id = node.properties.get("id")
-            if prop_id:
-                content_property_ids.append(str(prop_id))
-            content_scores[node.id] = node.properties.get("similarity_score", 0.0)
+    def _fused_index_params(self, query_embedding: List[float]) -> Dict[str, Any]:
+        return {"queryVector": query_embedding, "k": self.top_k, "threshold": self.similarity_threshold}
+    
+    def retrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """벡터 검색 후 그래프 확장 (Neo4j 왕복 1회)"""
+        if query_embedding is None:
+            query_embedding = self.embedding_generator.generate_single(query)
+        
+        # 1. 벡터 검색과 그래프 확장을 하나의 쿼리로 실행
+        records = None
+        scores = None
+        with self.timer.step("local_search"):
+            hits, used_query = self._search_hits(query_embedding)
+        if hits is None:
+            try:
+                with self.timer.step("fused_query"), self.driver.session() as session:
+                    result = session.run(self.FUSED_INDEX_CYPHER, **self._fused_index_params(query_embedding))
+                    records = list(result)
+                used_query = self.FUSED_INDEX_CYPHER.strip()
+            except Exception as e:
+                logger.warning("[VECTORCYPHER] Vector Index 오류: %s, 정확 검색으로 대체", e)
+                hits, used_query = self._search_hits(query_embedding, fallback=True)
+        
+        # 2. 프로세스 내 검색 결과는 id로 Content와 확장을 한 번에 조회
+        if hits is not None:
+            with self.timer.step("fused_query"), self.driver.session() as session:
+                result = session.run(self.FUSED_IDS_CYPHER, ids=[node_id for node_id, _ in hits])
+                records = list(result)
+            scores = dict(hits)
         
-        print(f"[VECTORCYPHER] Content 노드: Neo4j ID {len(content_neo4j_ids)}개, Property ID {len(content_property_ids)}개")
+        # 쿼리 정보 저장 (로깅용)
+        self.state.used_query = used_query
         
-        # 관련 Article만 조회 (불필요한 확장 방지)
-        # Content 노드는 Neo4j 내부 ID로 매칭
-        cypher = """
-        MATCH (c:Content)
-        WHERE id(c) IN $content_neo4j_ids
-        MATCH (a:Article)-[:HAS_CHUNK]->(c)
-        OPTIONAL MATCH (a)-[:BELONGS_TO]->(cat:Category)
-        OPTIONAL MATCH (m:Media)-[:PUBLISHED]->(a)
-        RETURN DISTINCT a, cat, m, c, id(c) as content_neo4j_id
-        ORDER BY id(c)
-        """
+        logger.debug("[VECTORCYPHER] 그래프 확장 결과: %d개 레코드", len(records))
+        return self._build_graph(records, scores)
+    
+    async def aretrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """벡터 검색 후 그래프 확장 (비동기 드라이버, Neo4j 왕복 1회)"""
+        if query_embedding is None:
+            query_embedding = await self.embedding_generator.agenerate_single(query)
+        driver = get_async_driver()
+        
+        records = None
+        scores = None
+        with self.timer.step("local_search"):
+            hits, used_query = await asyncio.to_thread(self._search_hits, query_embedding)
+        if hits is None:
+            try:
+                with self.timer.step("fused_query"):
+                    async with driver.session() as session:
+                        result = await session.run(self.FUSED_INDEX_CYPHER, **self._fused_index_params(query_embedding))
+                        records = [record async for record in result]
+                used_query = self.FUSED_INDEX_CYPHER.strip()
+            except Exception as e:
+                logger.warning("[VECTORCYPHER] Vector Index 오류: %s, 정확 검색으로 대체", e)
+                hits, used_query = await asyncio.to_thread(self._search_hits, query_embedding, True)
+        
+        if hits is not None:
+            with self.timer.step("fused_query"):
+                async with driver.session() as session:
+                    result = await session.run(self.FUSED_IDS_CYPHER, ids=[node_id for node_id, _ in hits])
+                    records = [record async for record in result]
+            scores = dict(hits)
         
         # 쿼리 정보 저장 (로깅용)
-        self.last_query = cypher.strip()
+        self.state.used_query = used_query
         
-        with self.driver.session() as session:
-            result = session.run(cypher, content_neo4j_ids=content_neo4j_ids)
-            records = list(result)
-        print(f"[VECTORCYPHER] 그래프 확장 결과: {len(records)}개 레코드")
-        
-        nodes = []
-        edges = []
-        node_ids = set()
+        logger.debug("[VECTORCYPHER] 그래프 확장 결과: %d개 레코드", len(records))
+        return self._build_graph(records, scores)
+    
+    def _build_graph(
+        self,
+        records,
+        scores: Optional[Dict[int, float]] = None
+    ) -> Tuple[List[Node], List[Edge], str]:
+        """
+        통합 쿼리 결과를 노드/엣지/컨텍스트로 변환
         
-        # Content 노드 추가
-        for node in content_nodes:
-            if node.id not in node_ids:
-                nodes.append(node)
-                node_ids.add(node.id)
+        Args:
+            records: (c, [score], a, cat, m, r1, r2, r3) 레코드
+            scores: Content Neo4j 내부 id → 유사도 (None이면 레코드의 score 사용)
+        """
+        # Content별 유사도 점수 (Content 하나가 확장 결과에 따라 여러 행에 나타남)
+        scored_records = []
+        seen_content_ids = set()
+        for record in records:
+            content = record["c"]
+            if content.id in seen_content_ids:
+                continue
+            seen_content_ids.add(content.id)
+            score = scores.get(content.id) if scores is not None else record["score"]
+            if score is not None:
+                scored_records.append((content, score))
+        scored_records.sort(key=lambda x: x[1], reverse=True)
+        
+        # 유사도 임계값 / 상위 K개 Content 노드
+        builder, context_parts = self._build_content_nodes(scored_records)
+        if not context_parts:
+            return [], [], "관련 콘텐츠를 찾을 수 없습니다."
         
-        # Article, Category, Media 노드 추가 (관련성 높은 것만)
-        article_scores = {}  # Article별 최고 유사도 점수
+        content_scores = {node.id: node.properties.get("similarity_score", 0.0) for node in builder.nodes}
         
+        # Article, Category, Media 노드와 관계 추가 (선택된 Content와 연결된 것만)
+        article_ids = set()
         for record in records:
-            content_neo4j_id = str(record.get("content_neo4j_id"))
-            content_score = content_scores.get(content_neo4j_id, 0.0)
+            content_score = content_scores.get(str(record["c"].id))
+            if content_score is None:
+                continue
             
-            # Article 노드 처리
             article = record.get("a")
-            if article:
-                article_id = str(article.id)
-                # Article의 최고 유사도 점수 업데이트
-                if article_id not in article_scores or content_score > article_scores[article_id]:
-                    article_scores[article_id] = content_score
-                
-                if article_id not in node_ids:
-                    node_ids.add(article_id)
-                    properties = dict(article)
-                    nodes.append(Node(
-                        id=article_id,
-                        label=properties.get("title", article_id),
-                        type="Article",
-                        properties={**properties, "relevance_score": article_scores[article_id]}
-                    ))
+            if not article:
+                continue
             
-            # Category 노드 추가 (관련 Article이 있는 경우만)
-            if article:
-                category = record.get("cat")
-                if category:
-                    cat_id = str(category.id)
-                    if cat_id not in node_ids:
-                        node_ids.add(cat_id)
-                        properties = dict(category)
-                        nodes.append(Node(
-                            id=cat_id,
-                            label=properties.get("name", cat_id),
-                            type="Category",
-                            properties=properties
-                        ))
-                
-                # Media 노드 추가 (관련 Article이 있는 경우만)
-                media = record.get("m")
-                if media:
-                    media_id = str(media.id)
-                    if media_id not in node_ids:
-                        node_ids.add(media_id)
-                        properties = dict(media)
-                        nodes.append(Node(
-                            id=media_id,
-                            label=properties.get("name", media_id),
-                            type="Media",
-                            properties=properties
-                        ))
-        
-        # Content 노드는 이미 추가되어 있음
-        
-        # 관계 추가
-        cypher_rels = """
-        MATCH (c:Content)
-        WHERE id(c) IN $content_neo4j_ids
-        MATCH (a:Article)-[r1:HAS_CHUNK]->(c)
-        OPTIONAL MATCH (a)-[r2:BELONGS_TO]->(cat:Category)
-        OPTIONAL MATCH (m:Media)-[r3:PUBLISHED]->(a)
-        RETURN r1, r2, r3, a, cat, m, c
-        """
-        
-        with self.driver.session() as session:
-            result = session.run(cypher_rels, content_neo4j_ids=content_neo4j_ids)
-            records = list(result)
-        
-        for record in records:
-            for rel_key in ["r1", "r2", "r3"]:
+            # Article의 relevance_score는 연결된 Content의 최고 유사도 점수
+            article_node = builder.add_node(article, "Article", {"relevance_score": content_score})
+            article_ids.add(article_node.id)
+            if content_score > article_node.properties["relevance_score"]:
+                article_node.properties["relevance_score"] = content_score
+            
+            for key, node_type in (("cat", "Category"), ("m", "Media")):
+                node = record.get(key)
+                if node:
+                    builder.add_node(node, node_type)
+            
+            for rel_key in ("r1", "r2", "r3"):
                 rel = record.get(rel_key)
-                if rel is None:
-                    continue
-                
-                start_id = str(rel.start_node.id)
-                end_id = str(rel.end_node.id)
-                
-                edges.append(Edge(
-                    source=start_id,
-                    target=end_id,
-                    relationship=rel.type,
-                    properties=dict(rel) if hasattr(rel, "__dict__") else None
-                ))
+                if rel is not None:
+                    builder.add_relationship(rel)
         
         # 컨텍스트 생성
-        context = content_context
-        context += f"\n\n관련 기사 {len([n for n in nodes if n.type == 'Article'])}개 발견"
+        context = self._build_context(context_parts)
+        context += f"\n\n관련 기사 {len(article_ids)}개 발견"
         
+        nodes, edges = builder.build()
         return nodes, edges, context
-
@@ -0,0 +1,15 @@
+from .embedding_source import count_content_embeddings, iter_content_embeddings, normalize_rows
+from .exact_index import ExactVectorIndex, get_exact_index
+from .ivf_index import IVFFlatIndex, LocalVectorIndex, build_ivf_index, get_local_index
+
+__all__ = [
+    "count_content_embeddings",
+    "iter_content_embeddings",
+    "normalize_rows",
+    "ExactVectorIndex",
+    "get_exact_index",
+    "IVFFlatIndex",
+    "LocalVectorIndex",
+    "build_ivf_index",
+    "get_local_index",
+]
@@ -0,0 +1,80 @@
+"""Neo4j Content 임베딩 스트리밍 (로컬 벡터 인덱스 구축용)"""
+import logging
+from typing import Iterator, Optional, Tuple
+import numpy as np
+from app.db.neo4j_pool import get_driver
+
+logger = logging.getLogger(__name__)
+
+
+COUNT_CYPHER = """
+MATCH (c:Content)
+WHERE c.embedding IS NOT NULL
+RETURN count(c) AS count
+"""
+
+STREAM_CYPHER = """
+MATCH (c:Content)
+WHERE c.embedding IS NOT NULL
+RETURN id(c) AS id, c.embedding AS embedding
+"""
+
+
+def count_content_embeddings(driver=None) -> int:
+    """임베딩이 있는 Content 노드 수"""
+    driver = driver or get_driver()
+    with driver.session() as session:
+        record = session.run(COUNT_CYPHER).single()
+    return int(record["count"]) if record else 0
+
+
+def iter_content_embeddings(
+    page_size: int = 5000,
+    driver=None
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Content 노드의 (id, embedding)을 페이지 단위로 스트리밍
+    
+    하나의 쿼리 결과를 fetch_size 단위로 받아오므로 전체 임베딩을 한 번에
+    메모리에 올리지 않습니다.
+    
+    Args:
+        page_size: 페이지당 행 수 (드라이버 fetch_size로도 사용)
+        driver: 사용할 드라이버 (None이면 프로세스 공용 드라이버)
+    
+    Yields:
+        (Neo4j 내부 id int64 배열, 임베딩 float32 행렬) 튜플
+    """
+    driver = driver or get_driver()
+    ids = []
+    embeddings = []
+    dimension: Optional[int] = None
+    
+    with driver.session(fetch_size=page_size) as session:
+        result = session.run(STREAM_CYPHER)
+        for record in result:
+            embedding = record["embedding"]
+            if dimension is None:
+                dimension = len(embedding)
+            if len(embedding) != dimension:
+                logger.warning("[VECTOR_INDEX] 임베딩 차원이 다른 Content 건너뜀 (id=%s, 차원 %s)", record['id'], len(embedding))
+                continue
+            
+            ids.append(record["id"])
+            embeddings.append(embedding)
+            
+            if len(ids) >= page_size:
+                yield np.asarray(ids, dtype=np.int64), np.asarray(embeddings, dtype=np.float32)
+                ids = []
+                embeddings = []
+    
+    if ids:
+        yield np.asarray(ids, dtype=np.int64), np.asarray(embeddings, dtype=np.float32)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (제자리 연산, 영벡터는 그대로 둠)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
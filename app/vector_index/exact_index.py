@@ -0,0 +1,150 @@
+"""정규화 float32 행렬 기반 정확(brute-force) 벡터 검색"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.cache.graph_version import read_graph_version
+from app.vector_index.embedding_source import (
+    count_content_embeddings,
+    iter_content_embeddings,
+    normalize_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ExactVectorIndex:
+    """
+    전체 Content 임베딩에 대한 정확 top-k 검색
+    
+    임베딩을 Neo4j에서 페이지 단위로 스트리밍해 미리 할당한 정규화 float32 행렬에
+    채우고, 검색은 행렬-벡터 곱 한 번과 argpartition으로 수행합니다. 행렬은 질의 간에
+    재사용하며 그래프 버전이 바뀌면 (ETL 적재 후) 다음 검색 시 다시 로드합니다.
+    Neo4j Vector Index가 없거나 아직 구축 중일 때도 정확한 결과를 반환합니다.
+    """
+    
+    def __init__(self, page_size: int = 5000, driver=None):
+        self.page_size = page_size
+        self.driver = driver
+        
+        self._lock = threading.Lock()
+        # (id 배열, 정규화 행렬) - 검색 중 재로드되어도 한 쌍으로 교체
+        self._data: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._version: Optional[str] = None
+        
+        self.searches = 0
+        self.loads = 0
+        self.seconds = 0.0
+        self.load_seconds = 0.0
+    
+    def _load(self):
+        """임베딩 행렬 로드 (호출 측에서 잠금)"""
+        start = time.perf_counter()
+        version = read_graph_version()
+        count = count_content_embeddings(self.driver)
+        
+        ids = np.empty(count, dtype=np.int64)
+        matrix: Optional[np.ndarray] = None
+        loaded = 0
+        
+        for page_ids, page_embeddings in iter_content_embeddings(page_size=self.page_size, driver=self.driver):
+            if matrix is None:
+                matrix = np.empty((count, page_embeddings.shape[1]), dtype=np.float32)
+            
+            # 개수 조회 이후 늘어난 행은 행렬을 키워서 수용
+            end = loaded + len(page_ids)
+            if end > len(matrix):
+                capacity = max(end, len(matrix) * 2)
+                matrix = np.resize(matrix, (capacity, matrix.shape[1]))
+                ids = np.resize(ids, capacity)
+            
+            matrix[loaded:end] = normalize_rows(page_embeddings)
+            ids[loaded:end] = page_ids
+            loaded = end
+        
+        self._data = (ids[:loaded], matrix[:loaded] if matrix is not None else np.empty((0, 0), dtype=np.float32))
+        self._version = version
+        self.loads += 1
+        self.load_seconds = time.perf_counter() - start
+        logger.info("[VECTOR_INDEX] 정확 검색 행렬 로드: 벡터 %d개 (%.2f초)", loaded, self.load_seconds)
+    
+    def _ensure_loaded(self) -> Tuple[np.ndarray, np.ndarray]:
+        """그래프 버전이 바뀌었거나 아직 로드하지 않았으면 행렬 로드"""
+        if self._data is None or read_graph_version() != self._version:
+            with self._lock:
+                if self._data is None or read_graph_version() != self._version:
+                    self._load()
+        return self._data
+    
+    def load(self):
+        """임베딩 행렬 미리 로드 (서버 시작 시)"""
+        self._ensure_loaded()
+    
+    def search(self, query_embedding, k: int) -> List[Tuple[int, float]]:
+        """
+        정확 top-k 검색
+        
+        Args:
+            query_embedding: 질의 임베딩
+            k: 반환할 결과 수
+        
+        Returns:
+            (Neo4j 내부 id, 코사인 유사도) 리스트 (점수 내림차순)
+        """
+        ids, matrix = self._ensure_loaded()
+        if len(ids) == 0 or k <= 0:
+            return []
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (matrix.shape[1],):
+            raise ValueError(f"질의 임베딩 차원 {query.shape}이 Content 임베딩 차원 {matrix.shape[1]}과 다릅니다.")
+        
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        
+        start = time.perf_counter()
+        scores = matrix @ (query / norm)
+        
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = [(int(ids[i]), float(scores[i])) for i in top]
+        
+        self.searches += 1
+        self.seconds += time.perf_counter() - start
+        return hits
+    
+    def invalidate(self):
+        """캐시된 행렬 버리기 (다음 검색 시 다시 로드)"""
+        with self._lock:
+            self._data = None
+            self._version = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """행렬 정보와 검색 통계"""
+        matrix = self._data[1] if self._data is not None else None
+        return {
+            "count": len(matrix) if matrix is not None else 0,
+            "memory_mb": matrix.nbytes / (1024 * 1024) if matrix is not None else 0.0,
+            "graph_version": self._version,
+            "loads": self.loads,
+            "load_seconds": self.load_seconds,
+            "searches": self.searches,
+            "avg_search_ms": self.seconds / self.searches * 1000 if self.searches else 0.0,
+        }
+
+
+_shared_exact_index: Optional[ExactVectorIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_exact_index() -> ExactVectorIndex:
+    """프로세스 공용 정확 검색 인덱스"""
+    global _shared_exact_index
+    if _shared_exact_index is None:
+        with _shared_lock:
+            if _shared_exact_index is None:
+                _shared_exact_index = ExactVectorIndex()
+    return _shared_exact_index
@@ -0,0 +1,355 @@
+"""메모리 맵 float32 행렬 기반 IVF-Flat 로컬 벡터 인덱스"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.cache.graph_version import read_graph_version
+from app.vector_index.embedding_source import (
+    count_content_embeddings,
+    iter_content_embeddings,
+    normalize_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 현재 사용 중인 빌드 디렉터리 이름을 담는 포인터 파일
+CURRENT_FILE = "CURRENT"
+
+# k-means 학습 설정
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_LIST = 64
+KMEANS_MIN_SAMPLES = 10000
+
+# 클러스터 할당/재배치 시 한 번에 처리할 행 수
+ASSIGN_CHUNK_ROWS = 65536
+
+
+class IVFFlatIndex:
+    """
+    IVF-Flat 인덱스 (읽기 전용)
+    
+    정규화된 임베딩을 k-means 클러스터(리스트) 순으로 정렬해 하나의 float32 파일에
+    저장하고 np.memmap으로 엽니다. 검색 시 질의와 가까운 n_probe개 클러스터의
+    연속 구간만 행렬-벡터 곱으로 점수를 계산하므로 전체 행렬을 메모리에 올리지 않고도
+    밀리초 단위로 top-k를 찾습니다. 점수는 코사인 유사도입니다.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        
+        self.count = int(self.meta["count"])
+        self.dimension = int(self.meta["dimension"])
+        self.n_lists = int(self.meta["n_lists"])
+        
+        self.ids = np.load(os.path.join(directory, "ids.npy"))
+        self.centroids = np.load(os.path.join(directory, "centroids.npy"))
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"))
+        self.vectors = np.memmap(
+            os.path.join(directory, "vectors.f32"),
+            dtype=np.float32,
+            mode="r",
+            shape=(self.count, self.dimension)
+        )
+    
+    def search(self, query_embedding, k: int, n_probe: int) -> List[Tuple[int, float]]:
+        """
+        근사 top-k 검색
+        
+        Args:
+            query_embedding: 질의 임베딩
+            k: 반환할 결과 수
+            n_probe: 탐색할 클러스터 수 (n_lists 이상이면 전체 탐색 = 정확 검색)
+        
+        Returns:
+            (Neo4j 내부 id, 코사인 유사도) 리스트 (점수 내림차순)
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            raise ValueError(f"질의 임베딩 차원 {query.shape}이 인덱스 차원 {self.dimension}과 다릅니다.")
+        
+        norm = np.linalg.norm(query)
+        if norm == 0 or self.count == 0 or k <= 0:
+            return []
+        query = query / norm
+        
+        # 질의와 가까운 클러스터 선택
+        n_probe = max(1, min(n_probe, self.n_lists))
+        if n_probe < self.n_lists:
+            centroid_scores = self.centroids @ query
+            lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            lists = np.arange(self.n_lists)
+        
+        # 선택한 클러스터의 연속 구간만 점수 계산
+        scores = []
+        positions = []
+        for list_id in lists:
+            start, end = int(self.offsets[list_id]), int(self.offsets[list_id + 1])
+            if start == end:
+                continue
+            scores.append(self.vectors[start:end] @ query)
+            positions.append(np.arange(start, end))
+        
+        if not scores:
+            return []
+        
+        scores = np.concatenate(scores)
+        positions = np.concatenate(positions)
+        
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.ids[positions[i]]), float(scores[i])) for i in top]
+
+
+def _spherical_kmeans(sample: np.ndarray, n_lists: int, seed: int = 0) -> np.ndarray:
+    """정규화된 샘플에 대한 구면 k-means (코사인 유사도 기준) 중심 학습"""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+    
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        
+        # 비어 있는 클러스터는 임의의 샘플로 다시 시작
+        empty = np.bincount(assignments, minlength=n_lists) == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+        
+        centroids = normalize_rows(sums)
+    
+    return centroids
+
+
+def _default_n_lists(count: int) -> int:
+    """클러스터 수 (설정값이 없으면 sqrt(N), 최대 4096)"""
+    if settings.local_index_lists > 0:
+        return max(1, min(settings.local_index_lists, count))
+    return max(1, min(4096, int(np.sqrt(count))))
+
+
+def build_ivf_index(
+    path: Optional[str] = None,
+    n_lists: Optional[int] = None,
+    page_size: int = 5000,
+    driver=None
+) -> Optional[Dict[str, Any]]:
+    """
+    Neo4j의 Content 임베딩으로 IVF-Flat 인덱스 구축
+    
+    임베딩을 페이지 단위로 스트리밍해 디스크의 memmap 행렬에 기록하므로 메모리 사용량은
+    k-means 학습 샘플과 페이지 크기 정도로 유지됩니다. 새 빌드 디렉터리를 모두 쓴 뒤
+    CURRENT 포인터를 교체하므로 API 서버는 구축 중에도 이전 인덱스로 검색합니다.
+    
+    Args:
+        path: 인덱스 루트 디렉터리 (None이면 LOCAL_INDEX_PATH 설정 사용)
+        n_lists: 클러스터 수 (None이면 LOCAL_INDEX_LISTS 설정 또는 sqrt(N))
+        page_size: Neo4j 스트리밍 페이지 크기
+        driver: 사용할 드라이버 (None이면 프로세스 공용 드라이버)
+    
+    Returns:
+        빌드 메타데이터 (임베딩이 없으면 None)
+    """
+    path = path or settings.local_index_path
+    start = time.perf_counter()
+    
+    count = count_content_embeddings(driver)
+    if count == 0:
+        print("[VECTOR_INDEX] 임베딩이 있는 Content 노드가 없어 로컬 인덱스를 만들지 않습니다.")
+        return None
+    
+    build_name = f"build-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    build_dir = os.path.join(path, build_name)
+    os.makedirs(build_dir, exist_ok=True)
+    
+    try:
+        # 1. 임베딩을 정규화하여 임시 memmap 행렬에 기록
+        raw_path = os.path.join(build_dir, "raw.f32")
+        raw = None
+        ids = np.empty(count, dtype=np.int64)
+        written = 0
+        
+        with closing(iter_content_embeddings(page_size=page_size, driver=driver)) as pages:
+            for page_ids, page_embeddings in pages:
+                if raw is None:
+                    dimension = page_embeddings.shape[1]
+                    raw = np.memmap(raw_path, dtype=np.float32, mode="w+", shape=(count, dimension))
+                
+                # 개수 조회 이후 추가된 노드는 다음 재구축 때 반영
+                rows = min(len(page_ids), count - written)
+                raw[written:written + rows] = normalize_rows(page_embeddings[:rows])
+                ids[written:written + rows] = page_ids[:rows]
+                written += rows
+                if written >= count:
+                    break
+        
+        if raw is None or written == 0:
+            print("[VECTOR_INDEX] 스트리밍된 임베딩이 없어 로컬 인덱스를 만들지 않습니다.")
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return None
+        
+        ids = ids[:written]
+        raw.flush()
+        
+        # 2. 샘플로 클러스터 중심 학습
+        n_lists = max(1, min(n_lists or _default_n_lists(written), written))
+        sample_size = min(written, max(n_lists * KMEANS_SAMPLES_PER_LIST, KMEANS_MIN_SAMPLES))
+        sample_rows = np.sort(np.random.default_rng(0).choice(written, size=sample_size, replace=False))
+        centroids = _spherical_kmeans(np.asarray(raw[sample_rows]), n_lists)
+        
+        # 3. 전체 행을 클러스터에 할당
+        assignments = np.empty(written, dtype=np.int32)
+        for offset in range(0, written, ASSIGN_CHUNK_ROWS):
+            chunk = np.asarray(raw[offset:offset + ASSIGN_CHUNK_ROWS])
+            assignments[offset:offset + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignments, minlength=n_lists))
+        
+        # 4. 클러스터 순으로 재배치한 최종 행렬 기록
+        vectors = np.memmap(
+            os.path.join(build_dir, "vectors.f32"),
+            dtype=np.float32,
+            mode="w+",
+            shape=(written, dimension)
+        )
+        for offset in range(0, written, ASSIGN_CHUNK_ROWS):
+            rows = order[offset:offset + ASSIGN_CHUNK_ROWS]
+            vectors[offset:offset + len(rows)] = raw[rows]
+        vectors.flush()
+        del vectors, raw
+        os.remove(raw_path)
+        
+        np.save(os.path.join(build_dir, "ids.npy"), ids[order])
+        np.save(os.path.join(build_dir, "centroids.npy"), centroids.astype(np.float32))
+        np.save(os.path.join(build_dir, "offsets.npy"), offsets)
+        
+        meta = {
+            "count": int(written),
+            "dimension": int(dimension),
+            "n_lists": int(n_lists),
+            "graph_version": read_graph_version(),
+            "built_at": datetime.now(timezone.utc).isoformat(),
+            "build_seconds": time.perf_counter() - start,
+        }
+        with open(os.path.join(build_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+    
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    
+    # 5. CURRENT 포인터 교체 후 이전 빌드 정리
+    tmp_path = os.path.join(path, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(build_name)
+    os.replace(tmp_path, os.path.join(path, CURRENT_FILE))
+    
+    for name in os.listdir(path):
+        if name.startswith("build-") and name != build_name:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    
+    print(
+        f"[VECTOR_INDEX] 로컬 인덱스 구축 완료: 벡터 {meta['count']}개, 차원 {meta['dimension']}, "
+        f"클러스터 {meta['n_lists']}개 ({meta['build_seconds']:.1f}초)"
+    )
+    return meta
+
+
+class LocalVectorIndex:
+    """
+    API 서버가 공유하는 로컬 인덱스 핸들
+    
+    CURRENT 포인터가 바뀌면 (ETL이 인덱스를 재구축하면) 다음 검색 시 새 빌드를 엽니다.
+    """
+    
+    def __init__(self, path: Optional[str] = None, n_probe: Optional[int] = None):
+        self.path = path or settings.local_index_path
+        self.n_probe = n_probe or settings.local_index_probes
+        
+        self._lock = threading.Lock()
+        self._index: Optional[IVFFlatIndex] = None
+        self._build: Optional[str] = None
+        
+        self.searches = 0
+        self.reloads = 0
+        self.seconds = 0.0
+    
+    def _current_build(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, CURRENT_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def index(self) -> Optional[IVFFlatIndex]:
+        """현재 빌드의 인덱스 (구축된 인덱스가 없으면 None)"""
+        build = self._current_build()
+        if build is None:
+            return None
+        
+        if build != self._build:
+            with self._lock:
+                if build != self._build:
+                    self._index = IVFFlatIndex(os.path.join(self.path, build))
+                    self._build = build
+                    self.reloads += 1
+                    logger.info("[VECTOR_INDEX] 로컬 인덱스 로드: %s (벡터 %d개)", build, self._index.count)
+        
+        return self._index
+    
+    def search(self, query_embedding, k: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        top-k 검색
+        
+        Returns:
+            (Neo4j 내부 id, 코사인 유사도) 리스트 (인덱스가 없으면 None)
+        """
+        index = self.index()
+        if index is None:
+            return None
+        
+        start = time.perf_counter()
+        hits = index.search(query_embedding, k, self.n_probe)
+        self.searches += 1
+        self.seconds += time.perf_counter() - start
+        return hits
+    
+    def stats(self) -> Dict[str, Any]:
+        """인덱스 정보와 검색 통계"""
+        index = self._index
+        return {
+            "build": self._build,
+            "count": index.count if index else 0,
+            "n_lists": index.n_lists if index else 0,
+            "n_probe": self.n_probe,
+            "graph_version": index.meta.get("graph_version") if index else None,
+            "searches": self.searches,
+            "reloads": self.reloads,
+            "avg_search_ms": self.seconds / self.searches * 1000 if self.searches else 0.0,
+        }
+
+
+_shared_index: Optional[LocalVectorIndex] = None
+
+
+def get_local_index() -> LocalVectorIndex:
+    """프로세스 공용 로컬 인덱스 핸들"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = LocalVectorIndex()
+    return _shared_index
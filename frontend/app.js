@@ -309,7 +309,7 @@ function initEventListeners() {
     document.getElementById('clearGraphBtn').addEventListener('click', clearGraph);
 }
 
-// 검색 처리
+// 검색 처리 (/query/stream의 server-sent events를 받아 답변을 점진적으로 표시)
 async function handleSearch() {
     const query = document.getElementById('queryInput').value.trim();
     if (!query) {
@@ -328,8 +328,11 @@ async function handleSearch() {
     answerBox.innerHTML = '';
     retrieverInfo.textContent = '';
     
+    let answer = '';
+    let finished = false;
+    
     try {
-        const response = await fetch(`${API_BASE_URL}/query`, {
+        const response = await fetch(`${API_BASE_URL}/query/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -341,43 +344,94 @@ async function handleSearch() {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const data = await response.json();
-        
-        // 검색 결과 상세 로깅
-        console.log('[SEARCH] 검색 결과:', {
-            query: query,
-            retriever: data.retriever_used,
-            nodes_count: data.nodes?.length || 0,
-            edges_count: data.edges?.length || 0,
-            nodes: data.nodes?.map(n => ({
-                id: n.id,
-                type: n.type,
-                label: n.label,
-                score: n.properties?.similarity_score || n.properties?.relevance_score || 'N/A'
-            })) || []
+        await readEventStream(response, (event, data) => {
+            if (event === 'retrieval') {
+                // 검색 결과 상세 로깅
+                console.log('[SEARCH] 검색 결과:', {
+                    query: query,
+                    retriever: data.retriever_used,
+                    nodes_count: data.nodes?.length || 0,
+                    edges_count: data.edges?.length || 0,
+                    nodes: data.nodes?.map(n => ({
+                        id: n.id,
+                        type: n.type,
+                        label: n.label,
+                        score: n.properties?.similarity_score || n.properties?.relevance_score || 'N/A'
+                    })) || []
+                });
+                
+                // 검색이 끝나면 답변 생성 전에 그래프와 검색 정보부터 표시
+                loading.style.display = 'none';
+                retrieverInfo.textContent = `사용된 검색 전략: ${data.retriever_used} | 검색된 노드: ${data.nodes?.length || 0}개`;
+                highlightSearchResults(data.nodes, data.edges);
+            } else if (event === 'token') {
+                answer += data.text;
+                renderAnswer(answerBox, answer);
+            } else if (event === 'done') {
+                answer = data.answer;
+                renderAnswer(answerBox, answer);
+                finished = true;
+            } else if (event === 'error') {
+                throw new Error(data.detail);
+            }
         });
         
-        // 답변 표시
-        answerBox.innerHTML = `<p>${data.answer.replace(/\n/g, '<br>')}</p>`;
-        
-        // Retriever 정보 표시
-        retrieverInfo.textContent = `사용된 검색 전략: ${data.retriever_used} | 검색된 노드: ${data.nodes?.length || 0}개`;
-        
-        // 검색 결과 노드 하이라이팅 (전체 그래프 유지)
-        highlightSearchResults(data.nodes, data.edges);
+        if (!finished) {
+            throw new Error('응답 스트림이 중간에 종료되었습니다.');
+        }
         
         // 히스토리에 추가
-        addToHistory(query, data.answer);
+        addToHistory(query, answer);
         
     } catch (error) {
         console.error('Error:', error);
-        answerBox.innerHTML = `<p style="color: red;">에러 발생: ${error.message}</p>`;
+        answerBox.innerHTML += `<p style="color: red;">에러 발생: ${error.message}</p>`;
     } finally {
         searchBtn.disabled = false;
         loading.style.display = 'none';
     }
 }
 
+// 답변 표시
+function renderAnswer(answerBox, answer) {
+    answerBox.innerHTML = `<p>${answer.replace(/\n/g, '<br>')}</p>`;
+}
+
+// server-sent events 스트림 읽기 (이벤트마다 onEvent(event, data) 호출)
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        
+        // 이벤트는 빈 줄로 구분
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            const dataLines = [];
+            for (const line of rawEvent.split('\n')) {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    dataLines.push(line.slice(5).trim());
+                }
+            }
+            
+            if (dataLines.length > 0) {
+                onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
 // 검색 결과 하이라이팅 (전체 그래프 유지)
 function highlightSearchResults(searchNodes, searchEdges) {
     if (!cy) return;
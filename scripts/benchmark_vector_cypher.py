@@ -0,0 +1,147 @@
+"""VectorCypher Retriever 지연 시간 벤치마크 (기존 4회 왕복 vs 통합 쿼리 1회 왕복)"""
+import sys
+import os
+import logging
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# tokenizers 경고 해결
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.db.neo4j_pool import get_driver, close_driver
+from app.etl.embedding_generator import get_embedding_generator
+from app.retrievers.vector import VectorRetriever
+from app.retrievers.vector_cypher import VectorCypherRetriever
+
+
+DEFAULT_QUERIES = [
+    "인공지능 기술 발전 동향",
+    "반도체 수출 전망",
+    "부동산 정책 변화",
+    "기후 변화 대응",
+    "금리 인상 영향",
+]
+
+# 통합 이전 VectorCypher가 벡터 검색 뒤에 실행하던 두 쿼리 (비교 기준)
+LEGACY_EXPAND_CYPHER = """
+MATCH (c:Content)
+WHERE id(c) IN $content_neo4j_ids
+MATCH (a:Article)-[:HAS_CHUNK]->(c)
+OPTIONAL MATCH (a)-[:BELONGS_TO]->(cat:Category)
+OPTIONAL MATCH (m:Media)-[:PUBLISHED]->(a)
+RETURN DISTINCT a, cat, m, c, id(c) as content_neo4j_id
+ORDER BY id(c)
+"""
+
+LEGACY_RELATIONSHIPS_CYPHER = """
+MATCH (c:Content)
+WHERE id(c) IN $content_neo4j_ids
+MATCH (a:Article)-[r1:HAS_CHUNK]->(c)
+OPTIONAL MATCH (a)-[r2:BELONGS_TO]->(cat:Category)
+OPTIONAL MATCH (m:Media)-[r3:PUBLISHED]->(a)
+RETURN r1, r2, r3, a, cat, m, c
+"""
+
+
+def legacy_retrieve(vector_retriever: VectorRetriever, query: str, query_embedding: List[float]):
+    """통합 이전 방식: 벡터 검색(검색 + 확장) 후 확장/관계 쿼리를 다시 실행"""
+    content_nodes, _, _ = vector_retriever.retrieve(query, query_embedding)
+    if not content_nodes:
+        return
+    
+    content_neo4j_ids = [int(node.id) for node in content_nodes]
+    driver = get_driver()
+    with driver.session() as session:
+        list(session.run(LEGACY_EXPAND_CYPHER, content_neo4j_ids=content_neo4j_ids))
+    with driver.session() as session:
+        list(session.run(LEGACY_RELATIONSHIPS_CYPHER, content_neo4j_ids=content_neo4j_ids))
+
+
+def measure(func: Callable[[str, List[float]], None], embeddings: Dict[str, List[float]], runs: int) -> List[float]:
+    """질의별로 runs번 실행한 지연 시간(ms) 목록"""
+    # 워밍업 (Neo4j 실행 계획 캐시, 커넥션 생성)
+    for query, embedding in embeddings.items():
+        func(query, embedding)
+    
+    latencies = []
+    for _ in range(runs):
+        for query, embedding in embeddings.items():
+            start = time.perf_counter()
+            func(query, embedding)
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    return latencies
+
+
+def benchmark(queries: List[str], runs: int = 10, top_k: int = 5):
+    """
+    기존 방식과 통합 쿼리의 지연 시간 비교
+    
+    질의 임베딩은 미리 계산하여 Neo4j 왕복과 결과 조립 시간만 측정합니다.
+    
+    Args:
+        queries: 벤치마크 질의 목록
+        runs: 질의별 반복 횟수
+        top_k: 검색할 Content 수
+    """
+    embedding_generator = get_embedding_generator()
+    embeddings = {query: embedding_generator.generate_single(query) for query in queries}
+    
+    vector_retriever = VectorRetriever(top_k=top_k)
+    fused_retriever = VectorCypherRetriever(top_k=top_k)
+    
+    # Retriever 검색 로그 억제 (경고/오류는 그대로 출력)
+    logging.getLogger("app.retrievers").setLevel(logging.WARNING)
+    
+    results = {
+        "before": measure(lambda q, e: legacy_retrieve(vector_retriever, q, e), embeddings, runs),
+        "after": measure(fused_retriever.retrieve, embeddings, runs),
+    }
+    
+    print(f"질의 {len(queries)}개 x {runs}회, top_k={top_k}")
+    for name, latencies in results.items():  # before: 4회 왕복, after: 통합 쿼리 1회 왕복
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(
+            f"  {name:<7} 평균 {statistics.mean(latencies):7.1f}ms | "
+            f"p50 {statistics.median(latencies):7.1f}ms | p95 {p95:7.1f}ms"
+        )
+    
+    speedup = statistics.median(results["before"]) / max(statistics.median(results["after"]), 1e-9)
+    print(f"  p50 기준 {speedup:.2f}배")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="VectorCypher Retriever 지연 시간 벤치마크")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="질의별 반복 횟수 (기본값: 10)"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=5,
+        help="검색할 Content 수 (기본값: 5)"
+    )
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        help="벤치마크 질의 (기본값: 내장 질의 5개)"
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        benchmark(args.queries or DEFAULT_QUERIES, runs=args.runs, top_k=args.top_k)
+    finally:
+        close_driver()
@@ -0,0 +1,59 @@
+"""로컬 IVF 벡터 인덱스 구축 스크립트"""
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.db.neo4j_pool import close_driver
+from app.vector_index import build_ivf_index
+
+
+def build_local_index(n_lists: int = None, page_size: int = 5000):
+    """
+    Neo4j의 Content 임베딩으로 로컬 IVF 인덱스 구축
+    
+    VECTOR_SEARCH_BACKEND=local이면 ETL(scripts/run_etl.py)이 적재 후 자동으로 재구축하므로,
+    이 스크립트는 처음 구축하거나 클러스터 수를 바꿀 때 사용합니다.
+    
+    Args:
+        n_lists: IVF 클러스터 수 (None이면 LOCAL_INDEX_LISTS 설정 또는 sqrt(N))
+        page_size: Neo4j 스트리밍 페이지 크기
+    """
+    print(f"로컬 벡터 인덱스 구축 중... ({settings.local_index_path})")
+    
+    try:
+        meta = build_ivf_index(n_lists=n_lists, page_size=page_size)
+        if meta and settings.vector_search_backend != "local":
+            print("⚠️  VECTOR_SEARCH_BACKEND=local로 설정해야 API 서버가 로컬 인덱스를 사용합니다.")
+    
+    except Exception as e:
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+    
+    finally:
+        close_driver()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="로컬 IVF 벡터 인덱스 구축")
+    parser.add_argument(
+        "--lists",
+        type=int,
+        default=None,
+        help="IVF 클러스터 수 (기본값: LOCAL_INDEX_LISTS 설정, 0이면 sqrt(N))"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=5000,
+        help="Neo4j 임베딩 스트리밍 페이지 크기 (기본값: 5000)"
+    )
+    
+    args = parser.parse_args()
+    build_local_index(n_lists=args.lists or None, page_size=args.page_size)
@@ -0,0 +1,210 @@
+"""Retriever 라우팅 오프라인 평가 (키워드 규칙 vs 임베딩 분류기 정확도, 오라우팅 지연 비용)"""
+import sys
+import os
+import json
+import re
+import statistics
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# tokenizers 경고 해결
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.etl.embedding_generator import get_embedding_generator
+from app.retrievers.router import QueryRouter, load_routing_examples
+from app.retrievers.selector import RetrieverSelector
+
+
+# Retriever별 검색 지연 시간 기본 추정치 (ms, --latency / --metrics-url로 덮어쓰기)
+# VectorCypher는 벡터 검색 뒤 그래프 확장 왕복이 추가되고, Text2Cypher는 LLM 호출이 포함됩니다.
+DEFAULT_LATENCY_MS = {
+    "text2cypher": 1200.0,
+    "vector": 60.0,
+    "hybrid": 80.0,
+    "vector_cypher": 250.0,
+}
+
+_METRIC_LINE = re.compile(
+    r'^graphrag_stage_duration_seconds_(sum|count)\{retriever="(?P<retriever>[^"]+)",stage="retrieval"\} (?P<value>\S+)$'
+)
+
+
+def available(name: str) -> str:
+    """HYBRID_SEARCH_ENABLED=false면 hybrid 라벨은 vector로 평가"""
+    return "vector" if name == "hybrid" and not settings.hybrid_search_enabled else name
+
+
+def load_dataset(path: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    (질의, 정답 Retriever) 목록
+    
+    path가 있으면 JSONL 파일({"query": "...", "retriever": "..."} 한 줄씩),
+    없으면 라우팅 분류기의 라벨 예시 (leave-one-out으로 평가)
+    """
+    if path:
+        dataset = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    dataset.append((row["query"], row["retriever"]))
+        return dataset
+    
+    return [(query, label) for label, queries in load_routing_examples().items() for query in queries]
+
+
+def latencies_from_metrics(url: str) -> Dict[str, float]:
+    """실행 중인 서버의 /metrics에서 Retriever별 평균 검색 시간(ms)"""
+    with urllib.request.urlopen(url, timeout=10) as response:
+        text = response.read().decode("utf-8")
+    
+    totals: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for line in text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            totals[match.group("retriever")][match.group(1)] = float(match.group("value"))
+    
+    return {
+        retriever: values["sum"] / values["count"] * 1000
+        for retriever, values in totals.items()
+        if values.get("count")
+    }
+
+
+def leave_one_out_routers(
+    dataset: List[Tuple[str, str]],
+    embeddings: List[List[float]],
+    min_margin: float
+) -> List[QueryRouter]:
+    """i번째 질의를 제외한 예시로 학습한 분류기 목록 (i번째 질의 평가용)"""
+    routers = []
+    for i in range(len(dataset)):
+        grouped: Dict[str, List[List[float]]] = defaultdict(list)
+        for j, (_, label) in enumerate(dataset):
+            if j != i:
+                grouped[label].append(embeddings[j])
+        router = QueryRouter(min_margin=min_margin, cache_size=0)
+        router.fit({}, grouped)
+        routers.append(router)
+    return routers
+
+
+def report(
+    name: str,
+    dataset: List[Tuple[str, str]],
+    predictions: List[str],
+    latency_ms: Dict[str, float],
+    route_us: float
+):
+    """정확도, 혼동 행렬, 오라우팅 지연 비용 출력"""
+    truths = [available(label) for _, label in dataset]
+    correct = sum(1 for truth, predicted in zip(truths, predictions) if truth == predicted)
+    labels = sorted(set(truths) | set(predictions))
+    confusion = Counter(zip(truths, predictions))
+    
+    print(f"\n[{name}] 정확도 {correct}/{len(dataset)} ({correct / max(len(dataset), 1):.1%}), 라우팅 {route_us:.1f}µs/질의")
+    print("  정답 \\ 예측  " + " ".join(f"{label:>13}" for label in labels))
+    for truth in labels:
+        print(f"  {truth:<13}" + " ".join(f"{confusion[(truth, predicted)]:>13}" for predicted in labels))
+    
+    # 오라우팅 비용: 예측 Retriever와 정답 Retriever의 검색 지연 시간 차이
+    extra_ms = []
+    for (query, _), truth, predicted in zip(dataset, truths, predictions):
+        if truth == predicted:
+            continue
+        cost = latency_ms.get(predicted, 0.0) - latency_ms.get(truth, 0.0)
+        extra_ms.append(cost)
+        print(f"  ✗ {query!r}: {truth} → {predicted} ({cost:+.0f}ms)")
+    
+    if extra_ms:
+        slower = [cost for cost in extra_ms if cost > 0]
+        print(
+            f"  오라우팅 {len(extra_ms)}건: 지연 비용 합계 {sum(extra_ms):+.0f}ms, "
+            f"질의당 평균 {sum(extra_ms) / len(dataset):+.1f}ms, 느려진 질의 {len(slower)}건"
+            + (f" (중앙값 +{statistics.median(slower):.0f}ms)" if slower else "")
+        )
+
+
+def evaluate(data_path: Optional[str], latency_ms: Dict[str, float], min_margin: float):
+    dataset = load_dataset(data_path)
+    if not dataset:
+        print("평가할 질의가 없습니다.")
+        return
+    
+    start = time.perf_counter()
+    embeddings = get_embedding_generator().generate([query for query, _ in dataset])
+    embed_ms = (time.perf_counter() - start) * 1000
+    print(f"질의 {len(dataset)}개, 임베딩 {embed_ms:.0f}ms (요청 경로에서는 의미 캐시/검색용 임베딩을 재사용)")
+    print("검색 지연 시간(ms): " + ", ".join(f"{name}={value:.0f}" for name, value in sorted(latency_ms.items())))
+    
+    start = time.perf_counter()
+    rule_predictions = [RetrieverSelector.route(query) for query, _ in dataset]
+    rule_us = (time.perf_counter() - start) * 1e6 / len(dataset)
+    report("키워드 규칙", dataset, rule_predictions, latency_ms, rule_us)
+    
+    if data_path:
+        # 외부 평가셋: 라벨 예시 전체로 학습
+        router = QueryRouter(min_margin=min_margin, cache_size=0)
+        router.fit(load_routing_examples())
+        routers = [router] * len(dataset)
+        name = "임베딩 분류기"
+    else:
+        routers = leave_one_out_routers(dataset, embeddings, min_margin)
+        name = "임베딩 분류기 (leave-one-out)"
+    
+    # 분류 시간만 측정 (임베딩은 요청 경로에서 재사용하므로 제외)
+    predictions = []
+    elapsed = 0.0
+    for (query, _), embedding, router in zip(dataset, embeddings, routers):
+        start = time.perf_counter()
+        predictions.append(router.classify(query, embedding))
+        elapsed += time.perf_counter() - start
+    report(name, dataset, predictions, latency_ms, elapsed * 1e6 / len(dataset))
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Retriever 라우팅 오프라인 평가")
+    parser.add_argument(
+        "--data",
+        default=None,
+        help='라벨 평가셋 JSONL ({"query": "...", "retriever": "..."}, 기본값: 라벨 예시 leave-one-out)'
+    )
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        metavar="RETRIEVER=MS",
+        help="Retriever별 검색 지연 시간 추정치 (예: vector_cypher=300, 여러 번 지정 가능)"
+    )
+    parser.add_argument(
+        "--metrics-url",
+        default=None,
+        help="실행 중인 서버의 /metrics URL (Retriever별 평균 검색 시간을 지연 시간 추정치로 사용)"
+    )
+    parser.add_argument(
+        "--min-margin",
+        type=float,
+        default=settings.routing_min_margin,
+        help=f"키워드 규칙으로 넘길 1·2위 유사도 차이 (기본값: {settings.routing_min_margin})"
+    )
+    
+    args = parser.parse_args()
+    
+    latency_ms = dict(DEFAULT_LATENCY_MS)
+    if args.metrics_url:
+        latency_ms.update(latencies_from_metrics(args.metrics_url))
+    for item in args.latency:
+        retriever, _, value = item.partition("=")
+        latency_ms[retriever] = float(value)
+    
+    evaluate(args.data, latency_ms, args.min_margin)
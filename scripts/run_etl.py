@@ -2,6 +2,7 @@
 import sys
 import os
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
 
 # tokenizers 경고 해결
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -10,127 +11,183 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from tqdm import tqdm
 from app.etl.supabase_client import SupabaseClient
 from app.etl.chunker import Chunker
 from app.etl.embedding_generator import EmbeddingGenerator
 from app.etl.neo4j_loader import Neo4jLoader
-import uuid
+from app.etl.pipeline import ETLPipeline
+from app.etl.watermark import WatermarkStore
+from app.cache.graph_version import bump_graph_version
+from app.vector_index import build_ivf_index
+from app.config import settings
 
 
-def run_etl(batch_size: int = 10, clear_existing: bool = False, limit: int = None):
+def track_max_position(
+    pages: Iterable[List[Dict[str, Any]]],
+    column: str,
+    seen: Dict[str, Any]
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    페이지를 그대로 넘기면서 조회한 기사 중 최대 (column 값, id)를 seen["max"]에 기록
+    
+    전체 적재는 최신순으로 조회하므로 워터마크로 저장할 위치를 따로 추적합니다.
+    """
+    for page in pages:
+        for article in page:
+            value = article.get(column)
+            if value is None:
+                continue
+            position = (str(value), article["id"])
+            if seen.get("max") is None or position > seen["max"]:
+                seen["max"] = position
+        yield page
+
+
+def run_etl(
+    batch_size: int = 10,
+    clear_existing: bool = False,
+    limit: int = None,
+    write_batch_size: int = None,
+    queue_size: int = 4,
+    chunk_workers: int = 2,
+    embed_workers: int = 1,
+    write_workers: int = 2,
+    embedding_batch_size: int = None,
+    use_cache: bool = None,
+    incremental: bool = False
+):
     """
     ETL 파이프라인 실행
     
+    조회 / 청킹 / 임베딩 / 적재 스테이지가 각자의 워커 풀에서 동시에 실행됩니다.
+    
     Args:
-        batch_size: 배치 처리 크기
+        batch_size: 배치 처리 크기 (Supabase keyset 페이지 크기)
         clear_existing: 기존 데이터 삭제 여부
         limit: 처리할 최대 기사 수 (None이면 전체 처리)
+        write_batch_size: Neo4j UNWIND 배치 크기 (None이면 설정값 사용)
+        queue_size: 스테이지 간 큐 크기 (배치 단위, backpressure 기준)
+        chunk_workers: 청킹 워커 수
+        embed_workers: 임베딩 워커 수
+        write_workers: Neo4j 적재 워커 수
+        embedding_batch_size: 기사 간 청크를 모아 임베딩할 목표 배치 크기 (None이면 설정값 사용)
+        use_cache: 임베딩 디스크 캐시 사용 여부 (None이면 EMBEDDING_CACHE_ENABLED 설정 사용)
+        incremental: True면 저장된 워터마크 이후에 생성/수정된 기사만 적재
     """
     print("ETL 파이프라인 시작...")
     
+    if use_cache is None:
+        use_cache = settings.embedding_cache_enabled
+    
     # 클라이언트 초기화
     supabase = SupabaseClient()
     chunker = Chunker()
-    embedding_gen = EmbeddingGenerator()
-    loader = Neo4jLoader()
+    embedding_gen = EmbeddingGenerator(use_cache=use_cache)
+    loader = Neo4jLoader(batch_size=write_batch_size)
+    watermark_store = WatermarkStore()
     
     try:
         # 기존 데이터 삭제 (옵션)
         if clear_existing:
             print("기존 데이터 삭제 중...")
             loader.clear_all()
+            watermark_store.reset()
+        
+        # id 유니크 제약조건 (MERGE가 인덱스를 사용하도록)
+        loader.ensure_constraints()
         
         # 1. 카테고리 및 언론사 데이터 로드
         print("카테고리 및 언론사 데이터 로드 중...")
         categories = supabase.get_categories()
         media_companies = supabase.get_media_companies()
         
-        # 카테고리 노드 생성
-        for cat in tqdm(categories, desc="카테고리 생성"):
-            loader.create_category(cat["id"], cat["name"])
+        # 카테고리 / 언론사 노드 생성 (UNWIND 벌크 적재)
+        loader.bulk_create_categories(categories)
+        print(f"카테고리 {len(categories)}개 생성")
+        
+        loader.bulk_create_media(media_companies)
+        print(f"언론사 {len(media_companies)}개 생성")
         
-        # 언론사 노드 생성
-        for media in tqdm(media_companies, desc="언론사 생성"):
-            loader.create_media(media["id"], media["name"])
+        pipeline = ETLPipeline(
+            chunker,
+            embedding_gen,
+            loader,
+            queue_size=queue_size,
+            chunk_workers=chunk_workers,
+            embed_workers=embed_workers,
+            write_workers=write_workers,
+            embedding_batch_size=embedding_batch_size
+        )
         
         # 2. 기사 데이터 로드 및 처리
         print("기사 데이터 로드 중...")
-        total_count = supabase.get_article_count()
-        print(f"전체 기사 수: {total_count}")
-        
-        # limit이 지정된 경우 처리할 기사 수 제한
-        if limit:
-            total_count = min(total_count, limit)
-            print(f"처리할 기사 수: {total_count}개 (최대 {limit}개로 제한)")
-        
-        offset = 0
-        processed = 0
-        
-        while offset < total_count:
-            # 남은 기사 수 계산
-            remaining = total_count - offset
-            current_batch_size = min(batch_size, remaining)
-            
-            articles = supabase.get_articles(limit=current_batch_size, offset=offset)
-            
-            if not articles:
-                break
-            
-            # 배치 처리
-            for article in tqdm(articles, desc=f"기사 처리 ({processed}/{total_count})"):
-                # Article 노드 생성
-                loader.create_article(
-                    article["id"],
-                    article["title"],
-                    article["url"],
-                    str(article["created_at"])
+        try:
+            if incremental:
+                watermark = watermark_store.load()
+                column = watermark_store.column
+                if watermark:
+                    print(f"증분 적재: {column} > {watermark['value']} (id > {watermark['id']}) 기사만 처리")
+                else:
+                    print("저장된 워터마크가 없어 전체 기사를 오름차순으로 적재합니다.")
+                
+                pages = supabase.iter_articles(
+                    page_size=batch_size,
+                    order_column=column,
+                    descending=False,
+                    after=(watermark["value"], watermark["id"]) if watermark else None,
+                    limit=limit
+                )
+                
+                # 앞선 페이지가 모두 적재된 지점까지만 워터마크 저장 (중단 시 해당 지점부터 재개)
+                stats = pipeline.run(
+                    pages=pages,
+                    on_commit=lambda article: watermark_store.save(article[column], article["id"])
                 )
                 
-                # 관계 생성
-                if article.get("media_company_index"):
-                    loader.create_published_relationship(
-                        article["media_company_index"],
-                        article["id"]
-                    )
+                if pipeline.committed:
+                    print(f"워터마크 갱신: {column}={pipeline.committed[column]}, id={pipeline.committed['id']}")
+            else:
+                # 최신 기사부터 (created_at, id) keyset 커서로 순회
+                if limit:
+                    print(f"처리할 기사 수: 최대 {limit}개로 제한")
                 
-                if article.get("news_category_index"):
-                    loader.create_belongs_to_relationship(
-                        article["id"],
-                        article["news_category_index"]
-                    )
+                column = watermark_store.column
+                seen: Dict[str, Any] = {}
+                pages = track_max_position(supabase.iter_articles(page_size=batch_size, limit=limit), column, seen)
+                stats = pipeline.run(pages, total_count=limit)
                 
-                # Content 청킹 및 임베딩
-                if article.get("content"):
-                    chunks = chunker.chunk_article(article["content"])
-                    
-                    if chunks:
-                        # 청크 텍스트 추출
-                        chunk_texts = [chunk["text"] for chunk in chunks]
-                        
-                        # 배치 임베딩 생성
-                        embeddings = embedding_gen.generate(chunk_texts)
-                        
-                        # Content 노드 생성 및 관계 생성
-                        for chunk, embedding in zip(chunks, embeddings):
-                            content_id = str(uuid.uuid4())
-                            
-                            loader.create_content(
-                                content_id,
-                                chunk["text"],
-                                chunk["chunk_index"],
-                                embedding
-                            )
-                            
-                            loader.create_has_chunk_relationship(
-                                article["id"],
-                                content_id
-                            )
+                # 전체를 적재했으면 가장 최근 위치를 워터마크로 저장 (다음 --incremental은 그 이후만 조회)
+                # --limit이면 오래된 기사가 빠졌으므로 저장하지 않음 (증분 실행이 빠진 기사를 건너뛰게 됨)
+                if limit is None and seen.get("max") is not None:
+                    value, article_id = seen["max"]
+                    watermark_store.save(value, article_id)
+                    print(f"워터마크 저장: {column}={value}, id={article_id}")
+                elif limit is not None:
+                    print("--limit으로 일부만 적재했으므로 워터마크를 저장하지 않습니다.")
+        finally:
+            pipeline.report()
+            
+            # 그래프가 바뀌었으면 버전 마커 갱신 (API 서버의 답변 캐시 무효화)
+            if clear_existing or pipeline.stats["write"].items > 0:
+                version = bump_graph_version()
+                print(f"  그래프 버전 갱신: {version}")
                 
-                processed += 1
+                # 로컬 벡터 인덱스 사용 시 새 임베딩으로 재구축
+                if settings.vector_search_backend == "local":
+                    try:
+                        build_ivf_index()
+                    except Exception as e:
+                        print(f"  ⚠️  로컬 벡터 인덱스 재구축 실패: {e}")
             
-            offset += batch_size
+            if embedding_gen.cache is not None:
+                cache_stats = embedding_gen.cache.stats()
+                print(
+                    f"  임베딩 캐시: 히트 {cache_stats['hits']} / 미스 {cache_stats['misses']} "
+                    f"(히트율 {cache_stats['hit_rate']:.1%}), 항목 {cache_stats['entries']}개, "
+                    f"축출 {cache_stats['evictions']}개"
+                )
         
+        processed = stats["write"].items
         print(f"\nETL 완료! 총 {processed}개 기사 처리됨.")
     
     except Exception as e:
@@ -140,6 +197,7 @@ def run_etl(batch_size: int = 10, clear_existing: bool = False, limit: int = Non
     
     finally:
         supabase.close()
+        embedding_gen.close()
         loader.close()
 
 
@@ -164,8 +222,66 @@ if __name__ == "__main__":
         default=None,
         help="처리할 최대 기사 수 (기본값: 전체 처리, 예: --limit 200)"
     )
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        default=None,
+        help="Neo4j UNWIND 배치 크기 (기본값: NEO4J_WRITE_BATCH_SIZE 설정)"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=4,
+        help="스테이지 간 큐 크기 (기본값: 4 배치)"
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=2,
+        help="청킹 워커 수 (기본값: 2)"
+    )
+    parser.add_argument(
+        "--embed-workers",
+        type=int,
+        default=1,
+        help="임베딩 워커 수 (기본값: 1)"
+    )
+    parser.add_argument(
+        "--write-workers",
+        type=int,
+        default=2,
+        help="Neo4j 적재 워커 수 (기본값: 2)"
+    )
+    parser.add_argument(
+        "--embedding-batch-size",
+        type=int,
+        default=None,
+        help="임베딩 목표 배치 크기 (기본값: EMBEDDING_BATCH_SIZE 설정)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="임베딩 디스크 캐시를 사용하지 않음"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="저장된 워터마크 이후에 생성/수정된 기사만 적재 (cron 주기 실행용)"
+    )
     
     args = parser.parse_args()
     
-    run_etl(batch_size=args.batch_size, clear_existing=args.clear, limit=args.limit)
+    run_etl(
+        batch_size=args.batch_size,
+        clear_existing=args.clear,
+        limit=args.limit,
+        write_batch_size=args.write_batch_size,
+        queue_size=args.queue_size,
+        chunk_workers=args.chunk_workers,
+        embed_workers=args.embed_workers,
+        write_workers=args.write_workers,
+        embedding_batch_size=args.embedding_batch_size,
+        use_cache=False if args.no_cache else None,
+        incremental=args.incremental
+    )
 
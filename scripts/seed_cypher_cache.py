@@ -0,0 +1,97 @@
+"""Text2Cypher 템플릿 캐시 미리 채우기 스크립트"""
+import sys
+import os
+import re
+from pathlib import Path
+from typing import List
+
+# tokenizers 경고 해결
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.config import settings
+from app.retrievers.selector import RetrieverSelector
+from app.retrievers.text2cypher import Text2CypherRetriever
+
+
+def parse_queries(path: str) -> List[str]:
+    """
+    마크다운 문서에서 `- "질의"` 형식의 추천 질의 추출
+    
+    Args:
+        path: 마크다운 파일 경로
+    
+    Returns:
+        중복을 제거한 질의 리스트 (문서 순서 유지)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    
+    queries = re.findall(r'^\s*-\s*"([^"]+)"\s*$', text, flags=re.MULTILINE)
+    return list(dict.fromkeys(queries))
+
+
+def seed_cypher_cache(path: str, include_all: bool = False):
+    """
+    추천 질의로 Text2Cypher를 실행하여 템플릿 캐시 채우기
+    
+    Args:
+        path: 질의가 담긴 마크다운 파일 경로
+        include_all: True면 Text2Cypher로 라우팅되지 않는 질의도 실행
+    """
+    if not settings.cypher_cache_enabled:
+        print("CYPHER_CACHE_ENABLED=false 입니다. 캐시를 사용하도록 설정한 뒤 다시 실행하세요.")
+        return
+    
+    queries = parse_queries(path)
+    if not include_all:
+        queries = [query for query in queries if RetrieverSelector.route(query) == "text2cypher"]
+    
+    print(f"{path}에서 질의 {len(queries)}개를 실행합니다.")
+    
+    retriever = Text2CypherRetriever()
+    try:
+        for i, query in enumerate(queries, 1):
+            before = retriever.cache.stats()
+            nodes, edges, _ = retriever.retrieve(query)
+            after = retriever.cache.stats()
+            
+            if after["hits"] > before["hits"]:
+                status = "캐시 히트"
+            elif after["stores"] > before["stores"]:
+                status = "템플릿 저장"
+            else:
+                status = "저장 안 됨"
+            print(f"[{i}/{len(queries)}] {status}: {query} (노드 {len(nodes)}개, 엣지 {len(edges)}개)")
+        
+        stats = retriever.cache.stats()
+        print(
+            f"\n완료! 템플릿 {stats['templates']}개 "
+            f"(저장 {stats['stores']}, 히트 {stats['hits']}, 저장 불가 {stats['uncacheable']}) "
+            f"→ {settings.cypher_cache_path}"
+        )
+    finally:
+        retriever.cache.flush()
+        retriever.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Text2Cypher 템플릿 캐시 미리 채우기")
+    parser.add_argument(
+        "--file",
+        default=str(project_root / "RETRIEVER_TEST_QUERIES.md"),
+        help="질의가 담긴 마크다운 파일 (기본값: RETRIEVER_TEST_QUERIES.md)"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Text2Cypher로 라우팅되지 않는 질의도 실행"
+    )
+    
+    args = parser.parse_args()
+    seed_cypher_cache(args.file, include_all=args.all)
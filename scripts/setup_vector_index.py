@@ -1,4 +1,4 @@
-"""Neo4j Vector Index 생성 스크립트"""
+"""Neo4j Vector Index / 전문(Full-text) 인덱스 생성 스크립트"""
 import sys
 from pathlib import Path
 
@@ -111,6 +111,40 @@ def create_vector_index():
         driver.close()
 
 
+def create_fulltext_index():
+    """Hybrid Retriever용 Content.text / Article.title 전문 인덱스 생성"""
+    driver = GraphDatabase.driver(
+        settings.neo4j_uri,
+        auth=(settings.neo4j_username, settings.neo4j_password)
+    )
+    
+    try:
+        with driver.session() as session:
+            # 한국어 기사이므로 CJK bi-gram 분석기 사용 (띄어쓰기 없는 복합어도 부분 일치)
+            session.run(
+                """
+                CREATE FULLTEXT INDEX `news-fulltext` IF NOT EXISTS
+                FOR (n:Content|Article)
+                ON EACH [n.text, n.title]
+                OPTIONS {
+                    indexConfig: {
+                        `fulltext.analyzer`: 'cjk'
+                    }
+                }
+                """
+            )
+            print("전문 인덱스 생성 완료! (news-fulltext)")
+    
+    except Exception as e:
+        print(f"에러 발생: {e}")
+        import traceback
+        traceback.print_exc()
+    
+    finally:
+        driver.close()
+
+
 if __name__ == "__main__":
     create_vector_index()
+    create_fulltext_index()
 